@@ -37,3 +37,45 @@ class Admin(AbstractUser):
 
     def __str__(self):
         return f"{self.username} ({self.role})"
+
+
+class TokenRevocation(models.Model):
+    """
+    A revoked token (``jti`` set) or, with an empty ``jti``, every token
+    of ``admin`` issued up to ``created_at``.  Only needed until the
+    tokens it covers expire (``expires_at``).
+    """
+
+    admin = models.ForeignKey(
+        Admin,
+        on_delete=models.CASCADE,
+        related_name="token_revocations"
+    )
+    jti = models.CharField(max_length=255, blank=True, default="", db_index=True)
+    reason = models.CharField(max_length=50, blank=True, default="")
+
+    revoked_by = models.ForeignKey(
+        Admin,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+"
+    )
+
+    # TokenRevocationVersion.version of the transaction that added it.
+    version = models.PositiveBigIntegerField(db_index=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"{self.admin_id}:{self.jti or '*'}"
+
+
+class TokenRevocationVersion(models.Model):
+    """
+    Single row, bumped by every revocation transaction; the cheap stamp
+    each process polls to know its in-memory revocation set is current.
+    """
+
+    version = models.PositiveBigIntegerField(default=0)
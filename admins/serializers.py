@@ -43,6 +43,7 @@ class AdminProfileSerializer(serializers.Serializer):
 
 class AdminListSerializer(serializers.ModelSerializer):
     done_tickets = serializers.IntegerField()
+    closed_tickets = serializers.IntegerField(source="closed_tickets_count")
 
     class Meta:
         model = Admin
@@ -52,8 +53,16 @@ class AdminListSerializer(serializers.ModelSerializer):
             "phone",
             "location",
             "done_tickets",
+            "closed_tickets",
         ]
 
+
+class AdminLeaderboardSerializer(AdminListSerializer):
+    rank = serializers.IntegerField()
+
+    class Meta(AdminListSerializer.Meta):
+        fields = ["rank"] + AdminListSerializer.Meta.fields + ["is_active"]
+
 class AdminChangePasswordSerializer(serializers.Serializer):
     new_password = serializers.CharField(write_only=True, min_length=6)
 
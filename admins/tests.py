@@ -1,3 +1,169 @@
-from django.test import TestCase
+import uuid
 
-# Create your tests here.
+from django.test import TestCase, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from admins.models import Admin
+from livetrack1.bloom import BloomFilter
+from livetrack1.services.token_revocation_service import (
+    RevocationSet, TokenRevocationService)
+
+
+class BloomFilterTests(TestCase):
+
+    def test_no_false_negatives(self):
+        bloom = BloomFilter(1000)
+        values = [uuid.uuid4().hex for _ in range(1000)]
+        for value in values:
+            bloom.add(value)
+
+        self.assertTrue(all(value in bloom for value in values))
+        self.assertEqual(len(bloom), 1000)
+
+    def test_false_positive_rate_near_target(self):
+        bloom = BloomFilter(1000, error_rate=0.01)
+        for _ in range(1000):
+            bloom.add(uuid.uuid4().hex)
+
+        hits = sum(uuid.uuid4().hex in bloom for _ in range(10000))
+        self.assertLess(hits, 300)
+
+
+class TokenRevocationTests(TestCase):
+
+    def setUp(self):
+        TokenRevocationService._state = None
+        self.addCleanup(setattr, TokenRevocationService, "_state", None)
+
+        self.root = Admin.objects.create_user(
+            username="root", password="pw", role="ROOT", full_name="Root"
+        )
+        self.tech = Admin.objects.create_user(
+            username="tech", password="pw", role="ADMIN", full_name="Tech"
+        )
+
+    def token(self, **claims):
+        token = AccessToken.for_user(self.tech)
+        for claim, value in claims.items():
+            token[claim] = value
+        return token
+
+    def expire_poll(self):
+        # TestCase never commits, so on_commit's expire_poll doesn't run.
+        TokenRevocationService.expire_poll()
+
+    # ============================================================
+    # Admin cutoff
+    # ============================================================
+
+    def test_admin_cutoff_uses_sub_second_issue_time(self):
+        revocation = TokenRevocationService.revoke_admin(self.tech, reason="deactivated")
+        cutoff = revocation.created_at.timestamp()
+        claim = TokenRevocationService.ISSUED_AT_CLAIM
+
+        self.assertTrue(TokenRevocationService.is_revoked(self.token(**{claim: cutoff - 0.001})))
+        self.assertFalse(TokenRevocationService.is_revoked(self.token(**{claim: cutoff + 0.001})))
+
+    def test_admin_cutoff_falls_back_to_iat(self):
+        revocation = TokenRevocationService.revoke_admin(self.tech, reason="deactivated")
+        cutoff = int(revocation.created_at.timestamp())
+
+        before = self.token(iat=cutoff - 1)
+        after = self.token(iat=cutoff + 1)
+        self.assertNotIn(TokenRevocationService.ISSUED_AT_CLAIM, after.payload)
+
+        self.assertTrue(TokenRevocationService.is_revoked(before))
+        self.assertFalse(TokenRevocationService.is_revoked(after))
+
+    def test_cutoff_only_applies_to_its_admin(self):
+        TokenRevocationService.revoke_admin(self.tech)
+        self.assertFalse(TokenRevocationService.is_revoked(AccessToken.for_user(self.root)))
+
+    # ============================================================
+    # JTIs
+    # ============================================================
+
+    def test_revoked_jti(self):
+        revoked, other = self.token(), self.token()
+        TokenRevocationService.revoke_token(revoked, reason="logout")
+
+        self.assertTrue(TokenRevocationService.is_revoked(revoked))
+        self.assertFalse(TokenRevocationService.is_revoked(other))
+        self.assertTrue(TokenRevocationService.current().exact)
+
+    @override_settings(TOKEN_REVOCATION_EXACT_LIMIT=3)
+    def test_switches_to_bloom_filter_above_limit(self):
+        tokens = [self.token() for _ in range(5)]
+        for token in tokens[:2]:
+            TokenRevocationService.revoke_token(token)
+        self.assertTrue(TokenRevocationService.current().exact)
+
+        for token in tokens[2:4]:
+            TokenRevocationService.revoke_token(token)
+        self.expire_poll()
+        state = TokenRevocationService.current()
+
+        self.assertFalse(state.exact)
+        self.assertIsInstance(state.jtis, BloomFilter)
+        self.assertTrue(all(TokenRevocationService.is_revoked(t) for t in tokens[:4]))
+        self.assertFalse(TokenRevocationService.is_revoked(tokens[4]))
+
+    @override_settings(TOKEN_REVOCATION_EXACT_LIMIT=1)
+    def test_bloom_hit_is_confirmed_once(self):
+        for _ in range(2):
+            TokenRevocationService.revoke_token(self.token())
+        state = TokenRevocationService.current()
+        self.assertFalse(state.exact)
+
+        # Simulate a false positive for a JTI that was never revoked.
+        state.jtis.add("not-revoked")
+
+        with self.assertNumQueries(1):
+            self.assertFalse(state.has_jti("not-revoked"))
+        with self.assertNumQueries(0):
+            self.assertFalse(state.has_jti("not-revoked"))
+
+    # ============================================================
+    # Sync
+    # ============================================================
+
+    def test_incremental_reload_after_version_bump(self):
+        first, second = self.token(), self.token()
+        TokenRevocationService.revoke_token(first)
+        state = TokenRevocationService.current()
+        version = state.version
+
+        # Written "elsewhere": not seen until the next poll.
+        TokenRevocationService.revoke_token(second)
+        with self.assertNumQueries(0):
+            self.assertFalse(TokenRevocationService.is_revoked(second))
+
+        # Version read, then only the new rows.
+        self.expire_poll()
+        with self.assertNumQueries(2):
+            self.assertTrue(TokenRevocationService.is_revoked(second))
+
+        reloaded = TokenRevocationService.current()
+        self.assertIs(reloaded, state)
+        self.assertEqual(reloaded.version, version + 1)
+        self.assertTrue(TokenRevocationService.is_revoked(first))
+
+    def test_steady_state_needs_no_query(self):
+        TokenRevocationService.revoke_admin(self.tech)
+        TokenRevocationService.current()
+
+        with self.assertNumQueries(0):
+            for _ in range(10):
+                TokenRevocationService.is_revoked(AccessToken.for_user(self.root))
+
+    def test_load_state_from_database(self):
+        token = self.token()
+        TokenRevocationService.revoke_token(token)
+        TokenRevocationService.revoke_admin(self.root)
+
+        TokenRevocationService._state = None
+        state = TokenRevocationService.current()
+
+        self.assertIsInstance(state, RevocationSet)
+        self.assertIn(token["jti"], state.jtis)
+        self.assertIn(str(self.root.id), state.admins)
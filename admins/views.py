@@ -1,4 +1,9 @@
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.dateparse import parse_date
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
@@ -8,9 +13,15 @@ from admins.models import Admin
 from admins.serializers import \
     AdminChangePasswordSerializer  # ← أضيفي هذا السطر
 from admins.serializers import AdminListSerializer  # ← أضيفي هذا السطر
+from admins.serializers import AdminLeaderboardSerializer
 from admins.serializers import (AdminProfileSerializer, AdminUpdateSerializer,
                                 CreateAdminSerializer)
+from livetrack1.authentication import PrincipalJWTAuthentication
+from livetrack1.pagination import KeysetPagination
+from livetrack1.services.admin_cache_service import AdminCacheService
 from livetrack1.services.authorization_service import AuthorizationService
+from livetrack1.services.token_revocation_service import \
+    TokenRevocationService
 from tickets.services.ticket_service import TicketService
 
 from .serializers import AdminListSerializer, AdminProfileSerializer
@@ -71,8 +82,17 @@ class ToggleAdminStatusAPI(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        admin.is_active = not admin.is_active
-        admin.save(update_fields=["is_active"])
+        with transaction.atomic():
+            admin.is_active = not admin.is_active
+            admin.save(update_fields=["is_active"])
+            AdminCacheService.invalidate(admin.id)
+
+            # Tokens already issued stop working within seconds, on every
+            # worker, not only when they expire.
+            if not admin.is_active:
+                TokenRevocationService.revoke_admin(
+                    admin, reason="deactivated", revoked_by=request.user
+                )
 
         return Response(
             {
@@ -84,6 +104,12 @@ class ToggleAdminStatusAPI(APIView):
         )
 
 
+class AdminProfileTicketsPagination(KeysetPagination):
+    page_size = 20
+    max_page_size = 100
+    tiebreak_fields = ("-last_activity", "-id")
+
+
 class AdminProfileAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -102,6 +128,13 @@ class AdminProfileAPIView(APIView):
 
         data = TicketService.get_admin_profile_data(admin)
 
+        paginator = AdminProfileTicketsPagination()
+        page = paginator.paginate_queryset(
+            data["participations"].order_by(),
+            request,
+            view=self
+        )
+
         serializer = AdminProfileSerializer({
             "id": admin.id,
             "username": admin.username,
@@ -110,13 +143,18 @@ class AdminProfileAPIView(APIView):
             "phone": admin.phone,
             "location": admin.location,
             "total_tickets": data["total_tickets"],
-            "tickets": data["tickets"],
+            "tickets": [participation.ticket for participation in page],
         })
 
-        return Response(serializer.data)
+        return Response({
+            **serializer.data,
+            "next": paginator.get_next_link(),
+            "previous": paginator.get_previous_link(),
+        })
     
 class AdminListAPIView(APIView):
     permission_classes = [IsAuthenticated]
+    authentication_classes = [PrincipalJWTAuthentication]
 
     def get(self, request):
 
@@ -126,10 +164,53 @@ class AdminListAPIView(APIView):
                 status=status.HTTP_403_FORBIDDEN
             )
 
-        admins = TicketService.get_admins_with_done_count()
+        try:
+            date_from = self._parse_day(request.query_params.get("date_from"))
+            date_to = self._parse_day(request.query_params.get("date_to"))
+        except ValueError:
+            return Response(
+                {"error": "date_from / date_to must be YYYY-MM-DD"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # date_to is inclusive: count replies until the end of that day.
+        if date_to:
+            date_to += timedelta(days=1)
+
+        admins = TicketService.get_admins_with_done_count(date_from, date_to)
         serializer = AdminListSerializer(admins, many=True)
 
         return Response(serializer.data)
+
+    @staticmethod
+    def _parse_day(value):
+        if not value:
+            return None
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(value)
+        return timezone.make_aware(datetime.combine(day, time.min))
+
+
+class AdminLeaderboardAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [PrincipalJWTAuthentication]
+
+    def get(self, request):
+
+        if not AuthorizationService.is_root(request.user.role):
+            return Response(
+                {"error": "Only ROOT can view the leaderboard"},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        period = request.query_params.get("period", "all")
+        leaderboard = TicketService.get_admin_leaderboard(period)
+
+        return Response({
+            "period": period,
+            "results": AdminLeaderboardSerializer(leaderboard, many=True).data,
+        })
     
 
 class AdminChangePasswordAPIView(APIView):
@@ -149,7 +230,12 @@ class AdminChangePasswordAPIView(APIView):
         serializer.is_valid(raise_exception=True)
 
         admin.set_password(serializer.validated_data["new_password"])
-        admin.save(update_fields=["password"])
+        with transaction.atomic():
+            admin.save(update_fields=["password"])
+            AdminCacheService.invalidate(admin.id)
+            TokenRevocationService.revoke_admin(
+                admin, reason="password_changed", revoked_by=request.user
+            )
 
         return Response({"message": "Password updated successfully"})
     
@@ -174,6 +260,7 @@ class AdminUpdateAPIView(APIView):
 
         serializer.is_valid(raise_exception=True)
         serializer.save()
+        AdminCacheService.invalidate(admin.id)
 
         return Response({
             "message": "Admin updated successfully"
@@ -0,0 +1,68 @@
+import csv
+
+from django.core.management.base import BaseCommand
+
+from customers.models import Customer
+from customers.services.duplicate_service import CustomerDuplicateService
+
+
+class Command(BaseCommand):
+    help = "Report clusters of customers that look like the same subscriber."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--fuzzy",
+            action="store_true",
+            help="Also link similar (not just equal) names. PostgreSQL only.",
+        )
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=CustomerDuplicateService.SIMILARITY_THRESHOLD,
+            help="Trigram similarity needed for --fuzzy name matches (0-1).",
+        )
+        parser.add_argument(
+            "--csv",
+            action="store_true",
+            help="Write one CSV row per customer instead of a summary.",
+        )
+
+    def handle(self, *args, **options):
+        clusters = CustomerDuplicateService.clusters(
+            fuzzy=options["fuzzy"],
+            threshold=options["threshold"],
+        )
+
+        writer = csv.writer(self.stdout) if options["csv"] else None
+        if writer:
+            writer.writerow(["cluster", "reasons", "customer_id", "full_name", "username", "phone", "distributor", "created_at"])
+
+        for start in range(0, len(clusters), 500):
+            batch = clusters[start:start + 500]
+            customers = Customer.objects.select_related("distributor").in_bulk(
+                [customer_id for cluster in batch for customer_id in cluster["ids"]]
+            )
+
+            for number, cluster in enumerate(batch, start=start + 1):
+                reasons = "+".join(cluster["reasons"])
+                members = [customers[i] for i in cluster["ids"] if i in customers]
+
+                if writer:
+                    for customer in members:
+                        writer.writerow([
+                            number, reasons, customer.id, customer.full_name,
+                            customer.username, customer.phone,
+                            customer.distributor.name if customer.distributor else "",
+                            customer.created_at.isoformat(),
+                        ])
+                    continue
+
+                self.stdout.write(f"#{number} ({reasons})")
+                for customer in members:
+                    self.stdout.write(f"    {customer.id}: {customer.full_name} / {customer.phone} / {customer.username}")
+
+        if not writer:
+            duplicates = sum(len(cluster["ids"]) for cluster in clusters)
+            self.stdout.write(self.style.SUCCESS(
+                f"{len(clusters)} cluster(s), {duplicates} customer(s)"
+            ))
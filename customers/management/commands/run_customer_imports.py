@@ -0,0 +1,28 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from customers.services.import_job_service import CustomerImportJobService
+
+
+class Command(BaseCommand):
+    help = "Run customer import jobs whose worker was lost (e.g. after a restart)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--stale-minutes",
+            type=float,
+            default=CustomerImportJobService.STALE_AFTER.total_seconds() / 60,
+            help="Resume RUNNING imports that made no progress for at least this long.",
+        )
+
+    def handle(self, *args, **options):
+        requeued = CustomerImportJobService.requeue_stale(
+            timedelta(minutes=options["stale_minutes"])
+        )
+        if requeued:
+            self.stdout.write(f"Requeued {requeued} stale import(s)")
+
+        finished = CustomerImportJobService.run_pending(stdout=self.stdout)
+
+        self.stdout.write(self.style.SUCCESS(f"Completed {finished} import(s)"))
@@ -0,0 +1,40 @@
+from django.db import migrations
+
+SEARCH_COLUMNS = [
+    "full_name",
+    "phone",
+    "username",
+]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    # GIN trigram indexes are PostgreSQL-only; SQLite uses the FTS5
+    # table that SearchService creates on first use.
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for column in SEARCH_COLUMNS:
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS customer_{column}_trgm "
+            f"ON customers_customer USING gin ({column} gin_trgm_ops)"
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    for column in SEARCH_COLUMNS:
+        schema_editor.execute(f"DROP INDEX IF EXISTS customer_{column}_trgm")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0002_alter_customer_password_alter_customer_username'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 6.0.2 on 2026-10-18 17:22
+
+from django.db import migrations, models
+
+from livetrack1.phone import normalize_phone
+
+
+def populate_phone_digits(apps, schema_editor):
+    Customer = apps.get_model("customers", "Customer")
+
+    batch = []
+    for customer in Customer.objects.only("id", "phone").iterator(chunk_size=2000):
+        customer.phone_digits = normalize_phone(customer.phone)
+        customer.phone_reversed = customer.phone_digits[::-1]
+        batch.append(customer)
+        if len(batch) >= 2000:
+            Customer.objects.bulk_update(batch, ["phone_digits", "phone_reversed"])
+            batch = []
+
+    if batch:
+        Customer.objects.bulk_update(batch, ["phone_digits", "phone_reversed"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0004_customer_created_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customer',
+            name='phone_digits',
+            field=models.CharField(blank=True, default='', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='customer',
+            name='phone_reversed',
+            field=models.CharField(blank=True, default='', max_length=20),
+        ),
+        migrations.RunPython(populate_phone_digits, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(fields=['phone_digits'], name='customer_phone_digits_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(fields=['phone_reversed'], name='customer_phone_reversed_idx'),
+        ),
+    ]
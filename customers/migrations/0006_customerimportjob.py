@@ -0,0 +1,42 @@
+# Generated by Django 6.0.2 on 2026-10-18 17:28
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0005_phone_digits'),
+        ('distributors', '0002_rename_location_distributor_area'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CustomerImportJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('original_name', models.CharField(blank=True, default='', max_length=255)),
+                ('import_format', models.CharField(choices=[('csv', 'CSV'), ('xlsx', 'Excel'), ('ndjson', 'NDJSON')], max_length=10)),
+                ('source_path', models.CharField(blank=True, default='', max_length=500)),
+                ('error_report_path', models.CharField(blank=True, default='', max_length=500)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('RUNNING', 'Running'), ('COMPLETED', 'Completed'), ('FAILED', 'Failed')], default='PENDING', max_length=20)),
+                ('error', models.TextField(blank=True, null=True)),
+                ('processed_count', models.PositiveIntegerField(default=0)),
+                ('created_count', models.PositiveIntegerField(default=0)),
+                ('failed_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='customer_imports', to=settings.AUTH_USER_MODEL)),
+                ('distributor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='customer_imports', to='distributors.distributor')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
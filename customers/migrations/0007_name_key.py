@@ -0,0 +1,60 @@
+# Generated by Django 6.0.2 on 2026-10-18 17:29
+
+from django.db import migrations, models
+
+from livetrack1.names import name_key
+
+
+def populate_name_key(apps, schema_editor):
+    Customer = apps.get_model("customers", "Customer")
+
+    batch = []
+    for customer in Customer.objects.only("id", "full_name").iterator(chunk_size=2000):
+        customer.name_key = name_key(customer.full_name)
+        batch.append(customer)
+        if len(batch) >= 2000:
+            Customer.objects.bulk_update(batch, ["name_key"])
+            batch = []
+
+    if batch:
+        Customer.objects.bulk_update(batch, ["name_key"])
+
+
+def create_trigram_index(apps, schema_editor):
+    # Serves the fuzzy "name_key % query" candidate lookup; pg_trgm was
+    # enabled in 0003.
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS customer_name_key_trgm "
+        "ON customers_customer USING gin (name_key gin_trgm_ops)"
+    )
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    schema_editor.execute("DROP INDEX IF EXISTS customer_name_key_trgm")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0006_customerimportjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customer',
+            name='name_key',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.RunPython(populate_name_key, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(fields=['name_key'], name='customer_name_key_idx'),
+        ),
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
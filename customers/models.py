@@ -1,7 +1,35 @@
+import uuid
+
 from django.db import models
 
+from livetrack1.names import name_key
+from livetrack1.phone import PhoneDigitsMixin, PhoneNormalizingQuerySet
+
+
+class CustomerQuerySet(PhoneNormalizingQuerySet):
+    """Also keeps name_key in sync on the paths that skip Model.save()."""
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        for obj in objs:
+            obj.name_key = name_key(obj.full_name)
+        return super().bulk_create(objs, *args, **kwargs)
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        if "full_name" in fields:
+            objs = list(objs)
+            for obj in objs:
+                obj.name_key = name_key(obj.full_name)
+            fields = [*fields, "name_key"]
+        return super().bulk_update(objs, fields, *args, **kwargs)
 
-class Customer(models.Model):
+    def update(self, **kwargs):
+        if isinstance(kwargs.get("full_name"), str):
+            kwargs["name_key"] = name_key(kwargs["full_name"])
+        return super().update(**kwargs)
+
+
+class Customer(PhoneDigitsMixin, models.Model):
     distributor = models.ForeignKey(
         "distributors.Distributor",
         on_delete=models.SET_NULL,
@@ -11,10 +39,15 @@ class Customer(models.Model):
     )
 
     full_name = models.CharField(max_length=255)
+    # Duplicate-detection key derived from full_name; see livetrack1.names.
+    name_key = models.CharField(max_length=255, blank=True, default="")
     username = models.CharField(max_length=150, unique=True)
     password = models.CharField(max_length=255)
 
     phone = models.CharField(max_length=20)
+    # Derived from phone on every write path; see livetrack1.phone.
+    phone_digits = models.CharField(max_length=20, blank=True, default="")
+    phone_reversed = models.CharField(max_length=20, blank=True, default="")
     location = models.CharField(max_length=255)
 
     vlan = models.CharField(max_length=100, blank=True, null=True)
@@ -23,5 +56,103 @@ class Customer(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Customer list keyset pagination.
+            models.Index(fields=["created_at", "id"], name="customer_created_id_idx"),
+            # Exact, prefix and suffix (reversed) phone lookups.
+            models.Index(fields=["phone_digits"], name="customer_phone_digits_idx"),
+            models.Index(fields=["phone_reversed"], name="customer_phone_reversed_idx"),
+            # Exact name-key matches; fuzzy ones use a trigram index on
+            # PostgreSQL (migration 0007).
+            models.Index(fields=["name_key"], name="customer_name_key_idx"),
+        ]
+
+    objects = CustomerQuerySet.as_manager()
+
+    def save(self, *args, **kwargs):
+        self.name_key = name_key(self.full_name)
+
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "full_name" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "name_key"}
+
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return self.full_name
+
+
+class CustomerImportJob(models.Model):
+    """
+    A bulk customer import run by the background worker.  The uploaded
+    file is kept at ``source_path`` until the job finishes; rejected rows
+    are written to a CSV at ``error_report_path``.
+    """
+
+    STATUS_CHOICES = [
+        ("PENDING", "Pending"),
+        ("RUNNING", "Running"),
+        ("COMPLETED", "Completed"),
+        ("FAILED", "Failed"),
+    ]
+
+    FORMAT_CHOICES = [
+        ("csv", "CSV"),
+        ("xlsx", "Excel"),
+        ("ndjson", "NDJSON"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+
+    created_by = models.ForeignKey(
+        "admins.Admin",
+        on_delete=models.CASCADE,
+        related_name="customer_imports"
+    )
+
+    # Applied to rows that don't name a distributor themselves.
+    distributor = models.ForeignKey(
+        "distributors.Distributor",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="customer_imports"
+    )
+
+    original_name = models.CharField(max_length=255, blank=True, default="")
+    import_format = models.CharField(max_length=10, choices=FORMAT_CHOICES)
+    source_path = models.CharField(max_length=500, blank=True, default="")
+    error_report_path = models.CharField(max_length=500, blank=True, default="")
+
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default="PENDING"
+    )
+    error = models.TextField(blank=True, null=True)
+
+    processed_count = models.PositiveIntegerField(default=0)
+    created_count = models.PositiveIntegerField(default=0)
+    failed_count = models.PositiveIntegerField(default=0)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # Bumped after every chunk; a RUNNING job that stops moving is stale.
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    @property
+    def throughput(self):
+        """Rows per second since the job started."""
+        if not self.started_at or not self.processed_count:
+            return None
+        end = self.finished_at or self.updated_at
+        elapsed = (end - self.started_at).total_seconds()
+        return round(self.processed_count / elapsed, 1) if elapsed > 0 else None
+
+    def __str__(self):
+        return f"Import {self.id} ({self.status})"
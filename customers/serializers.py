@@ -1,5 +1,9 @@
+from django.urls import reverse
 from rest_framework import serializers
-from .models import Customer
+
+from ticket_replies.models import TicketReply
+
+from .models import Customer, CustomerImportJob
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
@@ -83,3 +87,52 @@ class UpdateCustomerSerializer(serializers.ModelSerializer ):
             "notes",
         ]
 
+
+class CustomerImportJobSerializer(serializers.ModelSerializer):
+    throughput = serializers.FloatField(read_only=True)
+    error_report_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = CustomerImportJob
+        fields = [
+            "id",
+            "status",
+            "original_name",
+            "import_format",
+            "distributor",
+            "processed_count",
+            "created_count",
+            "failed_count",
+            "throughput",
+            "error",
+            "error_report_url",
+            "created_at",
+            "started_at",
+            "finished_at",
+        ]
+
+    def get_error_report_url(self, obj):
+        if not obj.failed_count:
+            return None
+        url = reverse("customer-import-job-errors", args=[obj.id])
+        request = self.context.get("request")
+        return request.build_absolute_uri(url) if request else url
+
+
+class CustomerOverviewReplySerializer(serializers.ModelSerializer):
+    """Latest reply of a ticket in the customer overview; expects ``admin`` selected."""
+
+    admin = serializers.SerializerMethodField()
+
+    class Meta:
+        model = TicketReply
+        fields = [
+            "id",
+            "status",
+            "note",
+            "admin",
+            "created_at",
+        ]
+
+    def get_admin(self, obj):
+        return {"id": obj.admin_id, "full_name": obj.admin.full_name}
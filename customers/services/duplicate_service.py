@@ -0,0 +1,269 @@
+import logging
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import (BooleanField, Count, ExpressionWrapper, F,
+                              FloatField, Func, Q, Value)
+from django.db.models.functions import Length, Substr
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from customers.models import Customer
+from livetrack1.names import name_key
+from livetrack1.phone import SUFFIX_DIGITS, normalize_phone, phone_lookup
+
+logger = logging.getLogger("tickets")
+
+
+class TrigramSimilarity(Func):
+    function = "similarity"
+    output_field = FloatField()
+
+
+class TrigramMatches(Func):
+    # "a % b": similarity above pg_trgm.similarity_threshold; served by a
+    # gin_trgm_ops index on the left-hand column.
+    arg_joiner = " %% "
+    template = "(%(expressions)s)"
+    output_field = BooleanField()
+
+
+class DuplicateCustomer(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "A customer with this phone already exists."
+    default_code = "duplicate_customer"
+
+    def __init__(self, candidates):
+        super().__init__()
+        # Set directly: APIException would turn every value into a string.
+        self.detail = {
+            "error": f"{self.default_detail} Send allow_duplicate=true to create it anyway.",
+            "candidates": candidates,
+        }
+
+
+class CustomerDuplicateService:
+    """
+    Finds customers that are probably the same subscriber.
+
+    Blocking keys, all indexed: the last SUFFIX_DIGITS digits of the
+    phone (via the reversed-digits column), the normalized name key, and
+    on PostgreSQL trigram similarity of the name key.  Lookups for one
+    new customer are a single query; the batch report groups on the same
+    keys instead of comparing every pair.
+    """
+
+    # Shorter numbers (extensions, typos) match too much to block on.
+    MIN_PHONE_DIGITS = 7
+    CANDIDATE_LIMIT = 10
+    # pg_trgm's default similarity_threshold, which "%" applies at create time.
+    SIMILAR_NAME_MIN = 0.3
+    # The batch report is stricter: it runs over every customer.
+    SIMILARITY_THRESHOLD = 0.6
+
+    @staticmethod
+    def phone_key(phone) -> str:
+        digits = normalize_phone(phone)
+        if len(digits) < CustomerDuplicateService.MIN_PHONE_DIGITS:
+            return ""
+        return digits[-SUFFIX_DIGITS:]
+
+    @staticmethod
+    def _fuzzy_names() -> bool:
+        return connection.vendor == "postgresql"
+
+    # ============================================================
+    # Create time
+    # ============================================================
+
+    @staticmethod
+    def candidates(full_name, phone, exclude_id=None, limit=None) -> list:
+        """
+        Existing customers sharing the phone, the name key or (PostgreSQL)
+        a similar name key, phone matches first.
+        """
+        key = name_key(full_name)
+        phone_digits = CustomerDuplicateService.phone_key(phone)
+        fuzzy = CustomerDuplicateService._fuzzy_names()
+
+        condition = Q(pk__in=[])
+        phone_match = Value(False, output_field=BooleanField())
+        if phone_digits:
+            match = phone_lookup("phone_digits", "phone_reversed", phone_digits, "suffix")
+            condition |= match
+            phone_match = ExpressionWrapper(match, output_field=BooleanField())
+
+        if key:
+            condition |= Q(name_key=key)
+            if fuzzy:
+                condition |= Q(TrigramMatches(F("name_key"), Value(key)))
+
+        queryset = Customer.objects.filter(condition).annotate(phone_match=phone_match)
+        if exclude_id:
+            queryset = queryset.exclude(pk=exclude_id)
+
+        if fuzzy and key:
+            queryset = queryset.annotate(
+                name_similarity=TrigramSimilarity("name_key", Value(key))
+            ).order_by("-phone_match", "-name_similarity", "id")
+        else:
+            queryset = queryset.annotate(
+                name_similarity=Value(None, output_field=FloatField())
+            ).order_by("-phone_match", "id")
+
+        rows = queryset.values(
+            "id", "full_name", "username", "phone", "distributor_id",
+            "name_key", "phone_match", "name_similarity",
+        )[:limit or CustomerDuplicateService.CANDIDATE_LIMIT]
+
+        candidates = []
+        for row in rows:
+            reasons = []
+            if row["phone_match"]:
+                reasons.append("phone")
+            if key and row["name_key"] == key:
+                reasons.append("name")
+            elif (row["name_similarity"] or 0) >= CustomerDuplicateService.SIMILAR_NAME_MIN:
+                reasons.append("similar_name")
+
+            candidates.append({
+                "id": row["id"],
+                "full_name": row["full_name"],
+                "username": row["username"],
+                "phone": row["phone"],
+                "distributor": row["distributor_id"],
+                "reasons": reasons,
+                "name_similarity": (
+                    1.0 if "name" in reasons
+                    else round(row["name_similarity"], 3) if row["name_similarity"] is not None
+                    else None
+                ),
+            })
+
+        return candidates
+
+    @staticmethod
+    def phone_conflict() -> bool:
+        return getattr(settings, "CUSTOMER_DUPLICATE_PHONE_CONFLICT", False)
+
+    @staticmethod
+    def check(full_name, phone, allow_duplicate=False) -> list:
+        """
+        Candidates for a customer about to be created, returned to the
+        caller as warnings.  With CUSTOMER_DUPLICATE_PHONE_CONFLICT on, a
+        phone match is refused with 409 unless ``allow_duplicate``.
+        """
+        candidates = CustomerDuplicateService.candidates(full_name, phone)
+
+        if (
+            CustomerDuplicateService.phone_conflict()
+            and not allow_duplicate
+            and any("phone" in c["reasons"] for c in candidates)
+        ):
+            raise DuplicateCustomer(candidates)
+
+        return candidates
+
+    # ============================================================
+    # Batch report
+    # ============================================================
+
+    @staticmethod
+    def clusters(fuzzy=False, threshold=None) -> list:
+        """
+        Groups of customer ids linked by a shared phone suffix, name key
+        or (``fuzzy``, PostgreSQL only) similar name key.  Returns
+        ``[{"ids": [...], "reasons": [...]}]``, biggest groups first.
+        """
+        parent = {}
+        edge_reasons = defaultdict(set)
+
+        def find(node):
+            parent.setdefault(node, node)
+            while parent[node] != node:
+                parent[node] = parent[parent[node]]
+                node = parent[node]
+            return node
+
+        def union(a, b, reason):
+            root_a, root_b = find(a), find(b)
+            if root_a != root_b:
+                parent[max(root_a, root_b)] = min(root_a, root_b)
+            edge_reasons[a].add(reason)
+            edge_reasons[b].add(reason)
+
+        for a, b, reason in CustomerDuplicateService._key_pairs():
+            union(a, b, reason)
+
+        if fuzzy:
+            for a, b in CustomerDuplicateService._similar_pairs(
+                threshold or CustomerDuplicateService.SIMILARITY_THRESHOLD
+            ):
+                union(a, b, "similar_name")
+
+        groups = defaultdict(list)
+        for node in parent:
+            groups[find(node)].append(node)
+
+        clusters = [
+            {
+                "ids": sorted(ids),
+                "reasons": sorted(set().union(*(edge_reasons[i] for i in ids))),
+            }
+            for ids in groups.values()
+            if len(ids) > 1
+        ]
+        clusters.sort(key=lambda cluster: (-len(cluster["ids"]), cluster["ids"][0]))
+        return clusters
+
+    @staticmethod
+    def _key_pairs():
+        """Links each member of a shared-key group to the group's first id."""
+        blocking_keys = [
+            (
+                "phone",
+                Customer.objects.annotate(digits_length=Length("phone_digits")).filter(
+                    digits_length__gte=CustomerDuplicateService.MIN_PHONE_DIGITS
+                ).annotate(dup_key=Substr("phone_reversed", 1, SUFFIX_DIGITS)),
+            ),
+            (
+                "name",
+                Customer.objects.exclude(name_key="").annotate(dup_key=F("name_key")),
+            ),
+        ]
+
+        for reason, queryset in blocking_keys:
+            shared = queryset.values("dup_key").annotate(
+                members=Count("id")
+            ).filter(members__gt=1).values("dup_key")
+
+            members = queryset.filter(dup_key__in=shared).order_by(
+                "dup_key", "id"
+            ).values_list("dup_key", "id")
+
+            current_key, first_id = None, None
+            for dup_key, customer_id in members.iterator(chunk_size=5000):
+                if dup_key != current_key:
+                    current_key, first_id = dup_key, customer_id
+                    continue
+                yield first_id, customer_id, reason
+
+    @staticmethod
+    def _similar_pairs(threshold):
+        if not CustomerDuplicateService._fuzzy_names():
+            logger.warning("Fuzzy duplicate matching needs PostgreSQL (pg_trgm); skipped")
+            return []
+
+        table = Customer._meta.db_table
+
+        # Index nested loop: every row probes the trigram index once,
+        # instead of a comparison against every other row.
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute("SELECT set_config('pg_trgm.similarity_threshold', %s, true)", [str(threshold)])
+            cursor.execute(
+                f"SELECT a.id, b.id FROM {table} a "
+                f"JOIN {table} b ON a.name_key %% b.name_key AND a.id < b.id "
+                f"WHERE a.name_key <> '' AND a.name_key <> b.name_key"
+            )
+            return cursor.fetchall()
@@ -0,0 +1,255 @@
+import csv
+import json
+import logging
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from customers.models import CustomerImportJob
+from customers.services.import_service import CustomerImportService
+
+logger = logging.getLogger("tickets")
+
+
+class CustomerImportJobService:
+    """
+    Bulk customer imports off the request path.
+
+    The upload is copied under CUSTOMER_IMPORT_ROOT and a PENDING job is
+    created; after commit the job runs on a process-local thread pool
+    through CustomerImportService, saving its counters after every
+    chunk.  Rejected rows go to a CSV error report.  Jobs lost with the
+    process are resumed by ``run_customer_imports`` from the last
+    committed chunk.
+    """
+
+    FORMATS = {".csv": "csv", ".xlsx": "xlsx", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+    CHUNK_SIZE = 64 * 1024
+    STALE_AFTER = timedelta(minutes=10)
+
+    _executor = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def import_root() -> str:
+        return str(settings.CUSTOMER_IMPORT_ROOT)
+
+    @staticmethod
+    def detect_format(filename: str):
+        return CustomerImportJobService.FORMATS.get(os.path.splitext(filename or "")[1].lower())
+
+    # ============================================================
+    # Request side
+    # ============================================================
+
+    @staticmethod
+    def create(*, admin, uploaded_file, import_format, distributor=None) -> CustomerImportJob:
+        job_id = uuid.uuid4()
+        directory = os.path.join(CustomerImportJobService.import_root(), "sources")
+        os.makedirs(directory, exist_ok=True)
+        source_path = os.path.join(directory, f"{job_id}.{import_format}")
+
+        with open(source_path, "wb") as out:
+            for chunk in uploaded_file.chunks(CustomerImportJobService.CHUNK_SIZE):
+                out.write(chunk)
+
+        try:
+            job = CustomerImportJob.objects.create(
+                id=job_id,
+                created_by=admin,
+                distributor=distributor,
+                original_name=os.path.basename(uploaded_file.name or "")[:255],
+                import_format=import_format,
+                source_path=source_path,
+            )
+        except BaseException:
+            CustomerImportJobService._unlink(source_path)
+            raise
+
+        CustomerImportJobService.submit(job.id)
+        return job
+
+    @staticmethod
+    def submit(job_id):
+        def enqueue():
+            if getattr(settings, "CUSTOMER_IMPORT_SYNC", False):
+                CustomerImportJobService.run(job_id)
+            else:
+                CustomerImportJobService.executor().submit(
+                    CustomerImportJobService.run_job, job_id
+                )
+
+        transaction.on_commit(enqueue)
+
+    @staticmethod
+    def executor() -> ThreadPoolExecutor:
+        with CustomerImportJobService._lock:
+            if CustomerImportJobService._executor is None:
+                CustomerImportJobService._executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, "CUSTOMER_IMPORT_WORKERS", 1),
+                    thread_name_prefix="customer-import",
+                )
+            return CustomerImportJobService._executor
+
+    # ============================================================
+    # Worker side
+    # ============================================================
+
+    @staticmethod
+    def run_job(job_id):
+        close_old_connections()
+        try:
+            CustomerImportJobService.run(job_id)
+        except Exception:
+            logger.exception(f"Customer import {job_id}: crashed")
+        finally:
+            close_old_connections()
+
+    @staticmethod
+    def run(job_id) -> bool:
+        claimed = CustomerImportJob.objects.filter(
+            id=job_id,
+            status="PENDING",
+        ).update(status="RUNNING", started_at=timezone.now(), updated_at=timezone.now())
+
+        if not claimed:
+            return False
+
+        job = CustomerImportJob.objects.get(id=job_id)
+
+        try:
+            CustomerImportJobService._run(job)
+        except Exception as exc:
+            logger.warning(f"Customer import {job_id}: failed: {exc}")
+            CustomerImportJob.objects.filter(id=job_id).update(
+                status="FAILED",
+                error=str(exc)[:1000],
+                finished_at=timezone.now(),
+            )
+            return False
+
+        CustomerImportJob.objects.filter(id=job_id).update(
+            status="COMPLETED",
+            finished_at=timezone.now(),
+        )
+        CustomerImportJobService._unlink(job.source_path)
+        return True
+
+    @staticmethod
+    def _run(job):
+        if not job.error_report_path:
+            job.error_report_path = os.path.join(
+                CustomerImportJobService.import_root(), "reports", f"{job.id}.csv"
+            )
+            os.makedirs(os.path.dirname(job.error_report_path), exist_ok=True)
+            CustomerImportJob.objects.filter(id=job.id).update(
+                error_report_path=job.error_report_path
+            )
+
+        # A resumed job skips the rows of chunks that already committed.
+        done = {
+            "processed": job.processed_count,
+            "created": job.created_count,
+            "failed": job.failed_count,
+        }
+
+        # Runs in the chunk's transaction: the counters, and with them the
+        # resume point, commit together with the rows they count.
+        def on_chunk(result):
+            report.flush()
+            CustomerImportJob.objects.filter(id=job.id).update(
+                processed_count=done["processed"] + result["total"],
+                created_count=done["created"] + result["created"],
+                failed_count=done["failed"] + result["failed"],
+                updated_at=timezone.now(),
+            )
+
+        with open(job.error_report_path, "a", newline="", encoding="utf-8") as report:
+            writer = csv.writer(report)
+            if report.tell() == 0:
+                writer.writerow(["row", "username", "field", "message"])
+
+            def on_error(error):
+                for field, messages in error["errors"].items():
+                    for message in CustomerImportJobService._messages(messages):
+                        writer.writerow([error["row"], error["username"] or "", field, message])
+
+            rows = islice(CustomerImportJobService.rows(job), job.processed_count, None)
+
+            CustomerImportService.import_rows(
+                rows,
+                on_error=on_error,
+                on_chunk=on_chunk,
+                dedupe_phones=True,
+                distributor_id=job.distributor_id,
+            )
+
+    @staticmethod
+    def rows(job):
+        if job.import_format == "xlsx":
+            yield from CustomerImportService.iter_xlsx(job.source_path)
+            return
+
+        with open(job.source_path, "rb") as source:
+            if job.import_format == "csv":
+                yield from CustomerImportService.iter_csv(source)
+            else:
+                yield from CustomerImportService.iter_ndjson(source)
+
+    @staticmethod
+    def _messages(messages):
+        if isinstance(messages, (list, tuple)):
+            return [str(message) for message in messages]
+        if isinstance(messages, dict):
+            return [json.dumps(messages, default=str)]
+        return [str(messages)]
+
+    @staticmethod
+    def _unlink(path):
+        if not path:
+            return
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+    # ============================================================
+    # Recovery
+    # ============================================================
+
+    @staticmethod
+    def requeue_stale(stale_after=None) -> int:
+        """
+        RUNNING jobs whose counters stopped moving died with their
+        process; put them back so they resume.
+        """
+        stale_after = stale_after or CustomerImportJobService.STALE_AFTER
+        cutoff = timezone.now() - stale_after
+
+        return CustomerImportJob.objects.filter(
+            status="RUNNING",
+            updated_at__lt=cutoff,
+        ).update(status="PENDING")
+
+    @staticmethod
+    def run_pending(stdout=None) -> int:
+        finished = 0
+
+        pending = CustomerImportJob.objects.filter(
+            status="PENDING"
+        ).order_by("created_at").values_list("id", flat=True)
+
+        for job_id in list(pending):
+            if CustomerImportJobService.run(job_id):
+                finished += 1
+                if stdout:
+                    stdout.write(f"... import {job_id} completed")
+
+        return finished
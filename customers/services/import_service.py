@@ -0,0 +1,284 @@
+import csv
+import io
+import json
+import logging
+
+from django.db import IntegrityError, transaction
+from rest_framework import serializers
+
+from customers.models import Customer
+from distributors.models import Distributor
+from livetrack1.phone import normalize_phone
+
+logger = logging.getLogger("tickets")
+
+
+class CustomerImportRowSerializer(serializers.ModelSerializer):
+    """
+    Field validation only.  Username uniqueness and distributor existence
+    are checked per chunk by CustomerImportService, so validating a row
+    costs no queries.
+    """
+
+    username = serializers.CharField(max_length=150)
+    distributor = serializers.IntegerField(required=False, allow_null=True)
+
+    class Meta:
+        model = Customer
+        fields = [
+            "distributor",
+            "full_name",
+            "username",
+            "password",
+            "phone",
+            "location",
+            "vlan",
+            "speed",
+            "notes",
+        ]
+
+    def to_internal_value(self, data):
+        # CSV cells are always strings; treat empty ones as missing.
+        data = {
+            key: value for key, value in data.items()
+            if key and value not in ("", None)
+        }
+        return super().to_internal_value(data)
+
+
+class _ReadableStream(io.RawIOBase):
+    # Lets TextIOWrapper decode any object with read() (e.g. the WSGI
+    # request), which itself lacks the io.BufferedIOBase interface.
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self.stream.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+
+class CustomerImportService:
+
+    BATCH_SIZE = 1000
+    MAX_BATCH_SIZE = 5000
+    ERROR_LIMIT = 1000
+
+    # ============================================================
+    # Row sources (lazy; nothing is read ahead)
+    # ============================================================
+
+    @staticmethod
+    def text_stream(stream):
+        return io.TextIOWrapper(
+            io.BufferedReader(_ReadableStream(stream), 64 * 1024),
+            encoding="utf-8-sig",
+            errors="replace",
+            newline="",
+        )
+
+    @staticmethod
+    def iter_csv(stream):
+        reader = csv.DictReader(CustomerImportService.text_stream(stream))
+        for row in reader:
+            yield reader.line_num, row
+
+    @staticmethod
+    def iter_ndjson(stream):
+        for line_no, line in enumerate(CustomerImportService.text_stream(stream), start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                yield line_no, None
+                continue
+            yield line_no, row if isinstance(row, dict) else None
+
+    @staticmethod
+    def iter_xlsx(path):
+        """First sheet, header on the first row.  Needs openpyxl."""
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise ValueError("XLSX imports need openpyxl installed")
+
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            rows = workbook.worksheets[0].iter_rows(values_only=True)
+            header = [str(cell).strip() if cell is not None else "" for cell in next(rows, ())]
+
+            for row_no, values in enumerate(rows, start=2):
+                if all(value is None for value in values):
+                    continue
+                yield row_no, {
+                    key: CustomerImportService._cell(value)
+                    for key, value in zip(header, values)
+                }
+        finally:
+            workbook.close()
+
+    @staticmethod
+    def _cell(value):
+        # Excel stores phone numbers and VLANs as floats.
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)
+        return "" if value is None else str(value)
+
+    # ============================================================
+    # Import
+    # ============================================================
+
+    @staticmethod
+    def import_rows(rows, batch_size=None, on_error=None, error_limit=None,
+                    on_chunk=None, dedupe_phones=False, distributor_id=None) -> dict:
+        """
+        Validate and insert ``(row_number, dict)`` pairs chunk by chunk.
+        Bad rows are reported and skipped; every chunk commits on its own.
+
+        Errors go to ``on_error(error)`` when given, otherwise the first
+        ``error_limit`` are returned in the result.  ``on_chunk(result)``
+        runs at the end of each chunk, inside its transaction, so what it
+        writes commits together with the chunk's rows.  With ``dedupe_phones`` a row
+        whose phone already belongs to a customer is rejected too.
+        ``distributor_id`` is used for rows that don't set one.
+        """
+        batch_size = min(
+            batch_size or CustomerImportService.BATCH_SIZE,
+            CustomerImportService.MAX_BATCH_SIZE,
+        )
+        error_limit = CustomerImportService.ERROR_LIMIT if error_limit is None else error_limit
+
+        result = {"total": 0, "created": 0, "failed": 0, "errors": [], "errors_truncated": False}
+
+        def report(row_number, username, errors):
+            result["failed"] += 1
+            error = {"row": row_number, "username": username, "errors": errors}
+            if on_error is not None:
+                on_error(error)
+            elif len(result["errors"]) < error_limit:
+                result["errors"].append(error)
+            else:
+                result["errors_truncated"] = True
+
+        context = {
+            "usernames": set(),
+            "phones": set() if dedupe_phones else None,
+            "distributor_id": distributor_id,
+        }
+        chunk = []
+
+        def flush():
+            with transaction.atomic():
+                CustomerImportService._import_chunk(chunk, context, result, report)
+                result["total"] += len(chunk)
+                if on_chunk is not None:
+                    on_chunk(result)
+
+        for row_number, row in rows:
+            chunk.append((row_number, row))
+            if len(chunk) >= batch_size:
+                flush()
+                chunk = []
+
+        if chunk:
+            flush()
+
+        logger.info(
+            f"Customer import: {result['created']} created, "
+            f"{result['failed']} failed of {result['total']}"
+        )
+        return result
+
+    @staticmethod
+    def _import_chunk(chunk, context, result, report):
+        # One serializer for the whole chunk: DRF rebuilds a ModelSerializer's
+        # fields per instance, which costs more than validating the row.
+        serializer = CustomerImportRowSerializer()
+        valid = []
+
+        for row_number, row in chunk:
+            if row is None:
+                report(row_number, None, {"row": ["Not a valid JSON object."]})
+                continue
+
+            try:
+                data = serializer.run_validation(row)
+            except serializers.ValidationError as exc:
+                report(row_number, row.get("username"), exc.detail)
+                continue
+
+            if data["username"] in context["usernames"]:
+                report(row_number, data["username"], {"username": ["Duplicate username in this import."]})
+                continue
+
+            if context["phones"] is not None:
+                digits = normalize_phone(data["phone"])
+                if digits and digits in context["phones"]:
+                    report(row_number, data["username"], {"phone": ["Duplicate phone in this import."]})
+                    continue
+                context["phones"].add(digits)
+
+            context["usernames"].add(data["username"])
+            valid.append((row_number, data))
+
+        if not valid:
+            return
+
+        # One IN query per chunk for each cross-row check.
+        taken = set(
+            Customer.objects.filter(
+                username__in=[data["username"] for _, data in valid]
+            ).values_list("username", flat=True)
+        )
+        for _, data in valid:
+            data["distributor"] = data.get("distributor") or context["distributor_id"]
+
+        distributor_ids = {data["distributor"] for _, data in valid if data["distributor"]}
+        known_distributors = set(
+            Distributor.objects.filter(id__in=distributor_ids).values_list("id", flat=True)
+        )
+        phones_taken = set()
+        if context["phones"] is not None:
+            phones_taken = set(
+                Customer.objects.filter(
+                    phone_digits__in=[normalize_phone(data["phone"]) for _, data in valid]
+                ).exclude(phone_digits="").values_list("phone_digits", flat=True)
+            )
+
+        pending = []
+        for row_number, data in valid:
+            if data["username"] in taken:
+                report(row_number, data["username"], {"username": ["customer with this username already exists."]})
+                continue
+
+            if phones_taken and normalize_phone(data["phone"]) in phones_taken:
+                report(row_number, data["username"], {"phone": ["A customer with this phone already exists."]})
+                continue
+
+            distributor_id = data.pop("distributor")
+            if distributor_id and distributor_id not in known_distributors:
+                report(row_number, data["username"], {"distributor": [f"Distributor {distributor_id} does not exist."]})
+                continue
+
+            pending.append((row_number, Customer(distributor_id=distributor_id, **data)))
+
+        try:
+            with transaction.atomic():
+                Customer.objects.bulk_create([customer for _, customer in pending])
+            result["created"] += len(pending)
+        except IntegrityError:
+            # Someone inserted one of these usernames meanwhile; fall back
+            # to row-by-row so only the conflicting rows fail.
+            for row_number, customer in pending:
+                try:
+                    with transaction.atomic():
+                        customer.save()
+                    result["created"] += 1
+                except IntegrityError:
+                    report(row_number, customer.username, {"username": ["customer with this username already exists."]})
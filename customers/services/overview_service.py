@@ -0,0 +1,153 @@
+import hashlib
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery
+
+from customers.models import Customer
+from customers.serializers import (CustomerListSerializer,
+                                   CustomerOverviewReplySerializer)
+from ticket_replies.models import TicketReply
+from tickets.models import Ticket
+from tickets.serializers import CustomerTicketCardSerializer
+
+
+class CustomerOverviewService:
+    """
+    Everything an operator needs on a call, in one payload: profile,
+    distributor, ticket counts by status, recent tickets and the latest
+    reply of each open ticket.
+
+    Cached like the ticket detail: the version (-> ETag) hashes the
+    profile columns and the customer's ticket/reply counts and newest
+    timestamps, read in one query, so a stale payload is never served
+    even with a per-process cache.  Ticket, reply and customer writes
+    also drop the entry explicitly.  A miss costs at most five more
+    queries.
+    """
+
+    key_prefix = "customer-overview"
+    timeout = 60 * 60
+
+    RECENT_TICKETS = 10
+    OPEN_TICKETS = 20
+
+    PROFILE_FIELDS = [
+        "full_name", "username", "phone", "location", "vlan", "speed",
+        "notes", "distributor_id", "distributor__name",
+    ]
+
+    @staticmethod
+    def _key(customer_id) -> str:
+        return f"{CustomerOverviewService.key_prefix}:{customer_id}"
+
+    @staticmethod
+    def get_version(customer_id):
+        tickets = Ticket.objects.filter(customer=OuterRef("pk")).order_by()
+        replies = TicketReply.objects.filter(ticket__customer=OuterRef("pk")).order_by()
+
+        row = Customer.objects.filter(pk=customer_id).annotate(
+            ticket_count=Subquery(
+                tickets.values("customer").annotate(n=Count("pk")).values("n")
+            ),
+            tickets_updated_at=Subquery(
+                tickets.order_by("-updated_at").values("updated_at")[:1]
+            ),
+            reply_count=Subquery(
+                replies.values("ticket__customer").annotate(n=Count("pk")).values("n")
+            ),
+            last_reply_id=Subquery(replies.order_by("-id").values("id")[:1]),
+        ).values_list(
+            *CustomerOverviewService.PROFILE_FIELDS,
+            "ticket_count", "tickets_updated_at", "reply_count", "last_reply_id",
+        ).first()
+
+        if row is None:
+            return None
+
+        raw = f"{customer_id}:{row!r}"
+        return hashlib.sha1(raw.encode()).hexdigest()
+
+    @staticmethod
+    def get_payload(customer_id, version):
+        cached = cache.get(CustomerOverviewService._key(customer_id))
+        if cached and cached[0] == version:
+            return cached[1]
+        return None
+
+    @staticmethod
+    def set_payload(customer_id, version, payload):
+        cache.set(
+            CustomerOverviewService._key(customer_id),
+            (version, payload),
+            CustomerOverviewService.timeout,
+        )
+
+    @staticmethod
+    def invalidate(customer_id):
+        transaction.on_commit(
+            lambda: cache.delete(CustomerOverviewService._key(customer_id))
+        )
+
+    # ============================================================
+    # Payload
+    # ============================================================
+
+    @staticmethod
+    def build(customer_id):
+        customer = Customer.objects.select_related("distributor").filter(
+            pk=customer_id
+        ).first()
+        if customer is None:
+            return None
+
+        tickets = Ticket.objects.filter(customer=customer).order_by("-created_at", "-id")
+
+        counts = dict(
+            tickets.order_by().values("status").annotate(n=Count("pk")).values_list("status", "n")
+        )
+        ticket_counts = {value: counts.get(value, 0) for value, _ in Ticket.STATUS_CHOICES}
+        ticket_counts["total"] = sum(counts.values())
+
+        recent = list(tickets[:CustomerOverviewService.RECENT_TICKETS])
+
+        # Newest reply of each open ticket: one probe per ticket on the
+        # (ticket, created_at, id) index, then those replies by id.
+        newest = TicketReply.objects.filter(
+            ticket=OuterRef("pk")
+        ).order_by("-created_at", "-id").values("id")[:1]
+
+        open_tickets = list(
+            tickets.exclude(status="CLOSED").annotate(
+                latest_reply_id=Subquery(newest)
+            )[:CustomerOverviewService.OPEN_TICKETS]
+        )
+
+        reply_ids = [ticket.latest_reply_id for ticket in open_tickets if ticket.latest_reply_id]
+        latest_replies = {
+            reply.ticket_id: reply
+            for reply in TicketReply.objects.filter(id__in=reply_ids).select_related("admin")
+        } if reply_ids else {}
+
+        profile = dict(CustomerListSerializer(customer).data)
+        profile["notes"] = customer.notes
+
+        return {
+            "customer": profile,
+            "distributor": (
+                {"id": customer.distributor.id, "name": customer.distributor.name}
+                if customer.distributor else None
+            ),
+            "ticket_counts": ticket_counts,
+            "recent_tickets": list(CustomerTicketCardSerializer(recent, many=True).data),
+            "open_tickets": [
+                {
+                    **CustomerTicketCardSerializer(ticket).data,
+                    "latest_reply": (
+                        dict(CustomerOverviewReplySerializer(latest_replies[ticket.id]).data)
+                        if ticket.id in latest_replies else None
+                    ),
+                }
+                for ticket in open_tickets
+            ],
+        }
@@ -1,14 +1,23 @@
 from django.urls import path
 
 from .views import (BulkCreateCustomersAPI, CreateCustomerAPI,
-                    CustomerDetailAPI, ListCustomersAPI,
-                    ListCustomersAPIByPhone)
+                    CustomerDetailAPI, CustomerDuplicateCandidatesAPI,
+                    CustomerOverviewAPI,
+                    CustomerImportAPI, CustomerImportJobAPI,
+                    CustomerImportJobCreateAPI, CustomerImportJobErrorsAPI,
+                    ListCustomersAPI, ListCustomersAPIByPhone)
 
 urlpatterns = [
     path("", CreateCustomerAPI.as_view(), name="create-customer"),
     path("list/", ListCustomersAPI.as_view(), name="list-customers"),
     path("listbyphone/", ListCustomersAPIByPhone.as_view(), name="list-customers-by-phone"),
+    path("duplicates/", CustomerDuplicateCandidatesAPI.as_view(), name="customer-duplicates"),
     path("bulk-create/", BulkCreateCustomersAPI.as_view(), name="bulk-create-customers"),
+    path("import/", CustomerImportAPI.as_view(), name="import-customers"),
+    path("import-jobs/", CustomerImportJobCreateAPI.as_view(), name="customer-import-jobs"),
+    path("import-jobs/<uuid:job_id>/", CustomerImportJobAPI.as_view(), name="customer-import-job"),
+    path("import-jobs/<uuid:job_id>/errors/", CustomerImportJobErrorsAPI.as_view(), name="customer-import-job-errors"),
     path("<int:customer_id>/", CustomerDetailAPI.as_view(), name="customer-detail"),
     path("<int:customer_id>/", CustomerDetailAPI.as_view(), name="customer-detail"),
+    path("<int:customer_id>/overview/", CustomerOverviewAPI.as_view(), name="customer-overview"),
 ]
\ No newline at end of file
@@ -1,14 +1,39 @@
+import io
+import json
+from collections import OrderedDict
+
+import django_filters
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import F
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags, quote_etag
+from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.generics import ListAPIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from customers.models import Customer
+from customers.models import Customer, CustomerImportJob
 from customers.serializers import (CreateCustomerSerializer,
+                                   CustomerImportJobSerializer,
                                    CustomerListSerializer,
                                    CustomerListSerializerPhone,
                                    UpdateCustomerSerializer)
+from customers.services.duplicate_service import CustomerDuplicateService
+from customers.services.import_job_service import CustomerImportJobService
+from customers.services.import_service import CustomerImportService
+from customers.services.overview_service import CustomerOverviewService
+from distributors.models import Distributor
+from livetrack1.authentication import PrincipalJWTAuthentication
+from livetrack1.pagination import KeysetPagination
+from livetrack1.phone import phone_lookup
 from livetrack1.services.authorization_service import AuthorizationService
+from livetrack1.services.search_service import SearchService
+from tickets.services.snapshot_service import TicketSnapshotService
 
 # ============================================================
 # CREATE CUSTOMER
@@ -26,39 +51,148 @@ class CreateCustomerAPI(APIView):
 
         serializer = CreateCustomerSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
+
+        candidates = CustomerDuplicateService.check(
+            serializer.validated_data["full_name"],
+            serializer.validated_data["phone"],
+            allow_duplicate=request.data.get("allow_duplicate") in (True, "1", "true"),
+        )
         serializer.save()
 
         return Response(
-            {"message": "Customer created successfully"},
+            {
+                "message": "Customer created successfully",
+                "possible_duplicates": candidates,
+            },
             status=status.HTTP_201_CREATED
         )
 
 
+class CustomerDuplicateCandidatesAPI(APIView):
+    """
+    GET ?full_name=&phone= (&exclude=<id>): existing customers that look
+    like the same subscriber, for warning before a create or edit.
+    """
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [PrincipalJWTAuthentication]
+
+    def get(self, request):
+        if not AuthorizationService.can_create_ticket(request.user.role):
+            return Response(
+                {"error": "Only ADMIN and ROOT can list customers"},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        exclude_id = request.query_params.get("exclude") or None
+        if exclude_id is not None:
+            try:
+                exclude_id = int(exclude_id)
+            except ValueError:
+                return Response(
+                    {"error": "exclude must be a customer id"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+        candidates = CustomerDuplicateService.candidates(
+            request.query_params.get("full_name", ""),
+            request.query_params.get("phone", ""),
+            exclude_id=exclude_id,
+        )
+        return Response({"candidates": candidates})
+
+
 # ============================================================
 # LIST CUSTOMERS
 # ============================================================
 
-class ListCustomersAPI(APIView):
-    permission_classes = [IsAuthenticated]
+class CustomerFilter(django_filters.FilterSet):
 
-    def get(self, request):
+    class Meta:
+        model = Customer
+        fields = ["distributor", "speed", "vlan"]
+
+
+class CustomerCursorPagination(KeysetPagination):
+    page_size = 50
+    max_page_size = 500
+
+    def get_paginated_response(self, data):
+        # Same envelope as before pagination, plus the cursor links.
+        return Response(OrderedDict([
+            ("count", self.count),
+            ("next", self.get_next_link()),
+            ("previous", self.get_previous_link()),
+            ("customers", data),
+        ]))
+
+
+class ListCustomersAPI(ListAPIView):
+    """
+    Cursor-paginated customer list (``?cursor=``, ``?page_size=``,
+    ``?with_count=true``), filterable by distributor/speed/vlan.
+    ``?stream=true`` returns every matching customer as NDJSON instead,
+    written row by row from a server-side cursor.
+    """
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [PrincipalJWTAuthentication]
+    serializer_class = CustomerListSerializer
+    pagination_class = CustomerCursorPagination
+
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = CustomerFilter
+
+    stream_chunk_size = 2000
+    stream_fields = [
+        "id",
+        "full_name",
+        "username",
+        "phone",
+        "location",
+        "vlan",
+        "speed",
+        "distributor",
+        "created_at",
+    ]
+
+    def get_queryset(self):
+        customers = Customer.objects.select_related("distributor").order_by("-created_at")
+
+        search = self.request.query_params.get("search")
+        if search:
+            customers = SearchService.search(
+                customers,
+                search.replace(",", " ").split(),
+                ["full_name", "phone", "username"],
+                fts_table="customers_customer_fts",
+            ).order_by("-search_rank", "-created_at")
+
+        return customers
+
+    def list(self, request, *args, **kwargs):
         if not AuthorizationService.can_create_ticket(request.user.role):
             return Response(
                 {"error": "Only ADMIN and ROOT can list customers"},
                 status=status.HTTP_403_FORBIDDEN
             )
 
-        customers = Customer.objects.all()
-        serializer = CustomerListSerializer(customers, many=True)
+        if request.query_params.get("stream") in ("1", "true"):
+            return self.stream(self.filter_queryset(self.get_queryset()))
 
-        return Response(
-            {
-                "count": customers.count(),
-                "customers": serializer.data
-            },
-            status=status.HTTP_200_OK
+        return super().list(request, *args, **kwargs)
+
+    def stream(self, customers):
+        rows = (
+            customers
+            .values(*self.stream_fields, distributor_name=F("distributor__name"))
+            .iterator(chunk_size=self.stream_chunk_size)
         )
 
+        content = (
+            json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False) + "\n"
+            for row in rows
+        )
+        return StreamingHttpResponse(content, content_type="application/x-ndjson")
+
 
 # ============================================================
 # LIST CUSTOMERS BY PHONE
@@ -66,6 +200,7 @@ class ListCustomersAPI(APIView):
 
 class ListCustomersAPIByPhone(APIView):
     permission_classes = [IsAuthenticated]
+    authentication_classes = [PrincipalJWTAuthentication]
 
     def get(self, request):
         if not AuthorizationService.can_create_ticket(request.user.role):
@@ -75,10 +210,17 @@ class ListCustomersAPIByPhone(APIView):
             )
 
         phone = request.query_params.get("phone")
-        customers = Customer.objects.all()
+        customers = Customer.objects.select_related("distributor")
 
         if phone:
-            customers = customers.filter(phone__icontains=phone)
+            # Index probe on the normalized digits instead of a scan;
+            # ?match=exact|prefix|suffix, default picks by length.
+            match = request.query_params.get("match", "auto")
+            if match not in ("auto", "exact", "prefix", "suffix"):
+                raise ValidationError({"match": "Must be auto, exact, prefix or suffix."})
+            customers = customers.filter(
+                phone_lookup("phone_digits", "phone_reversed", phone, match)
+            )
 
         serializer = CustomerListSerializer(customers, many=True)
 
@@ -106,7 +248,7 @@ class CustomerDetailAPI(APIView):
             )
 
         try:
-            customer = Customer.objects.get(id=customer_id)
+            customer = Customer.objects.select_related("distributor").get(id=customer_id)
         except Customer.DoesNotExist:
             return Response(
                 {"error": "Customer not found"},
@@ -137,14 +279,27 @@ class CustomerDetailAPI(APIView):
             partial=True
         )
         serializer.is_valid(raise_exception=True)
-        serializer.save()
+
+        propagate = request.data.get("update_open_tickets")
+        if propagate is None:
+            propagate = TicketSnapshotService.enabled()
+        else:
+            propagate = propagate in (True, "1", "true")
+
+        with transaction.atomic():
+            serializer.save()
+            tickets_updated = (
+                TicketSnapshotService.refresh_customer(customer.id) if propagate else 0
+            )
+        CustomerOverviewService.invalidate(customer.id)
 
         updated_serializer = CustomerListSerializer(customer)
 
         return Response(
             {
                 "message": "Customer updated successfully",
-                "customer": updated_serializer.data
+                "customer": updated_serializer.data,
+                "tickets_updated": tickets_updated,
             },
             status=status.HTTP_200_OK
         )
@@ -173,6 +328,56 @@ class CustomerDetailAPI(APIView):
         )
 
 
+# ============================================================
+# CUSTOMER OVERVIEW (call handling)
+# ============================================================
+
+class CustomerOverviewAPI(APIView):
+    """
+    Profile, distributor, ticket counts by status, recent tickets and the
+    latest reply of each open ticket in one response.  One query when
+    the cached payload is current; ETag / If-None-Match supported.
+    """
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [PrincipalJWTAuthentication]
+
+    def get(self, request, customer_id):
+        if not AuthorizationService.can_create_ticket(request.user.role):
+            return Response(
+                {"error": "Only ADMIN and ROOT can view customers"},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        version = CustomerOverviewService.get_version(customer_id)
+        if version is None:
+            return Response(
+                {"error": "Customer not found"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        etag = quote_etag(version)
+
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            payload = CustomerOverviewService.get_payload(customer_id, version)
+
+            if payload is None:
+                payload = CustomerOverviewService.build(customer_id)
+                if payload is None:
+                    return Response(
+                        {"error": "Customer not found"},
+                        status=status.HTTP_404_NOT_FOUND
+                    )
+                CustomerOverviewService.set_payload(customer_id, version, payload)
+
+            response = Response(payload)
+
+        response["ETag"] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
 # ============================================================
 # BULK CREATE CUSTOMERS
 # ============================================================
@@ -207,4 +412,163 @@ class BulkCreateCustomersAPI(APIView):
         return Response(
             {"created": len(created), "ids": created_ids},
             status=status.HTTP_201_CREATED
-        )
\ No newline at end of file
+        )
+
+
+# ============================================================
+# STREAMING IMPORT
+# ============================================================
+
+class CustomerImportAPI(APIView):
+    """
+    POST a raw CSV (text/csv, header row) or NDJSON
+    (application/x-ndjson) body.  Rows are read from the request stream,
+    validated and inserted in chunks of ``?batch_size=``; invalid rows
+    are reported without stopping the rest.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        if not AuthorizationService.can_create_ticket(request.user.role):
+            return Response(
+                {"error": "Only ADMIN and ROOT can create customers"},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        import_format = request.query_params.get("import_format")
+        if not import_format:
+            content_type = request.content_type.split(";")[0].strip()
+            import_format = {
+                "text/csv": "csv",
+                "application/x-ndjson": "ndjson",
+                "application/jsonl": "ndjson",
+            }.get(content_type)
+
+        if import_format not in ("csv", "ndjson"):
+            return Response(
+                {"error": "Send text/csv or application/x-ndjson (or ?import_format=csv|ndjson)"},
+                status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+            )
+
+        try:
+            batch_size = int(request.query_params.get("batch_size", 0)) or None
+        except ValueError:
+            raise ValidationError({"batch_size": "Must be an integer."})
+
+        # request.data is never touched, so the body is not buffered.
+        stream = request.stream or io.BytesIO()
+        if import_format == "csv":
+            rows = CustomerImportService.iter_csv(stream)
+        else:
+            rows = CustomerImportService.iter_ndjson(stream)
+
+        result = CustomerImportService.import_rows(rows, batch_size=batch_size)
+
+        return Response(
+            result,
+            status=status.HTTP_201_CREATED if result["created"] else status.HTTP_200_OK
+        )
+
+
+# ============================================================
+# BACKGROUND IMPORT JOBS
+# ============================================================
+
+class CustomerImportJobCreateAPI(APIView):
+    """
+    Multipart upload of a CSV, XLSX or NDJSON file (``file``), with an
+    optional ``distributor`` for rows that don't name one.  Returns 202
+    with the job; poll its status URL for progress.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        if not AuthorizationService.can_create_ticket(request.user.role):
+            return Response(
+                {"error": "Only ADMIN and ROOT can create customers"},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        uploaded_file = request.FILES.get("file")
+        if uploaded_file is None:
+            raise ValidationError({"file": "This field is required."})
+
+        import_format = (
+            request.data.get("import_format")
+            or CustomerImportJobService.detect_format(uploaded_file.name)
+        )
+        if import_format not in ("csv", "xlsx", "ndjson"):
+            return Response(
+                {"error": "Upload a .csv, .xlsx or .ndjson file (or set import_format)"},
+                status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+            )
+
+        distributor = None
+        if request.data.get("distributor"):
+            distributor_id = str(request.data["distributor"])
+            if distributor_id.isdigit():
+                distributor = Distributor.objects.filter(id=distributor_id).first()
+            if distributor is None:
+                raise ValidationError({"distributor": "Distributor not found."})
+
+        job = CustomerImportJobService.create(
+            admin=request.user,
+            uploaded_file=uploaded_file,
+            import_format=import_format,
+            distributor=distributor,
+        )
+
+        return Response(
+            CustomerImportJobSerializer(job, context={"request": request}).data,
+            status=status.HTTP_202_ACCEPTED
+        )
+
+
+def get_import_job(request, job_id):
+    """Returns ``(job, None)`` or ``(None, error_response)``."""
+    job = CustomerImportJob.objects.filter(id=job_id).first()
+    if job is None:
+        return None, Response({"error": "Import not found"}, status=status.HTTP_404_NOT_FOUND)
+
+    if request.user.role != "ROOT" and job.created_by_id != request.user.id:
+        return None, Response(
+            {"error": "You can only view your own imports"},
+            status=status.HTTP_403_FORBIDDEN
+        )
+
+    return job, None
+
+
+class CustomerImportJobAPI(APIView):
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [PrincipalJWTAuthentication]
+
+    def get(self, request, job_id):
+        job, error = get_import_job(request, job_id)
+        if error:
+            return error
+
+        return Response(CustomerImportJobSerializer(job, context={"request": request}).data)
+
+
+class CustomerImportJobErrorsAPI(APIView):
+    """The rejected rows as CSV: row, username, field, message."""
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [PrincipalJWTAuthentication]
+
+    def get(self, request, job_id):
+        job, error = get_import_job(request, job_id)
+        if error:
+            return error
+
+        try:
+            report = open(job.error_report_path, "rb")
+        except (FileNotFoundError, ValueError):
+            return Response({"error": "No error report for this import"}, status=status.HTTP_404_NOT_FOUND)
+
+        return FileResponse(
+            report,
+            as_attachment=True,
+            filename=f"import-{job.id}-errors.csv",
+            content_type="text/csv",
+        )
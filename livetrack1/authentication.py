@@ -0,0 +1,78 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (AuthenticationFailed,
+                                                 InvalidToken)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from livetrack1.services.admin_cache_service import AdminCacheService
+from livetrack1.services.token_revocation_service import \
+    TokenRevocationService
+
+
+class AdminPrincipal:
+    """
+    Read-only stand-in for ``request.user``: the identity and role of the
+    caller, without a model instance.  For endpoints that only check
+    ``role`` / ``id``; anything that stores the user (e.g. as a ticket's
+    creator) needs the real Admin from CachedJWTAuthentication.
+    """
+
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, values):
+        self.id = self.pk = values["id"]
+        self.username = values["username"]
+        self.full_name = values["full_name"]
+        self.role = values["role"]
+        self.is_active = values["is_active"]
+        self.is_staff = values["is_staff"]
+        self.is_superuser = values["is_superuser"]
+
+    def __str__(self):
+        return f"{self.username} ({self.role})"
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication with the admin resolved through AdminCacheService
+    instead of a query per request.  Same checks as simplejwt's
+    ``get_user``, plus the in-memory TokenRevocationService check.
+    """
+
+    def get_user(self, validated_token):
+        return AdminCacheService.build_admin(self.get_user_values(validated_token))
+
+    def get_user_values(self, validated_token) -> dict:
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        if TokenRevocationService.is_revoked(validated_token):
+            raise AuthenticationFailed(_("Token has been revoked"), code="token_revoked")
+
+        values = AdminCacheService.get_values(user_id)
+        if values is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not values["is_active"]:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(
+                api_settings.REVOKE_TOKEN_CLAIM
+            ) != get_md5_hash_password(values["password"]):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+
+        return values
+
+
+class PrincipalJWTAuthentication(CachedJWTAuthentication):
+    """Sets ``request.user`` to an AdminPrincipal; for read-only endpoints."""
+
+    def get_user(self, validated_token):
+        return AdminPrincipal(self.get_user_values(validated_token))
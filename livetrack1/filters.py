@@ -0,0 +1,35 @@
+from rest_framework.filters import SearchFilter
+from rest_framework.settings import api_settings
+
+from livetrack1.services.search_service import SearchService
+
+
+class RankedSearchFilter(SearchFilter):
+    """
+    Drop-in replacement for SearchFilter backed by SearchService.
+
+    Put it after OrderingFilter: unless the client passed ?ordering=,
+    matches are returned best-first with the view's ordering as tiebreak.
+    Views may set ``search_fts_table`` to enable the SQLite FTS5 table.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        search_fields = self.get_search_fields(view, request)
+        search_terms = self.get_search_terms(request)
+
+        if not search_fields or not search_terms:
+            return queryset
+
+        fields = [field.lstrip("^=@$") for field in search_fields]
+
+        queryset = SearchService.search(
+            queryset,
+            search_terms,
+            fields,
+            fts_table=getattr(view, "search_fts_table", None),
+        )
+
+        if request.query_params.get(api_settings.ORDERING_PARAM):
+            return queryset
+
+        return queryset.order_by("-search_rank", *queryset.query.order_by)
@@ -0,0 +1,33 @@
+import re
+import unicodedata
+
+# Arabic letters commonly typed interchangeably; hamza seats and
+# diacritics are already gone after NFKD + dropping combining marks.
+ARABIC_FOLDS = str.maketrans({
+    "ة": "ه",
+    "ى": "ي",
+    "ـ": "",
+})
+
+NON_WORD = re.compile(r"[\W_]+", re.UNICODE)
+
+
+def normalize_name(value) -> str:
+    """
+    Case-, accent- and punctuation-insensitive form of a person's name:
+    "  Aḥmad  AL-Masri " -> "ahmad al masri", "أحمد" -> "احمد".
+    """
+    if not value:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", str(value))
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    folded = stripped.translate(ARABIC_FOLDS).casefold()
+    return " ".join(NON_WORD.sub(" ", folded).split())
+
+
+def name_key(value) -> str:
+    """
+    Blocking key for duplicate detection: the normalized name's words,
+    deduplicated and sorted, so word order doesn't matter.
+    """
+    return " ".join(sorted(set(normalize_name(value).split())))[:255]
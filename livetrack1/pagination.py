@@ -0,0 +1,249 @@
+import base64
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Seek-based pagination on a unique, ordered key.
+
+    The queryset ordering (as left by OrderingFilter) is extended with
+    ``tiebreak_fields`` so every row has a unique position, and each page
+    is fetched with ``WHERE key < last_key ORDER BY key LIMIT n``.  Page
+    500 costs the same as page 1 and no COUNT(*) is issued unless the
+    client asks for it with ``?with_count=true``.
+    """
+
+    page_size = 10
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    count_query_param = "with_count"
+
+    # Appended to the requested ordering; the last one must be unique.
+    tiebreak_fields = ("-created_at", "-id")
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset)
+        self.field_types = {
+            name: self._get_model_field(queryset.model, name)
+            for name in (field.lstrip("-") for field in self.ordering)
+        }
+
+        self.count = None
+        if self._truthy(request.query_params.get(self.count_query_param)):
+            self.count = queryset.count()
+
+        cursor = self.decode_cursor(request)
+        reverse = bool(cursor and cursor["reverse"])
+
+        order_by = self.ordering
+        if reverse:
+            order_by = [self._flip(field) for field in order_by]
+
+        queryset = queryset.order_by(*order_by)
+        if cursor:
+            queryset = queryset.filter(
+                self.build_seek_filter(order_by, cursor["position"])
+            )
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+
+        if reverse:
+            results.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = cursor is not None
+
+        self.page = results
+        return results
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ("count", self.count),
+            ("next", self.get_next_link()),
+            ("previous", self.get_previous_link()),
+            ("results", data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "count": {"type": "integer", "nullable": True},
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    # ============================================================
+    # Ordering
+    # ============================================================
+
+    def get_ordering(self, queryset):
+        ordering = []
+        seen = {}
+
+        for field in queryset.query.order_by:
+            if not isinstance(field, str):
+                continue
+            name = field.lstrip("-")
+            if name == "pk":
+                name = queryset.model._meta.pk.name
+            if name not in seen:
+                seen[name] = field.startswith("-")
+                ordering.append(("-" if seen[name] else "") + name)
+
+        # A tiebreaker that follows a field the client already sorted on
+        # takes that field's direction, so (created_at, id) stays one
+        # index scan in either direction.
+        descending = None
+        for field in self.tiebreak_fields:
+            name = field.lstrip("-")
+            if name in seen:
+                descending = seen[name]
+                continue
+            if descending is None:
+                descending = field.startswith("-")
+            seen[name] = descending
+            ordering.append(("-" if descending else "") + name)
+
+        return ordering
+
+    @staticmethod
+    def _flip(field):
+        return field[1:] if field.startswith("-") else f"-{field}"
+
+    def build_seek_filter(self, order_by, position):
+        """
+        Lexicographic "row comes after position" for mixed directions:
+        (a > x) OR (a = x AND b > y) OR ...  The leading column is also
+        bounded on its own so the database can start an index range scan.
+        """
+        condition = Q()
+        equal = Q()
+
+        for field, value in zip(order_by, position):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+            condition |= equal & Q(**{f"{name}__{lookup}": value})
+            equal &= Q(**{name: value})
+
+        first = order_by[0]
+        first_lookup = "lte" if first.startswith("-") else "gte"
+        return Q(**{f"{first.lstrip('-')}__{first_lookup}": position[0]}) & condition
+
+    # ============================================================
+    # Cursor encoding
+    # ============================================================
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+
+        try:
+            payload = json.loads(
+                base64.urlsafe_b64decode(encoded.encode("ascii")).decode("utf-8")
+            )
+            if payload["o"] != self.ordering:
+                raise ValueError("ordering changed")
+            position = [
+                self._load_value(name.lstrip("-"), value)
+                for name, value in zip(self.ordering, payload["p"])
+            ]
+            if len(position) != len(self.ordering):
+                raise ValueError("short cursor")
+        except (TypeError, ValueError, KeyError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+        return {"position": position, "reverse": bool(payload.get("r"))}
+
+    def encode_cursor(self, obj, reverse):
+        payload = {
+            "o": self.ordering,
+            "p": [
+                self._dump_value(getattr(obj, field.lstrip("-")))
+                for field in self.ordering
+            ],
+            "r": 1 if reverse else 0,
+        }
+        encoded = base64.urlsafe_b64encode(
+            json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        ).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    @staticmethod
+    def _dump_value(value):
+        if hasattr(value, "isoformat"):
+            return value.isoformat()
+        if hasattr(value, "pk"):
+            return value.pk
+        return value
+
+    @staticmethod
+    def _get_model_field(model, name):
+        # Annotations (e.g. search_rank) have no model field.
+        try:
+            return model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return None
+
+    def _load_value(self, name, value):
+        field = self.field_types[name]
+        if field is None:
+            return value
+        if isinstance(field, models.DateTimeField):
+            parsed = parse_datetime(value)
+            if parsed is None:
+                raise ValueError("bad datetime")
+            return parsed
+        return field.to_python(value)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    # ============================================================
+    # Helpers
+    # ============================================================
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    @staticmethod
+    def _truthy(value):
+        return str(value).lower() in ("1", "true", "yes")
@@ -0,0 +1,115 @@
+import unicodedata
+
+from django.db import models
+from django.db.models import Q
+
+# Enough to identify a subscriber regardless of how the country/trunk
+# prefix was written ("+970 59..", "0059..", "059..").
+SUFFIX_DIGITS = 9
+
+
+def normalize_phone(value) -> str:
+    """
+    Digits only, with Arabic-Indic digits folded to ASCII:
+    "+970 (59) 912-3456" -> "970599123456".
+    """
+    if not value:
+        return ""
+    return "".join(
+        str(unicodedata.digit(char)) for char in str(value)
+        if unicodedata.digit(char, None) is not None
+    )
+
+
+def _prefix_range(field: str, prefix: str) -> Q:
+    # "0598" -> 0598 <= x < 0599.  Bounds are digits only, so the range
+    # is a plain btree probe under any collation (LIKE is not on SQLite,
+    # nor on PostgreSQL without pattern ops).
+    stripped = prefix.rstrip("9")
+    if not stripped:
+        return Q(**{f"{field}__gte": prefix})
+    upper = stripped[:-1] + str(int(stripped[-1]) + 1)
+    return Q(**{f"{field}__gte": prefix, f"{field}__lt": upper})
+
+
+def phone_lookup(digits_field: str, reversed_field: str, query: str, match: str = "auto") -> Q:
+    """
+    Build an index-friendly filter for a phone query.
+
+    ``exact`` and ``prefix`` use the digits column; ``suffix`` matches
+    the last digits through the reversed column.  ``auto`` matches long
+    queries on their last SUFFIX_DIGITS digits (caller-ID style) and
+    short ones as a prefix.
+    """
+    digits = normalize_phone(query)
+    if not digits:
+        return Q(pk__in=[])
+
+    if match == "auto":
+        match = "suffix" if len(digits) >= SUFFIX_DIGITS else "prefix"
+        digits = digits[-SUFFIX_DIGITS:]
+
+    if match == "exact":
+        return Q(**{digits_field: digits})
+    if match == "prefix":
+        return _prefix_range(digits_field, digits)
+    if match == "suffix":
+        return _prefix_range(reversed_field, digits[::-1])
+
+    raise ValueError(f"Unknown phone match {match}")
+
+
+class PhoneNormalizingQuerySet(models.QuerySet):
+    """
+    Keeps the derived phone columns in sync on the paths that skip
+    Model.save(): bulk_create, bulk_update and update().
+    """
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        for obj in objs:
+            obj.sync_phone_digits()
+        return super().bulk_create(objs, *args, **kwargs)
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        source, digits, reverse = self.model.PHONE_FIELDS
+        if source in fields:
+            objs = list(objs)
+            for obj in objs:
+                obj.sync_phone_digits()
+            fields = [*fields, digits, reverse]
+        return super().bulk_update(objs, fields, *args, **kwargs)
+
+    def update(self, **kwargs):
+        source, digits, reverse = self.model.PHONE_FIELDS
+        value = kwargs.get(source)
+        # Expressions (e.g. copying from a join) must set the derived
+        # columns themselves.
+        if source in kwargs and (value is None or isinstance(value, str)):
+            kwargs[digits] = normalize_phone(value)
+            kwargs[reverse] = kwargs[digits][::-1]
+        return super().update(**kwargs)
+
+
+class PhoneDigitsMixin:
+    """
+    For models with a raw phone column plus digits/reversed-digits copies.
+    ``PHONE_FIELDS`` is ``(source, digits, reversed)``.
+    """
+
+    PHONE_FIELDS = ("phone", "phone_digits", "phone_reversed")
+
+    def sync_phone_digits(self):
+        source, digits, reverse = self.PHONE_FIELDS
+        normalized = normalize_phone(getattr(self, source))
+        setattr(self, digits, normalized)
+        setattr(self, reverse, normalized[::-1])
+
+    def save(self, *args, **kwargs):
+        self.sync_phone_digits()
+
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and self.PHONE_FIELDS[0] in update_fields:
+            kwargs["update_fields"] = {*update_fields, *self.PHONE_FIELDS[1:]}
+
+        super().save(*args, **kwargs)
@@ -0,0 +1,60 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+
+class AdminCacheService:
+    """
+    Short-TTL cache of the admin row behind an access token, so
+    authentication doesn't query the admins table on every request.
+
+    Stores the row's column values; ``build_admin`` turns them back into
+    a regular (saved) Admin instance without a query.  Views that change
+    an admin's status, password or profile drop the entry after commit;
+    the TTL bounds staleness for other writers and for per-process
+    caches.
+    """
+
+    key_prefix = "auth-admin"
+
+    @staticmethod
+    def timeout() -> int:
+        return getattr(settings, "AUTH_USER_CACHE_TIMEOUT", 60)
+
+    @staticmethod
+    def _key(admin_id) -> str:
+        return f"{AdminCacheService.key_prefix}:{admin_id}"
+
+    @staticmethod
+    def _attnames() -> list:
+        return [field.attname for field in get_user_model()._meta.concrete_fields]
+
+    @staticmethod
+    def get_values(admin_id):
+        """The admin's column values, or None when there is no such admin."""
+        key = AdminCacheService._key(admin_id)
+        values = cache.get(key)
+        if values is not None:
+            return values
+
+        values = get_user_model().objects.filter(pk=admin_id).values(
+            *AdminCacheService._attnames()
+        ).first()
+
+        if values is not None:
+            cache.set(key, values, AdminCacheService.timeout())
+        return values
+
+    @staticmethod
+    def build_admin(values):
+        attnames = AdminCacheService._attnames()
+        return get_user_model().from_db(
+            DEFAULT_DB_ALIAS, attnames, [values[name] for name in attnames]
+        )
+
+    @staticmethod
+    def invalidate(admin_id):
+        transaction.on_commit(
+            lambda: cache.delete(AdminCacheService._key(admin_id))
+        )
@@ -1,6 +1,9 @@
 from django.contrib.auth import authenticate
 from rest_framework_simplejwt.tokens import RefreshToken
 
+from livetrack1.services.token_revocation_service import \
+    TokenRevocationService
+
 
 class AuthService:
 
@@ -17,6 +20,7 @@ class AuthService:
 
         refresh = RefreshToken.for_user(user)
         refresh["role"] = user.role
+        refresh[TokenRevocationService.ISSUED_AT_CLAIM] = refresh.current_time.timestamp()
 
         return {
             "refresh": str(refresh),
@@ -47,6 +47,10 @@ class AuthorizationService:
     def can_delete_ticket(role: str) -> bool:
         return role == "ROOT"
 
+    @staticmethod
+    def can_view_ticket_files(role: str) -> bool:
+        return role in ["ROOT", "ADMIN"]
+
     # ============================================================
     # Lifecycle
     # ============================================================
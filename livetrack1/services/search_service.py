@@ -0,0 +1,184 @@
+import logging
+
+from django.db import DatabaseError, connections
+from django.db.models import BooleanField, F, FloatField, Q, Value
+from django.db.models.expressions import Func, RawSQL
+from django.db.models.functions import Greatest
+
+logger = logging.getLogger("tickets")
+
+
+class WordSimilarity(Func):
+    function = "word_similarity"
+    output_field = FloatField()
+
+
+class ILike(Func):
+    # "col ILIKE pattern" on the bare column, which the gin_trgm_ops
+    # indexes serve; icontains compiles to UPPER(col::text) LIKE UPPER(..)
+    # on PostgreSQL, which they can't.
+    arg_joiner = " ILIKE "
+    template = "(%(expressions)s)"
+    output_field = BooleanField()
+
+
+class SearchService:
+    """
+    Ranked substring search over a handful of text columns.
+
+    PostgreSQL: pg_trgm GIN indexes (see the tickets/customers migrations)
+    turn ILIKE '%term%' into an index scan, word_similarity() ranks hits.
+    SQLite (local runs): an FTS5 trigram shadow table kept in sync with
+    triggers, ranked with bm25().  Other backends fall back to icontains.
+    """
+
+    # The FTS5 trigram tokenizer cannot match terms shorter than this.
+    MIN_FTS_TERM_LENGTH = 3
+
+    _fts_ready = {}
+
+    # ============================================================
+    # Query
+    # ============================================================
+
+    @staticmethod
+    def search(queryset, terms, fields, fts_table=None):
+        terms = [term for term in terms if term]
+        if not terms:
+            return queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+        vendor = connections[queryset.db].vendor
+
+        if vendor == "postgresql":
+            return SearchService._search_trigram(queryset, terms, fields)
+
+        if (
+            vendor == "sqlite"
+            and fts_table
+            and SearchService.ensure_fts_table(queryset.model, fts_table, fields, queryset.db)
+        ):
+            return SearchService._search_fts(queryset, terms, fields, fts_table)
+
+        return SearchService._contains(queryset, terms, fields).annotate(
+            search_rank=Value(0.0, output_field=FloatField())
+        )
+
+    @staticmethod
+    def _contains(queryset, terms, fields):
+        for term in terms:
+            condition = Q()
+            for field in fields:
+                condition |= Q(**{f"{field}__icontains": term})
+            queryset = queryset.filter(condition)
+        return queryset
+
+    @staticmethod
+    def _search_trigram(queryset, terms, fields):
+        like = connections[queryset.db].ops.prep_for_like_query
+        for term in terms:
+            pattern = f"%{like(term)}%"
+            condition = Q()
+            for field in fields:
+                condition |= Q(ILike(F(field), Value(pattern)))
+            queryset = queryset.filter(condition)
+
+        query = " ".join(terms)
+        scores = [WordSimilarity(Value(query), field) for field in fields]
+        rank = Greatest(*scores) if len(scores) > 1 else scores[0]
+
+        return queryset.annotate(search_rank=rank)
+
+    @staticmethod
+    def _search_fts(queryset, terms, fields, fts_table):
+        long_terms = [t for t in terms if len(t) >= SearchService.MIN_FTS_TERM_LENGTH]
+        short_terms = [t for t in terms if len(t) < SearchService.MIN_FTS_TERM_LENGTH]
+
+        if not long_terms:
+            return SearchService._contains(queryset, terms, fields).annotate(
+                search_rank=Value(0.0, output_field=FloatField())
+            )
+
+        match = " ".join('"{}"'.format(t.replace('"', '""')) for t in long_terms)
+        table = queryset.model._meta.db_table
+        pk = queryset.model._meta.pk.column
+
+        queryset = queryset.filter(
+            pk__in=RawSQL(
+                f"SELECT rowid FROM {fts_table} WHERE {fts_table} MATCH %s",
+                [match],
+            )
+        ).annotate(
+            search_rank=RawSQL(
+                f"SELECT -bm25({fts_table}) FROM {fts_table} "
+                f'WHERE {fts_table} MATCH %s AND rowid = "{table}"."{pk}"',
+                [match],
+                output_field=FloatField(),
+            )
+        )
+
+        return SearchService._contains(queryset, short_terms, fields)
+
+    # ============================================================
+    # SQLite FTS5 shadow table
+    # ============================================================
+
+    @staticmethod
+    def ensure_fts_table(model, fts_table, fields, using="default"):
+        """
+        Create the FTS5 table and its sync triggers if they are missing.
+
+        Done lazily rather than in a migration because SQLite rebuilds a
+        table on most ALTERs, which silently drops its triggers.
+        """
+        key = (using, fts_table)
+        if SearchService._fts_ready.get(key):
+            return True
+
+        connection = connections[using]
+        table = model._meta.db_table
+        pk = model._meta.pk.column
+        columns = [model._meta.get_field(f).column for f in fields]
+
+        cols = ", ".join(columns)
+        new_cols = ", ".join(f"new.{c}" for c in columns)
+        old_cols = ", ".join(f"old.{c}" for c in columns)
+
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = %s",
+                    [f"{fts_table}_au"],
+                )
+                if cursor.fetchone():
+                    SearchService._fts_ready[key] = True
+                    return True
+
+                cursor.execute(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table} USING fts5("
+                    f"{cols}, content='{table}', content_rowid='{pk}', "
+                    f"tokenize='trigram')"
+                )
+                cursor.execute(
+                    f"CREATE TRIGGER IF NOT EXISTS {fts_table}_ai AFTER INSERT ON {table} BEGIN "
+                    f"INSERT INTO {fts_table}(rowid, {cols}) VALUES (new.{pk}, {new_cols}); END"
+                )
+                cursor.execute(
+                    f"CREATE TRIGGER IF NOT EXISTS {fts_table}_ad AFTER DELETE ON {table} BEGIN "
+                    f"INSERT INTO {fts_table}({fts_table}, rowid, {cols}) "
+                    f"VALUES ('delete', old.{pk}, {old_cols}); END"
+                )
+                cursor.execute(
+                    f"CREATE TRIGGER IF NOT EXISTS {fts_table}_au AFTER UPDATE ON {table} BEGIN "
+                    f"INSERT INTO {fts_table}({fts_table}, rowid, {cols}) "
+                    f"VALUES ('delete', old.{pk}, {old_cols}); "
+                    f"INSERT INTO {fts_table}(rowid, {cols}) VALUES (new.{pk}, {new_cols}); END"
+                )
+                cursor.execute(f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')")
+        except DatabaseError as exc:
+            # No FTS5 / trigram tokenizer in this SQLite build.
+            logger.warning(f"FTS5 search table {fts_table} unavailable: {exc}")
+            SearchService._fts_ready[key] = False
+            return False
+
+        SearchService._fts_ready[key] = True
+        return True
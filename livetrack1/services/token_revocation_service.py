@@ -0,0 +1,237 @@
+import threading
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+
+from admins.models import TokenRevocation, TokenRevocationVersion
+from livetrack1.bloom import BloomFilter
+
+
+class RevocationSet:
+    """
+    One process's copy of the unexpired revocations at ``version``.
+
+    ``admins`` maps admin id -> the newest cutoff (epoch seconds with
+    microseconds); tokens issued before it are revoked.  Revoked JTIs
+    are kept as a set up to TOKEN_REVOCATION_EXACT_LIMIT entries, beyond
+    that as a Bloom filter whose (rare) hits are confirmed against the
+    database once per JTI.
+    """
+
+    def __init__(self, version: int, jti_count: int):
+        self.version = version
+        self.checked_at = time.monotonic()
+        self.admins = {}
+
+        limit = TokenRevocationService.exact_limit()
+        if jti_count > limit:
+            self.jtis = BloomFilter(max(jti_count * 2, limit * 2))
+            self.confirmed = {}
+        else:
+            self.jtis = set()
+            self.confirmed = None
+
+    @property
+    def exact(self) -> bool:
+        return self.confirmed is None
+
+    def full(self) -> bool:
+        if self.exact:
+            return len(self.jtis) > TokenRevocationService.exact_limit()
+        return len(self.jtis) > self.jtis.capacity
+
+    def add_rows(self, rows):
+        for admin_id, jti, created_at in rows:
+            if jti:
+                self.jtis.add(jti)
+                if self.confirmed is not None:
+                    self.confirmed.pop(jti, None)
+                continue
+
+            admin_id = str(admin_id)
+            cutoff = created_at.timestamp()
+            if cutoff > self.admins.get(admin_id, 0):
+                self.admins[admin_id] = cutoff
+
+    def has_jti(self, jti: str) -> bool:
+        if jti not in self.jtis:
+            return False
+        if self.exact:
+            return True
+
+        if jti not in self.confirmed:
+            self.confirmed[jti] = TokenRevocation.objects.filter(jti=jti).exists()
+        return self.confirmed[jti]
+
+
+class TokenRevocationService:
+    """
+    Revocation of issued JWTs without a query per request.
+
+    Revocations are rows in ``TokenRevocation``; each writing
+    transaction bumps the single ``TokenRevocationVersion`` row, which
+    also serialises writers so versions become visible in order.  Every
+    process keeps a RevocationSet and, at most every
+    TOKEN_REVOCATION_POLL_SECONDS, reads the version (one primary-key
+    lookup), loading only the rows added since.  A revocation made in
+    this process is seen on the next request.
+    """
+
+    # Sub-second issue time, copied from the refresh token to its access
+    # tokens.
+    ISSUED_AT_CLAIM = "issued_at"
+
+    _lock = threading.Lock()
+    _state = None
+
+    @staticmethod
+    def poll_seconds() -> float:
+        return getattr(settings, "TOKEN_REVOCATION_POLL_SECONDS", 5)
+
+    @staticmethod
+    def exact_limit() -> int:
+        return getattr(settings, "TOKEN_REVOCATION_EXACT_LIMIT", 10000)
+
+    # ============================================================
+    # Writes
+    # ============================================================
+
+    @staticmethod
+    def _bump_version() -> int:
+        # Call inside a transaction: the row stays locked until commit.
+        updated = TokenRevocationVersion.objects.filter(pk=1).update(
+            version=F("version") + 1
+        )
+        if not updated:
+            try:
+                with transaction.atomic():
+                    TokenRevocationVersion.objects.create(pk=1, version=1)
+            except IntegrityError:
+                # Another transaction created the row first.
+                TokenRevocationVersion.objects.filter(pk=1).update(
+                    version=F("version") + 1
+                )
+
+        return TokenRevocationVersion.objects.values_list(
+            "version", flat=True
+        ).get(pk=1)
+
+    @staticmethod
+    @transaction.atomic
+    def _add(admin_id, jti, expires_at, reason, revoked_by):
+        version = TokenRevocationService._bump_version()
+
+        revocation = TokenRevocation.objects.create(
+            admin_id=admin_id,
+            jti=jti,
+            reason=reason,
+            revoked_by_id=getattr(revoked_by, "id", None),
+            version=version,
+            expires_at=expires_at,
+        )
+
+        # Expired rows cover nothing any more; removing them never
+        # changes a decision, so the version is not involved.
+        TokenRevocation.objects.filter(expires_at__lte=timezone.now()).delete()
+
+        transaction.on_commit(TokenRevocationService.expire_poll)
+        return revocation
+
+    @staticmethod
+    def revoke_admin(admin, reason="", revoked_by=None):
+        """Revoke every token issued to ``admin`` so far."""
+        lifetime = max(
+            api_settings.ACCESS_TOKEN_LIFETIME,
+            api_settings.REFRESH_TOKEN_LIFETIME,
+        )
+        return TokenRevocationService._add(
+            admin.id, "", timezone.now() + lifetime, reason, revoked_by
+        )
+
+    @staticmethod
+    def revoke_token(token, reason="", revoked_by=None):
+        """Revoke one access or refresh token (a validated token object)."""
+        return TokenRevocationService._add(
+            token[api_settings.USER_ID_CLAIM],
+            token[api_settings.JTI_CLAIM],
+            datetime.fromtimestamp(token["exp"], tz=dt_timezone.utc),
+            reason,
+            revoked_by,
+        )
+
+    # ============================================================
+    # Reads
+    # ============================================================
+
+    @staticmethod
+    def expire_poll():
+        state = TokenRevocationService._state
+        if state is not None:
+            state.checked_at = 0
+
+    @staticmethod
+    def _rows(**filters):
+        return TokenRevocation.objects.filter(
+            expires_at__gt=timezone.now(), **filters
+        ).values_list("admin_id", "jti", "created_at")
+
+    @staticmethod
+    def _load(version) -> RevocationSet:
+        rows = TokenRevocationService._rows(version__lte=version)
+        state = RevocationSet(version, rows.exclude(jti="").count())
+        state.add_rows(rows.iterator(chunk_size=5000))
+        return state
+
+    @staticmethod
+    def current() -> RevocationSet:
+        state = TokenRevocationService._state
+        poll = TokenRevocationService.poll_seconds()
+        if state is not None and time.monotonic() - state.checked_at < poll:
+            return state
+
+        with TokenRevocationService._lock:
+            state = TokenRevocationService._state
+            if state is not None and time.monotonic() - state.checked_at < poll:
+                return state
+
+            version = TokenRevocationVersion.objects.filter(pk=1).values_list(
+                "version", flat=True
+            ).first() or 0
+
+            if state is None or version < state.version:
+                state = TokenRevocationService._load(version)
+            elif version > state.version:
+                state.add_rows(TokenRevocationService._rows(
+                    version__gt=state.version, version__lte=version
+                ))
+                if state.full():
+                    # Reload, dropping expired entries and resizing.
+                    state = TokenRevocationService._load(version)
+                state.version = version
+
+            state.checked_at = time.monotonic()
+            TokenRevocationService._state = state
+            return state
+
+    @staticmethod
+    def is_revoked(validated_token) -> bool:
+        state = TokenRevocationService.current()
+
+        cutoff = state.admins.get(str(validated_token.get(api_settings.USER_ID_CLAIM)))
+        if cutoff is not None:
+            # "iat" is whole seconds, so a login right after a revocation
+            # would look older than it; AuthService.login adds the exact
+            # time.  Tokens without it fall back to "iat".
+            issued_at = validated_token.get(
+                TokenRevocationService.ISSUED_AT_CLAIM, validated_token.get("iat")
+            )
+            if issued_at is None or issued_at < cutoff:
+                return True
+
+        jti = validated_token.get(api_settings.JTI_CLAIM)
+        return bool(jti) and state.has_jti(jti)
@@ -52,7 +52,7 @@ INSTALLED_APPS = [
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "livetrack1.authentication.CachedJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.IsAuthenticated",
@@ -74,6 +74,23 @@ SIMPLE_JWT = {
     "SIGNING_KEY": SECRET_KEY,
 }
 
+# How long an admin row resolved from a token is reused (seconds).
+# Status/password/profile changes drop it explicitly.
+AUTH_USER_CACHE_TIMEOUT = 60
+
+# Revoked tokens (logout, deactivated admins) are kept in memory by each
+# process and re-synced from the database this often (seconds).
+TOKEN_REVOCATION_POLL_SECONDS = 5
+# Beyond this many revoked tokens the in-memory set becomes a Bloom filter.
+TOKEN_REVOCATION_EXACT_LIMIT = 10000
+
+# =========================
+# Live ticket events (SSE)
+# =========================
+# In-process fan-out; point this at another broker class (same
+# publish/subscribe interface) when running several ASGI workers.
+TICKET_EVENT_BROKER = "tickets.services.event_service.InProcessBroker"
+
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -173,4 +190,50 @@ USE_TZ = True
 # =========================
 STATIC_URL = 'static/'
 
+# =========================
+# Reply attachments
+# =========================
+# Content-addressed blobs (see ticket_replies/storage.py), kept out of
+# the source tree.
+ATTACHMENT_STORAGE_ROOT = BASE_DIR / "media" / "attachments"
+# Cold storage for attachments of old closed/archived tickets, kept apart
+# from the hot set so it can be backed up on its own schedule.
+ATTACHMENT_PACK_ROOT = BASE_DIR / "media" / "attachment-packs"
+# Where attachments uploaded before content addressing still live.
+LEGACY_ATTACHMENT_ROOT = BASE_DIR
+# Uploads are post-processed (thumbnails, downscaling) by a per-process
+# thread pool after the reply is returned.
+ATTACHMENT_PROCESSING_WORKERS = 2
+ATTACHMENT_PROCESSING_SYNC = False
+# Largest file accepted by the resumable upload endpoints.
+ATTACHMENT_UPLOAD_MAX_SIZE = 2 * 1024 ** 3
+# Let the front proxy stream downloads: "x-accel-redirect" (nginx, with an
+# internal location at ATTACHMENT_SENDFILE_PREFIX aliased to
+# ATTACHMENT_STORAGE_ROOT) or "x-sendfile" (Apache/lighttpd).  None serves
+# files from Django with Range support.
+ATTACHMENT_SENDFILE_BACKEND = os.getenv("ATTACHMENT_SENDFILE_BACKEND") or None
+ATTACHMENT_SENDFILE_PREFIX = "/protected-attachments/"
+
+# =========================
+# Tickets
+# =========================
+# Copy customer edits into the snapshot columns of the customer's
+# non-closed tickets (per request: update_open_tickets=true|false).
+TICKET_SNAPSHOT_PROPAGATION = False
+
+# =========================
+# Customer imports
+# =========================
+# Uploaded import files and their error reports.
+CUSTOMER_IMPORT_ROOT = BASE_DIR / "media" / "customer-imports"
+# Imports run on a per-process thread pool; run_customer_imports picks up
+# jobs lost with a process.
+CUSTOMER_IMPORT_WORKERS = 1
+CUSTOMER_IMPORT_SYNC = False
+
+# Creating a customer whose phone matches an existing one returns the
+# match in "possible_duplicates".  Set to True to refuse it with 409
+# instead (clients then resend with allow_duplicate=true).
+CUSTOMER_DUPLICATE_PHONE_CONFLICT = False
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
@@ -1,11 +1,12 @@
 from django.contrib import admin
 from django.urls import include, path
 
-from livetrack1.views import LoginAPI
+from livetrack1.views import LoginAPI, LogoutAPI
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/login/", LoginAPI.as_view(), name="login"),
+    path("api/logout/", LogoutAPI.as_view(), name="logout"),
     path("api/", include("admins.urls")),
     path("api/", include("tickets.urls")),
 path("api/tickets/", include("tickets.urls")),
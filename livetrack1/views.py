@@ -1,8 +1,14 @@
 from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
 
 from livetrack1.services.auth_service import AuthService
+from livetrack1.services.token_revocation_service import \
+    TokenRevocationService
 
 
 class LoginAPI(APIView):
@@ -27,3 +33,34 @@ class LoginAPI(APIView):
                 {"error": str(e)},
                 status=status.HTTP_401_UNAUTHORIZED
             )
+
+
+class LogoutAPI(APIView):
+    """
+    Revokes the access token used for the request and, when given, the
+    refresh token it came with.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        refresh = None
+        if request.data.get("refresh"):
+            try:
+                refresh = RefreshToken(request.data["refresh"])
+            except TokenError as e:
+                return Response(
+                    {"error": str(e)},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            if str(refresh.get(api_settings.USER_ID_CLAIM)) != str(request.user.id):
+                return Response(
+                    {"error": "Refresh token belongs to another account"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+        TokenRevocationService.revoke_token(request.auth, reason="logout", revoked_by=request.user)
+        if refresh is not None:
+            TokenRevocationService.revoke_token(refresh, reason="logout", revoked_by=request.user)
+
+        return Response({"message": "Logged out"})
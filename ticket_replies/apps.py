@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class TicketRepliesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'ticket_replies'
+
+    def ready(self):
+        from ticket_replies import signals  # noqa: F401
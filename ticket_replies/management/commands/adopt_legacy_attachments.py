@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from ticket_replies.services.attachment_service import AttachmentService
+
+
+class Command(BaseCommand):
+    help = "Move attachments from the old ticket_replies/ layout into the deduplicated blob store."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--delete-originals",
+            action="store_true",
+            help="Remove the old files once they are in the blob store.",
+        )
+
+    def handle(self, *args, **options):
+        adopted = AttachmentService.adopt_legacy(
+            delete_originals=options["delete_originals"]
+        )
+        self.stdout.write(self.style.SUCCESS(f"Adopted {adopted} attachment(s)"))
@@ -0,0 +1,48 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from ticket_replies.services.attachment_service import AttachmentService
+from ticket_replies.services.upload_service import AttachmentUploadService
+
+
+class Command(BaseCommand):
+    help = "Delete attachment blobs that no attachment references any more."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--grace-hours",
+            type=float,
+            default=AttachmentService.GC_GRACE.total_seconds() / 3600,
+            help="Only collect blobs unreferenced for at least this long.",
+        )
+        parser.add_argument(
+            "--recount",
+            action="store_true",
+            help="Recompute reference counts from attachment rows first.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report what would be deleted without deleting it.",
+        )
+
+    def handle(self, *args, **options):
+        if options["recount"]:
+            fixed = AttachmentService.recount()
+            self.stdout.write(f"Reference counts corrected on {fixed} blob(s)")
+
+        if not options["dry_run"]:
+            expired = AttachmentUploadService.expire()
+            self.stdout.write(f"Expired {expired} abandoned resumable upload(s)")
+
+        result = AttachmentService.collect_garbage(
+            grace=timedelta(hours=options["grace_hours"]),
+            dry_run=options["dry_run"],
+        )
+
+        verb = "Would delete" if options["dry_run"] else "Deleted"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {result['blobs']} blob(s) ({result['bytes']} bytes) "
+            f"and {result['temp_files']} stale temp file(s)"
+        ))
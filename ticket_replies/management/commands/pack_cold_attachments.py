@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+
+from ticket_replies.services.pack_service import AttachmentPackService
+
+
+class Command(BaseCommand):
+    help = "Move attachments of old CLOSED/archived tickets into compressed pack files."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=365,
+            help="Only pack tickets closed/archived and untouched for this many days.",
+        )
+        parser.add_argument(
+            "--max-pack-mb",
+            type=int,
+            default=AttachmentPackService.MAX_PACK_SIZE // (1024 * 1024),
+            help="Start a new pack once this much data has been added.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report what would be packed without writing anything.",
+        )
+
+    def handle(self, *args, **options):
+        result = AttachmentPackService.pack(
+            older_than_days=options["days"],
+            max_pack_size=options["max_pack_mb"] * 1024 * 1024,
+            dry_run=options["dry_run"],
+            stdout=self.stdout,
+        )
+
+        verb = "Would pack" if options["dry_run"] else "Packed"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {result['blobs']} blob(s) ({result['bytes']} bytes) "
+            f"into {result['packs']} pack(s); "
+            f"evicted {result['evicted']} extracted copy(ies)"
+        ))
@@ -0,0 +1,29 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from ticket_replies.services.processing_service import \
+    AttachmentProcessingService
+
+
+class Command(BaseCommand):
+    help = "Process attachments whose background job was lost (e.g. after a restart)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--stale-minutes",
+            type=float,
+            default=AttachmentProcessingService.STALE_AFTER.total_seconds() / 60,
+            help="Requeue attachments stuck in PROCESSING for at least this long.",
+        )
+
+    def handle(self, *args, **options):
+        requeued = AttachmentProcessingService.requeue_stale(
+            timedelta(minutes=options["stale_minutes"])
+        )
+        if requeued:
+            self.stdout.write(f"Requeued {requeued} stale attachment(s)")
+
+        processed = AttachmentProcessingService.process_pending(stdout=self.stdout)
+
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} attachment(s)"))
@@ -0,0 +1,46 @@
+# Generated by Django 6.0.2 on 2026-10-18 17:11
+
+import django.db.models.deletion
+import ticket_replies.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ticket_replies', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttachmentBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True)),
+                ('size', models.BigIntegerField()),
+                ('ref_count', models.IntegerField(default=0)),
+                ('unreferenced_since', models.DateTimeField(blank=True, db_index=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='ticketreplyattachment',
+            name='original_name',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='ticketreplyattachment',
+            name='size',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='ticketreplyattachment',
+            name='file',
+            field=models.FileField(max_length=255, storage=ticket_replies.storage.get_attachment_storage, upload_to='ticket_replies/'),
+        ),
+        migrations.AddField(
+            model_name='ticketreplyattachment',
+            name='blob',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='attachments', to='ticket_replies.attachmentblob'),
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 6.0.2 on 2026-10-18 17:14
+
+import django.db.models.deletion
+import ticket_replies.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ticket_replies', '0002_attachment_blobs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ticketreplyattachment',
+            name='height',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='ticketreplyattachment',
+            name='mime_type',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='ticketreplyattachment',
+            name='processing_error',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='ticketreplyattachment',
+            name='processing_status',
+            field=models.CharField(choices=[('PENDING', 'Pending'), ('PROCESSING', 'Processing'), ('READY', 'Ready'), ('FAILED', 'Failed')], db_index=True, default='READY', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='ticketreplyattachment',
+            name='spool_path',
+            field=models.CharField(blank=True, default='', max_length=500),
+        ),
+        migrations.AddField(
+            model_name='ticketreplyattachment',
+            name='thumbnail',
+            field=models.FileField(blank=True, max_length=255, storage=ticket_replies.storage.get_attachment_storage, upload_to=''),
+        ),
+        migrations.AddField(
+            model_name='ticketreplyattachment',
+            name='thumbnail_blob',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='thumbnail_of', to='ticket_replies.attachmentblob'),
+        ),
+        migrations.AddField(
+            model_name='ticketreplyattachment',
+            name='width',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='ticketreplyattachment',
+            name='file',
+            field=models.FileField(blank=True, max_length=255, storage=ticket_replies.storage.get_attachment_storage, upload_to='ticket_replies/'),
+        ),
+    ]
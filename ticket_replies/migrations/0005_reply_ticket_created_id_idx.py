@@ -0,0 +1,20 @@
+# Generated by Django 6.0.2 on 2026-10-18 17:19
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ticket_replies', '0004_attachmentupload'),
+        ('tickets', '0009_ticketparticipant'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ticketreply',
+            index=models.Index(fields=['ticket', 'created_at', 'id'], name='reply_ticket_created_id_idx'),
+        ),
+    ]
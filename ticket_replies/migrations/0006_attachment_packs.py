@@ -0,0 +1,44 @@
+# Generated by Django 6.0.2 on 2026-10-18 17:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ticket_replies', '0005_reply_ticket_created_id_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttachmentPack',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('blob_count', models.IntegerField(default=0)),
+                ('size', models.BigIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='attachmentblob',
+            name='pack_codec',
+            field=models.CharField(blank=True, choices=[('raw', 'Stored'), ('zlib', 'Zlib')], default='', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='attachmentblob',
+            name='pack_length',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='attachmentblob',
+            name='pack_offset',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='attachmentblob',
+            name='pack',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='blobs', to='ticket_replies.attachmentpack'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-18 17:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ticket_replies', '0006_attachment_packs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ticketreplyattachment',
+            name='processing_started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
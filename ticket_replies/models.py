@@ -1,5 +1,9 @@
+import uuid
+
 from django.db import models
 
+from ticket_replies.storage import get_attachment_storage
+
 
 class TicketReply(models.Model):
 
@@ -47,22 +51,187 @@ class TicketReply(models.Model):
 
     class Meta:
         ordering = ["created_at"]
+        indexes = [
+            # Ticket timeline keyset pagination.
+            models.Index(fields=["ticket", "created_at", "id"], name="reply_ticket_created_id_idx"),
+        ]
 
     def __str__(self):
         return f"Reply #{self.id} - Ticket #{self.ticket.id}"
 
 
+class AttachmentPack(models.Model):
+    """
+    A cold-storage file holding many blobs back to back, each compressed
+    on its own so a single one can be read with one seek.
+    """
+
+    name = models.CharField(max_length=255, unique=True)
+    blob_count = models.IntegerField(default=0)
+    size = models.BigIntegerField(default=0)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Pack {self.name} ({self.blob_count} blobs)"
+
+
+class AttachmentBlob(models.Model):
+    """
+    One stored file, shared by every attachment with the same content.
+    """
+
+    CODEC_CHOICES = [
+        ("raw", "Stored"),
+        ("zlib", "Zlib"),
+    ]
+
+    sha256 = models.CharField(max_length=64, unique=True)
+    size = models.BigIntegerField()
+
+    ref_count = models.IntegerField(default=0)
+
+    # Set when ref_count drops to 0; GC only collects blobs that have
+    # stayed unreferenced for a grace period.
+    unreferenced_since = models.DateTimeField(null=True, blank=True, db_index=True)
+
+    # Set once the blob is packed; the hot file is then only a cache that
+    # may be missing and is re-extracted on demand.
+    pack = models.ForeignKey(
+        AttachmentPack,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name="blobs"
+    )
+    pack_offset = models.BigIntegerField(null=True, blank=True)
+    pack_length = models.BigIntegerField(null=True, blank=True)
+    pack_codec = models.CharField(max_length=10, choices=CODEC_CHOICES, blank=True, default="")
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Blob {self.sha256[:12]} ({self.ref_count} refs)"
+
+
 class TicketReplyAttachment(models.Model):
 
+    PROCESSING_STATUS_CHOICES = [
+        ("PENDING", "Pending"),
+        ("PROCESSING", "Processing"),
+        ("READY", "Ready"),
+        ("FAILED", "Failed"),
+    ]
+
     reply = models.ForeignKey(
         TicketReply,
         on_delete=models.CASCADE,
         related_name="attachments"
     )
 
-    file = models.FileField(upload_to="ticket_replies/")
+    file = models.FileField(
+        upload_to="ticket_replies/",
+        storage=get_attachment_storage,
+        max_length=255,
+        blank=True
+    )
+
+    blob = models.ForeignKey(
+        AttachmentBlob,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name="attachments"
+    )
+
+    original_name = models.CharField(max_length=255, blank=True, default="")
+    size = models.BigIntegerField(null=True, blank=True)
+
+    # =========================
+    # Post-processing
+    # =========================
+    processing_status = models.CharField(
+        max_length=20,
+        choices=PROCESSING_STATUS_CHOICES,
+        default="READY",
+        db_index=True
+    )
+    processing_error = models.TextField(null=True, blank=True)
+    # Set when a worker claims the job; identifies the claim and ages it.
+    processing_started_at = models.DateTimeField(null=True, blank=True)
+    spool_path = models.CharField(max_length=500, blank=True, default="")
+
+    mime_type = models.CharField(max_length=100, blank=True, default="")
+    width = models.PositiveIntegerField(null=True, blank=True)
+    height = models.PositiveIntegerField(null=True, blank=True)
+
+    thumbnail = models.FileField(
+        storage=get_attachment_storage,
+        max_length=255,
+        blank=True
+    )
+
+    thumbnail_blob = models.ForeignKey(
+        AttachmentBlob,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name="thumbnail_of"
+    )
 
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
         return f"Attachment {self.id} for Reply {self.reply.id}"
+
+
+class AttachmentUpload(models.Model):
+    """
+    A resumable (tus-style) upload in progress.  Chunks are appended to
+    ``staging_path``; once ``offset`` reaches ``length`` the file becomes
+    a TicketReplyAttachment of ``reply``.
+    """
+
+    STATUS_CHOICES = [
+        ("UPLOADING", "Uploading"),
+        ("COMPLETE", "Complete"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+
+    reply = models.ForeignKey(
+        TicketReply,
+        on_delete=models.CASCADE,
+        related_name="uploads"
+    )
+
+    created_by = models.ForeignKey(
+        "admins.Admin",
+        on_delete=models.CASCADE,
+        related_name="attachment_uploads"
+    )
+
+    original_name = models.CharField(max_length=255, blank=True, default="")
+    length = models.BigIntegerField()
+    offset = models.BigIntegerField(default=0)
+    staging_path = models.CharField(max_length=500)
+
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default="UPLOADING"
+    )
+
+    attachment = models.OneToOneField(
+        TicketReplyAttachment,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="upload"
+    )
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    def __str__(self):
+        return f"Upload {self.id} ({self.offset}/{self.length})"
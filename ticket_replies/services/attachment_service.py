@@ -0,0 +1,249 @@
+import logging
+import os
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, F, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from ticket_replies.models import AttachmentBlob, TicketReplyAttachment
+from ticket_replies.storage import LEGACY_PREFIX, AttachmentStorage
+
+logger = logging.getLogger("tickets")
+
+
+class AttachmentService:
+
+    GC_GRACE = timedelta(hours=24)
+
+    @staticmethod
+    def storage() -> AttachmentStorage:
+        return TicketReplyAttachment._meta.get_field("file").storage
+
+    # ============================================================
+    # Store
+    # ============================================================
+
+    @staticmethod
+    def ingest(content):
+        """
+        Stream ``content`` into the blob store and take a reference on it.
+        Returns ``(blob_id, name, size)``.
+        """
+        storage = AttachmentService.storage()
+        sha256, size, temp_path = storage.stream_to_temp(content)
+
+        try:
+            blob_id = AttachmentService.acquire(sha256, size)
+        except BaseException:
+            storage.discard_temp(temp_path)
+            raise
+
+        # Written after the reference is taken, so a concurrent GC of the
+        # same blob (which deletes under a row lock) can't remove it.
+        name = storage.commit_temp(temp_path, sha256)
+
+        return blob_id, name, size
+
+    @staticmethod
+    def attach(reply, uploaded_file) -> TicketReplyAttachment:
+        blob_id, name, size = AttachmentService.ingest(uploaded_file)
+
+        return TicketReplyAttachment.objects.create(
+            reply=reply,
+            file=name,
+            blob_id=blob_id,
+            original_name=os.path.basename(uploaded_file.name or "")[:255],
+            size=size,
+        )
+
+    # ============================================================
+    # Reference counting
+    # ============================================================
+
+    @staticmethod
+    def acquire(sha256: str, size: int) -> int:
+        while True:
+            blob_id = AttachmentBlob.objects.filter(
+                sha256=sha256
+            ).values_list("id", flat=True).first()
+
+            if blob_id is not None:
+                updated = AttachmentBlob.objects.filter(id=blob_id).update(
+                    ref_count=F("ref_count") + 1,
+                    unreferenced_since=None,
+                )
+                if updated:
+                    return blob_id
+                # Collected between the two queries; create it again.
+                continue
+
+            try:
+                with transaction.atomic():
+                    return AttachmentBlob.objects.create(
+                        sha256=sha256,
+                        size=size,
+                        ref_count=1,
+                    ).id
+            except IntegrityError:
+                # Created concurrently; take a reference on that one.
+                continue
+
+    @staticmethod
+    def release(blob_id: int, count: int = 1):
+        AttachmentBlob.objects.filter(id=blob_id).update(
+            ref_count=F("ref_count") - count,
+            unreferenced_since=Case(
+                When(ref_count__lte=count, then=Value(timezone.now())),
+                default=F("unreferenced_since"),
+            ),
+        )
+
+    @staticmethod
+    @transaction.atomic
+    def recount() -> int:
+        """
+        Recompute ref_count from the attachment rows.  Returns the number
+        of blobs that were off.
+        """
+        def references(field):
+            return Coalesce(Subquery(
+                TicketReplyAttachment.objects.filter(**{field: OuterRef("pk")})
+                .order_by()
+                .values(field)
+                .annotate(total=Count("id"))
+                .values("total")[:1]
+            ), 0)
+
+        blobs = AttachmentBlob.objects.select_for_update().annotate(
+            actual=references("blob") + references("thumbnail_blob")
+        ).exclude(ref_count=F("actual"))
+
+        fixed = 0
+        now = timezone.now()
+        for blob in blobs:
+            blob.ref_count = blob.actual
+            if blob.ref_count > 0:
+                blob.unreferenced_since = None
+            elif blob.unreferenced_since is None:
+                blob.unreferenced_since = now
+            blob.save(update_fields=["ref_count", "unreferenced_since"])
+            fixed += 1
+
+        return fixed
+
+    # ============================================================
+    # Garbage collection
+    # ============================================================
+
+    @staticmethod
+    def collect_garbage(grace=None, dry_run=False) -> dict:
+        grace = AttachmentService.GC_GRACE if grace is None else grace
+        cutoff = timezone.now() - grace
+        storage = AttachmentService.storage()
+
+        candidates = AttachmentBlob.objects.filter(
+            ref_count__lte=0,
+            unreferenced_since__lt=cutoff,
+        ).values_list("id", flat=True)
+
+        blobs = 0
+        freed = 0
+        packs = set()
+
+        for blob_id in list(candidates):
+            with transaction.atomic():
+                # Re-checked under the row lock: an upload that took a
+                # reference meanwhile wins.
+                blob = AttachmentBlob.objects.select_for_update().filter(
+                    id=blob_id,
+                    ref_count__lte=0,
+                    unreferenced_since__lt=cutoff,
+                ).first()
+
+                if blob is None:
+                    continue
+                if blob.attachments.exists() or blob.thumbnail_of.exists():
+                    continue
+
+                blobs += 1
+                freed += blob.size
+
+                if dry_run:
+                    continue
+
+                storage.delete(storage.blob_name(blob.sha256))
+                if blob.pack_id:
+                    packs.add(blob.pack_id)
+                blob.delete()
+
+        if packs:
+            from ticket_replies.services.pack_service import \
+                AttachmentPackService
+            for pack_id in packs:
+                AttachmentPackService.drop_if_empty(pack_id)
+
+        temp_files = AttachmentService._sweep_temp(storage, cutoff, dry_run)
+
+        return {"blobs": blobs, "bytes": freed, "temp_files": temp_files}
+
+    @staticmethod
+    def _sweep_temp(storage, cutoff, dry_run) -> int:
+        # Spool files left behind by interrupted uploads.
+        if not os.path.isdir(storage.temp_dir):
+            return 0
+
+        # Aware datetime -> epoch; mktime() would read it as local time.
+        cutoff_ts = cutoff.timestamp()
+        removed = 0
+
+        for entry in os.scandir(storage.temp_dir):
+            if entry.is_file() and entry.stat().st_mtime < cutoff_ts:
+                removed += 1
+                if not dry_run:
+                    storage.discard_temp(entry.path)
+
+        return removed
+
+    # ============================================================
+    # Legacy files
+    # ============================================================
+
+    @staticmethod
+    def adopt_legacy(delete_originals=False) -> int:
+        """
+        Move attachments stored under the old ``ticket_replies/`` layout
+        into the blob store.
+        """
+        storage = AttachmentService.storage()
+        adopted = 0
+
+        legacy = TicketReplyAttachment.objects.filter(
+            blob__isnull=True,
+            file__startswith=LEGACY_PREFIX,
+        )
+
+        for attachment in legacy.iterator(chunk_size=200):
+            old_name = attachment.file.name
+
+            if not storage.exists(old_name):
+                logger.warning(f"Attachment {attachment.id}: {old_name} is missing")
+                continue
+
+            with transaction.atomic():
+                with storage.open(old_name) as content:
+                    blob_id, name, size = AttachmentService.ingest(content)
+
+                attachment.file = name
+                attachment.blob_id = blob_id
+                attachment.size = size
+                attachment.original_name = attachment.original_name or os.path.basename(old_name)
+                attachment.save(update_fields=["file", "blob", "size", "original_name"])
+
+            if delete_originals:
+                storage.delete(old_name)
+
+            adopted += 1
+
+        return adopted
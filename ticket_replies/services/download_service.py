@@ -0,0 +1,171 @@
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse
+from django.utils.http import content_disposition_header, parse_etags
+
+from ticket_replies.services.attachment_service import AttachmentService
+from ticket_replies.storage import LEGACY_PREFIX
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class RangeFile:
+    """
+    A file positioned at ``start`` that reads at most ``length`` bytes.
+
+    Keeps ``fileno()`` so WSGI servers with sendfile support (gunicorn)
+    still hand the slice to the kernel: they sendfile from the current
+    fd position and stop at Content-Length.
+    """
+
+    def __init__(self, file, start, length):
+        self.file = file
+        self.remaining = length
+        file.seek(start)
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b""
+        if size is None or size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def tell(self):
+        return self.file.tell()
+
+    def close(self):
+        self.file.close()
+
+
+class AttachmentDownloadService:
+    """
+    Serves attachment files without copying them through Python where
+    possible.
+
+    With ``ATTACHMENT_SENDFILE_BACKEND`` set, the response only carries
+    an ``X-Accel-Redirect`` (nginx) or ``X-Sendfile`` (Apache/lighttpd)
+    header and the front proxy streams the file, Range included.
+    Otherwise a FileResponse is returned that handles single byte ranges
+    itself.
+    """
+
+    BACKENDS = ("x-accel-redirect", "x-sendfile")
+    MAX_AGE = 60 * 60
+
+    @staticmethod
+    def build_response(request, *, name, etag, content_type, filename, inline=False):
+        storage = AttachmentService.storage()
+        path = storage.path(name)
+
+        if not os.path.exists(path):
+            return None
+
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            response = HttpResponse(status=304)
+        else:
+            response = AttachmentDownloadService._sendfile(name, path)
+            if response is None:
+                response = AttachmentDownloadService._file_response(request, path, etag)
+
+            response["Content-Type"] = content_type or "application/octet-stream"
+            response["Content-Disposition"] = content_disposition_header(
+                not inline, filename or os.path.basename(name)
+            )
+
+        response["ETag"] = etag
+        response["Cache-Control"] = f"private, max-age={AttachmentDownloadService.MAX_AGE}"
+        response["X-Content-Type-Options"] = "nosniff"
+        return response
+
+    @staticmethod
+    def _sendfile(name, path):
+        backend = getattr(settings, "ATTACHMENT_SENDFILE_BACKEND", None)
+        if backend not in AttachmentDownloadService.BACKENDS:
+            return None
+
+        response = HttpResponse()
+
+        if backend == "x-sendfile":
+            response["X-Sendfile"] = path
+            return response
+
+        # The internal location only maps the blob store; legacy files
+        # outside it are served by Django.
+        if name.startswith(LEGACY_PREFIX):
+            return None
+
+        prefix = getattr(settings, "ATTACHMENT_SENDFILE_PREFIX", "/protected-attachments/")
+        response["X-Accel-Redirect"] = prefix.rstrip("/") + "/" + quote(name)
+        return response
+
+    @staticmethod
+    def _file_response(request, path, etag):
+        size = os.path.getsize(path)
+        byte_range = AttachmentDownloadService.parse_range(request, size, etag)
+
+        if byte_range == "unsatisfiable":
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            return response
+
+        file = open(path, "rb")
+
+        if byte_range is None:
+            response = FileResponse(file)
+            response["Content-Length"] = size
+        else:
+            start, end = byte_range
+            length = end - start + 1
+            response = FileResponse(RangeFile(file, start, length), status=206)
+            response["Content-Length"] = length
+            response["Content-Range"] = f"bytes {start}-{end}/{size}"
+
+        response["Accept-Ranges"] = "bytes"
+        return response
+
+    @staticmethod
+    def parse_range(request, size, etag):
+        """
+        Returns ``(start, end)`` for a satisfiable single range, None to
+        send the whole file, or "unsatisfiable".
+        """
+        header = request.headers.get("Range")
+        if not header:
+            return None
+
+        # A stale If-Range means the client's partial copy is outdated.
+        if_range = request.headers.get("If-Range")
+        if if_range and if_range != etag:
+            return None
+
+        match = RANGE_RE.match(header.strip())
+        if not match:
+            # Multiple or malformed ranges: fall back to the full body.
+            return None
+
+        first, last = match.groups()
+
+        if first:
+            start = int(first)
+            end = min(int(last), size - 1) if last else size - 1
+            if start >= size or (last and int(last) < start):
+                return "unsatisfiable"
+        elif last:
+            # Suffix range: the last N bytes.
+            suffix = int(last)
+            if suffix == 0:
+                return "unsatisfiable"
+            start = max(size - suffix, 0)
+            end = size - 1
+        else:
+            return None
+
+        return start, end
@@ -0,0 +1,284 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import uuid
+import zlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from ticket_replies.models import (AttachmentBlob, AttachmentPack,
+                                   TicketReplyAttachment)
+from ticket_replies.services.attachment_service import AttachmentService
+
+logger = logging.getLogger("tickets")
+
+
+class AttachmentPackService:
+    """
+    Cold tier for attachments of tickets that are CLOSED or archived and
+    untouched for a while.
+
+    Blobs are appended to a pack file, each compressed on its own, and
+    their (offset, length, codec) is recorded on the blob row and in a
+    JSON index next to the pack.  The hot file is then removed; a
+    download extracts it back into the hot store.  A blob is only packed
+    when every attachment using it belongs to a cold ticket.
+    """
+
+    CHUNK_SIZE = 64 * 1024
+    MAX_PACK_SIZE = 512 * 1024 * 1024
+    # Store as-is when a sample compresses worse than this (jpeg, mp4...).
+    MIN_RATIO = 0.95
+
+    @staticmethod
+    def pack_root() -> str:
+        return str(settings.ATTACHMENT_PACK_ROOT)
+
+    @staticmethod
+    def pack_path(pack_name: str) -> str:
+        return os.path.join(AttachmentPackService.pack_root(), pack_name)
+
+    # ============================================================
+    # Selection
+    # ============================================================
+
+    @staticmethod
+    def cold_blobs(older_than_days: int):
+        cutoff = timezone.now() - timedelta(days=older_than_days)
+
+        cold_ticket = (
+            Q(reply__ticket__status="CLOSED") | Q(reply__ticket__is_archived=True)
+        ) & Q(reply__ticket__updated_at__lt=cutoff)
+
+        hot_refs = TicketReplyAttachment.objects.filter(
+            Q(blob=OuterRef("pk")) | Q(thumbnail_blob=OuterRef("pk"))
+        ).exclude(cold_ticket)
+
+        return AttachmentBlob.objects.filter(ref_count__gt=0).annotate(
+            is_hot=Exists(hot_refs)
+        ).filter(is_hot=False).order_by("id")
+
+    # ============================================================
+    # Packing
+    # ============================================================
+
+    @staticmethod
+    def pack(older_than_days: int, max_pack_size=None, dry_run=False, stdout=None) -> dict:
+        max_pack_size = max_pack_size or AttachmentPackService.MAX_PACK_SIZE
+        storage = AttachmentService.storage()
+        blobs = AttachmentPackService.cold_blobs(older_than_days)
+
+        result = {"packs": 0, "blobs": 0, "bytes": 0, "evicted": 0}
+
+        # Already packed but extracted again by a download: drop the copy.
+        for blob in blobs.filter(pack__isnull=False).only("id", "sha256"):
+            if storage.exists(storage.blob_name(blob.sha256)):
+                result["evicted"] += 1
+                if not dry_run:
+                    storage.delete(storage.blob_name(blob.sha256))
+
+        batch = []
+        batch_size = 0
+
+        for blob in blobs.filter(pack__isnull=True).iterator(chunk_size=500):
+            if not storage.exists(storage.blob_name(blob.sha256)):
+                logger.warning(f"Blob {blob.sha256}: file missing, not packed")
+                continue
+
+            batch.append(blob)
+            batch_size += blob.size
+
+            if batch_size >= max_pack_size:
+                AttachmentPackService._flush(batch, result, dry_run, stdout)
+                batch, batch_size = [], 0
+
+        if batch:
+            AttachmentPackService._flush(batch, result, dry_run, stdout)
+
+        return result
+
+    @staticmethod
+    def _flush(batch, result, dry_run, stdout):
+        result["blobs"] += len(batch)
+        result["bytes"] += sum(blob.size for blob in batch)
+        result["packs"] += 1
+
+        if dry_run:
+            return
+
+        pack = AttachmentPackService.write_pack(batch)
+
+        if stdout:
+            stdout.write(f"... {pack.name}: {pack.blob_count} blobs, {pack.size} bytes")
+
+    @staticmethod
+    def write_pack(blobs) -> AttachmentPack:
+        storage = AttachmentService.storage()
+        root = AttachmentPackService.pack_root()
+        os.makedirs(root, exist_ok=True)
+
+        pack_name = f"pack-{timezone.now():%Y%m%d%H%M%S}-{uuid.uuid4().hex[:8]}.pack"
+        fd, temp_path = tempfile.mkstemp(dir=root, suffix=".part")
+
+        index = {}
+        packed = []
+
+        try:
+            with os.fdopen(fd, "wb") as out:
+                for blob in blobs:
+                    with storage.open(storage.blob_name(blob.sha256)) as source:
+                        entry = AttachmentPackService._append(out, source, blob)
+                    if entry is None:
+                        continue
+                    index[blob.sha256] = entry
+                    packed.append(blob)
+
+                out.flush()
+                os.fsync(out.fileno())
+
+            pack_path = AttachmentPackService.pack_path(pack_name)
+            with open(pack_path + ".idx", "w") as idx:
+                json.dump({"pack": pack_name, "entries": index}, idx)
+            os.replace(temp_path, pack_path)
+        except BaseException:
+            AttachmentService.storage().discard_temp(temp_path)
+            raise
+
+        with transaction.atomic():
+            pack = AttachmentPack.objects.create(
+                name=pack_name,
+                blob_count=len(packed),
+                size=os.path.getsize(pack_path),
+            )
+            for blob in packed:
+                entry = index[blob.sha256]
+                blob.pack = pack
+                blob.pack_offset = entry["offset"]
+                blob.pack_length = entry["length"]
+                blob.pack_codec = entry["codec"]
+            AttachmentBlob.objects.bulk_update(
+                packed,
+                ["pack", "pack_offset", "pack_length", "pack_codec"],
+                batch_size=500,
+            )
+
+        # Safe without locking: a concurrent upload of the same content
+        # just re-creates the hot file, and a missing one is re-extracted.
+        for blob in packed:
+            storage.delete(storage.blob_name(blob.sha256))
+
+        logger.info(f"Packed {len(packed)} blobs into {pack_name}")
+        return pack
+
+    @staticmethod
+    def _append(out, source, blob):
+        offset = out.tell()
+        digest = hashlib.sha256()
+
+        first = source.read(AttachmentPackService.CHUNK_SIZE)
+        sample = zlib.compress(first, 6) if first else b""
+        compress = bool(first) and len(sample) < len(first) * AttachmentPackService.MIN_RATIO
+
+        compressor = zlib.compressobj(6) if compress else None
+        chunk = first
+
+        while chunk:
+            digest.update(chunk)
+            out.write(compressor.compress(chunk) if compressor else chunk)
+            chunk = source.read(AttachmentPackService.CHUNK_SIZE)
+
+        if compressor:
+            out.write(compressor.flush())
+
+        if digest.hexdigest() != blob.sha256:
+            logger.warning(f"Blob {blob.sha256}: content does not match its hash, not packed")
+            out.seek(offset)
+            out.truncate()
+            return None
+
+        return {
+            "offset": offset,
+            "length": out.tell() - offset,
+            "size": blob.size,
+            "codec": "zlib" if compress else "raw",
+        }
+
+    # ============================================================
+    # Extraction
+    # ============================================================
+
+    @staticmethod
+    def ensure_hot(blob) -> bool:
+        """
+        Make sure the blob's hot file exists, extracting it from its pack
+        if needed.  Returns False when neither is available.
+        """
+        storage = AttachmentService.storage()
+        name = storage.blob_name(blob.sha256)
+
+        if storage.exists(name):
+            return True
+        if not blob.pack_id:
+            return False
+
+        os.makedirs(storage.temp_dir, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=storage.temp_dir)
+        digest = hashlib.sha256()
+
+        try:
+            with open(AttachmentPackService.pack_path(blob.pack.name), "rb") as pack, \
+                    os.fdopen(fd, "wb") as out:
+                pack.seek(blob.pack_offset)
+                remaining = blob.pack_length
+                decompressor = zlib.decompressobj() if blob.pack_codec == "zlib" else None
+
+                while remaining > 0:
+                    chunk = pack.read(min(AttachmentPackService.CHUNK_SIZE, remaining))
+                    if not chunk:
+                        raise IOError(f"Pack {blob.pack.name} is truncated")
+                    remaining -= len(chunk)
+                    if decompressor:
+                        chunk = decompressor.decompress(chunk)
+                    digest.update(chunk)
+                    out.write(chunk)
+
+                if decompressor:
+                    tail = decompressor.flush()
+                    digest.update(tail)
+                    out.write(tail)
+
+            if digest.hexdigest() != blob.sha256:
+                raise IOError(f"Blob {blob.sha256} is corrupt in pack {blob.pack.name}")
+        except BaseException:
+            storage.discard_temp(temp_path)
+            raise
+
+        storage.commit_temp(temp_path, blob.sha256)
+        logger.info(f"Extracted blob {blob.sha256} from {blob.pack.name}")
+        return True
+
+    # ============================================================
+    # Cleanup
+    # ============================================================
+
+    @staticmethod
+    def drop_if_empty(pack_id):
+        pack = AttachmentPack.objects.filter(id=pack_id).first()
+        if pack is None or pack.blobs.exists():
+            return
+
+        for path in (AttachmentPackService.pack_path(pack.name),
+                     AttachmentPackService.pack_path(pack.name) + ".idx"):
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+
+        pack.delete()
+        logger.info(f"Deleted empty pack {pack.name}")
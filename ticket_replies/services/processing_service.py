@@ -0,0 +1,345 @@
+import io
+import logging
+import mimetypes
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.base import ContentFile, File
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from ticket_replies.models import TicketReplyAttachment
+from ticket_replies.services.attachment_service import AttachmentService
+
+logger = logging.getLogger("tickets")
+
+
+# (offset, magic bytes, mime type); enough for what technicians upload.
+SIGNATURES = [
+    (0, b"\xff\xd8\xff", "image/jpeg"),
+    (0, b"\x89PNG\r\n\x1a\n", "image/png"),
+    (0, b"GIF87a", "image/gif"),
+    (0, b"GIF89a", "image/gif"),
+    (0, b"%PDF-", "application/pdf"),
+    (0, b"PK\x03\x04", "application/zip"),
+    (4, b"ftypheic", "image/heic"),
+    (4, b"ftypmif1", "image/heif"),
+    (4, b"ftyp", "video/mp4"),
+]
+
+
+class AttachmentProcessingService:
+    """
+    Post-processing of reply attachments off the request path.
+
+    The reply write only spools each upload to local disk and creates
+    PENDING attachment rows; after commit the job goes to a process-local thread
+    pool which sniffs the type, downscales/recompresses large images,
+    renders a thumbnail and moves the result into the blob store.  Jobs
+    lost with the process are picked up again by
+    ``process_pending_attachments``.
+    """
+
+    MAX_DIMENSION = 2048
+    THUMBNAIL_SIZE = (320, 320)
+    JPEG_QUALITY = 85
+    STALE_AFTER = timedelta(minutes=10)
+
+    _executor = None
+    _lock = threading.Lock()
+
+    # ============================================================
+    # Request side
+    # ============================================================
+
+    @staticmethod
+    def spool_files(files) -> list:
+        """
+        Copy uploads to the spool directory.  Done before the reply
+        transaction opens so no row lock is held during file I/O.
+        """
+        storage = AttachmentService.storage()
+        spooled = []
+
+        try:
+            for uploaded_file in files:
+                _, size, spool_path = storage.stream_to_temp(
+                    uploaded_file, directory=storage.spool_dir
+                )
+                spooled.append({
+                    "original_name": os.path.basename(uploaded_file.name or "")[:255],
+                    "size": size,
+                    "spool_path": spool_path,
+                })
+        except BaseException:
+            AttachmentProcessingService.discard(spooled)
+            raise
+
+        return spooled
+
+    @staticmethod
+    def discard(spooled):
+        storage = AttachmentService.storage()
+        for entry in spooled:
+            storage.discard_temp(entry["spool_path"])
+
+    @staticmethod
+    def create_pending(reply, spooled) -> list:
+        if not spooled:
+            return []
+
+        attachments = TicketReplyAttachment.objects.bulk_create([
+            TicketReplyAttachment(
+                reply=reply,
+                processing_status="PENDING",
+                **entry,
+            )
+            for entry in spooled
+        ])
+
+        for attachment in attachments:
+            AttachmentProcessingService.submit(attachment.id)
+
+        return attachments
+
+    @staticmethod
+    def submit(attachment_id):
+        def enqueue():
+            if getattr(settings, "ATTACHMENT_PROCESSING_SYNC", False):
+                AttachmentProcessingService.process(attachment_id)
+            else:
+                AttachmentProcessingService.executor().submit(
+                    AttachmentProcessingService.run_job, attachment_id
+                )
+
+        transaction.on_commit(enqueue)
+
+    @staticmethod
+    def executor() -> ThreadPoolExecutor:
+        with AttachmentProcessingService._lock:
+            if AttachmentProcessingService._executor is None:
+                AttachmentProcessingService._executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, "ATTACHMENT_PROCESSING_WORKERS", 2),
+                    thread_name_prefix="attachment-processing",
+                )
+            return AttachmentProcessingService._executor
+
+    # ============================================================
+    # Worker side
+    # ============================================================
+
+    @staticmethod
+    def run_job(attachment_id):
+        # Worker threads get their own DB connection; close it after
+        # each job so it never outlives CONN_MAX_AGE.
+        close_old_connections()
+        try:
+            AttachmentProcessingService.process(attachment_id)
+        except Exception:
+            logger.exception(f"Attachment {attachment_id}: processing crashed")
+        finally:
+            close_old_connections()
+
+    @staticmethod
+    def process(attachment_id) -> bool:
+        started_at = timezone.now()
+        claimed = TicketReplyAttachment.objects.filter(
+            id=attachment_id,
+            processing_status="PENDING",
+        ).update(processing_status="PROCESSING", processing_started_at=started_at)
+
+        if not claimed:
+            return False
+
+        attachment = TicketReplyAttachment.objects.get(id=attachment_id)
+
+        # Only this claim may finish the job: if it was requeued and
+        # claimed again meanwhile, our result is discarded.
+        own_claim = TicketReplyAttachment.objects.filter(
+            id=attachment_id,
+            processing_status="PROCESSING",
+            processing_started_at=started_at,
+        )
+
+        try:
+            result = AttachmentProcessingService._process_file(attachment)
+        except Exception as exc:
+            logger.warning(f"Attachment {attachment_id}: processing failed: {exc}")
+            own_claim.update(
+                processing_status="FAILED",
+                processing_error=str(exc)[:1000],
+            )
+            return False
+
+        with transaction.atomic():
+            updated = own_claim.update(
+                processing_status="READY",
+                processing_error=None,
+                spool_path="",
+                **result,
+            )
+
+        if not updated:
+            # Deleted or reclaimed while we worked; give the references back.
+            AttachmentService.release(result["blob_id"])
+            if result.get("thumbnail_blob_id"):
+                AttachmentService.release(result["thumbnail_blob_id"])
+            return False
+
+        AttachmentService.storage().discard_temp(attachment.spool_path)
+        return True
+
+    @staticmethod
+    def _process_file(attachment) -> dict:
+        result = {}
+        try:
+            return AttachmentProcessingService._ingest_file(attachment, result)
+        except BaseException:
+            # Don't leak the thumbnail's reference when the content ingest
+            # fails; a retry takes a fresh one.
+            if result.get("thumbnail_blob_id"):
+                AttachmentService.release(result["thumbnail_blob_id"])
+            raise
+
+    @staticmethod
+    def _ingest_file(attachment, result) -> dict:
+        with open(attachment.spool_path, "rb") as spooled:
+            head = spooled.read(32)
+            mime_type = AttachmentProcessingService.sniff_mime(
+                head, attachment.original_name
+            )
+
+            spooled.seek(0)
+            result.update(mime_type=mime_type, width=None, height=None)
+
+            if mime_type.startswith("image/"):
+                image_result = AttachmentProcessingService._process_image(spooled)
+                if image_result is not None:
+                    content, thumbnail, width, height = image_result
+                    result.update(width=width, height=height)
+
+                    if thumbnail is not None:
+                        thumb_id, thumb_name, _ = AttachmentService.ingest(thumbnail)
+                        result.update(thumbnail=thumb_name, thumbnail_blob_id=thumb_id)
+
+                    if content is not None:
+                        if content.name.endswith(".jpg"):
+                            result["mime_type"] = "image/jpeg"
+                        blob_id, name, size = AttachmentService.ingest(content)
+                        result.update(file=name, blob_id=blob_id, size=size)
+                        return result
+
+                spooled.seek(0)
+
+            blob_id, name, size = AttachmentService.ingest(File(spooled))
+            result.update(file=name, blob_id=blob_id, size=size)
+            return result
+
+    @staticmethod
+    def _process_image(source):
+        """
+        Returns ``(content, thumbnail, width, height)`` where ``content``
+        is the recompressed image (or None to keep the original), or None
+        when Pillow can't read the file.
+        """
+        try:
+            from PIL import Image, ImageOps
+        except ImportError:
+            return None
+
+        try:
+            image = Image.open(source)
+            image.load()
+        except Exception:
+            return None
+
+        original_format = image.format
+        # Phone photos are usually stored sideways with an EXIF hint.
+        image = ImageOps.exif_transpose(image)
+        width, height = image.size
+
+        content = None
+        max_dimension = AttachmentProcessingService.MAX_DIMENSION
+        if max(width, height) > max_dimension and original_format in ("JPEG", "PNG", "WEBP"):
+            resized = image.copy()
+            resized.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+            width, height = resized.size
+
+            buffer = io.BytesIO()
+            if original_format == "PNG":
+                resized.save(buffer, format="PNG", optimize=True)
+                suffix = ".png"
+            else:
+                resized.convert("RGB").save(
+                    buffer,
+                    format="JPEG",
+                    quality=AttachmentProcessingService.JPEG_QUALITY,
+                    optimize=True,
+                )
+                suffix = ".jpg"
+            content = ContentFile(buffer.getvalue(), name=f"resized{suffix}")
+
+        thumb = image.copy()
+        thumb.thumbnail(AttachmentProcessingService.THUMBNAIL_SIZE, Image.LANCZOS)
+        buffer = io.BytesIO()
+        thumb.convert("RGB").save(buffer, format="JPEG", quality=80)
+        thumbnail = ContentFile(buffer.getvalue(), name="thumbnail.jpg")
+
+        return content, thumbnail, width, height
+
+    @staticmethod
+    def sniff_mime(head: bytes, filename: str = "") -> str:
+        guessed, _ = mimetypes.guess_type(filename or "")
+
+        for offset, magic, mime_type in SIGNATURES:
+            if head[offset:offset + len(magic)] == magic:
+                # docx/xlsx are zip containers; the extension is more precise.
+                if mime_type == "application/zip" and guessed:
+                    return guessed
+                return mime_type
+
+        if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+            return "image/webp"
+
+        return guessed or "application/octet-stream"
+
+    # ============================================================
+    # Recovery
+    # ============================================================
+
+    @staticmethod
+    def requeue_stale(stale_after=None) -> int:
+        """
+        Put jobs that were PROCESSING for too long (worker died) back to
+        PENDING.
+        """
+        stale_after = stale_after or AttachmentProcessingService.STALE_AFTER
+        cutoff = timezone.now() - stale_after
+
+        # Rows claimed before processing_started_at existed have no
+        # claim time; their age is the best proxy.
+        return TicketReplyAttachment.objects.filter(
+            Q(processing_started_at__lt=cutoff)
+            | Q(processing_started_at__isnull=True, created_at__lt=cutoff),
+            processing_status="PROCESSING",
+        ).update(processing_status="PENDING")
+
+    @staticmethod
+    def process_pending(stdout=None) -> int:
+        processed = 0
+
+        pending = TicketReplyAttachment.objects.filter(
+            processing_status="PENDING"
+        ).values_list("id", flat=True)
+
+        for attachment_id in list(pending):
+            if AttachmentProcessingService.process(attachment_id):
+                processed += 1
+                if stdout:
+                    stdout.write(f"... attachment #{attachment_id} ready")
+
+        return processed
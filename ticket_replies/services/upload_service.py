@@ -0,0 +1,217 @@
+import base64
+import fcntl
+import logging
+import os
+import tempfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import (APIException, NotFound,
+                                       PermissionDenied, ValidationError)
+
+from livetrack1.services.authorization_service import AuthorizationService
+from ticket_replies.models import AttachmentUpload
+from ticket_replies.services.attachment_service import AttachmentService
+from ticket_replies.services.processing_service import \
+    AttachmentProcessingService
+
+logger = logging.getLogger("tickets")
+
+
+class UploadConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "Upload offset does not match."
+    default_code = "upload_conflict"
+
+
+class AttachmentUploadService:
+    """
+    Resumable uploads following the tus 1.0 core protocol: the client
+    creates an upload with its total length, PATCHes chunks at the
+    current offset and HEADs the upload to learn where to resume after a
+    dropped connection.
+
+    Chunks are streamed from the request straight onto the staging file.
+    The DB row is only touched before and after a chunk, so a slow
+    client never holds a transaction open; an exclusive file lock keeps
+    two PATCHes of the same upload from interleaving.
+    """
+
+    TUS_VERSION = "1.0.0"
+    CHUNK_SIZE = 64 * 1024
+    EXPIRE_AFTER = timedelta(days=1)
+
+    @staticmethod
+    def max_size() -> int:
+        return getattr(settings, "ATTACHMENT_UPLOAD_MAX_SIZE", 2 * 1024 ** 3)
+
+    @staticmethod
+    def parse_metadata(header: str) -> dict:
+        # "filename d29ybGQucG5n,filetype aW1hZ2UvcG5n"
+        metadata = {}
+        for pair in filter(None, (header or "").split(",")):
+            key, _, value = pair.strip().partition(" ")
+            try:
+                metadata[key] = base64.b64decode(value).decode() if value else ""
+            except ValueError:
+                raise ValidationError({"Upload-Metadata": f"Invalid value for {key}."})
+        return metadata
+
+    # ============================================================
+    # Lifecycle
+    # ============================================================
+
+    @staticmethod
+    def create(*, reply, admin, length, metadata) -> AttachmentUpload:
+        try:
+            length = int(length)
+        except (TypeError, ValueError):
+            raise ValidationError({"Upload-Length": "Must be an integer."})
+
+        if length < 0:
+            raise ValidationError({"Upload-Length": "Must not be negative."})
+        if length > AttachmentUploadService.max_size():
+            raise ValidationError({"Upload-Length": "Upload is too large."})
+
+        storage = AttachmentService.storage()
+        os.makedirs(storage.upload_dir, exist_ok=True)
+        fd, staging_path = tempfile.mkstemp(dir=storage.upload_dir)
+        os.close(fd)
+
+        upload = AttachmentUpload.objects.create(
+            reply=reply,
+            created_by=admin,
+            original_name=os.path.basename(metadata.get("filename", ""))[:255],
+            length=length,
+            staging_path=staging_path,
+        )
+
+        if length == 0:
+            AttachmentUploadService._complete(upload.id)
+            upload.refresh_from_db()
+
+        logger.info(
+            f"Upload {upload.id} ({length} bytes) started "
+            f"for reply {reply.id} by {admin.username}"
+        )
+
+        return upload
+
+    @staticmethod
+    def get(upload_id, admin) -> AttachmentUpload:
+        try:
+            upload = AttachmentUpload.objects.get(id=upload_id)
+        except AttachmentUpload.DoesNotExist:
+            raise NotFound("Upload not found.")
+
+        if upload.created_by_id != admin.id and not AuthorizationService.is_root(admin.role):
+            raise PermissionDenied("You do not own this upload.")
+
+        return upload
+
+    @staticmethod
+    def append(*, upload_id, admin, offset, stream) -> AttachmentUpload:
+        upload = AttachmentUploadService.get(upload_id, admin)
+
+        try:
+            offset = int(offset)
+        except (TypeError, ValueError):
+            raise ValidationError({"Upload-Offset": "Must be an integer."})
+
+        if upload.status != "UPLOADING":
+            raise UploadConflict("Upload is already complete.")
+
+        with open(upload.staging_path, "r+b") as staging:
+            try:
+                fcntl.flock(staging, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                raise UploadConflict("Another chunk is being written to this upload.")
+
+            # Another PATCH may have finished while we waited for the lock.
+            upload.refresh_from_db(fields=["offset", "status"])
+            if upload.status != "UPLOADING" or offset != upload.offset:
+                raise UploadConflict(
+                    f"Upload-Offset {offset} does not match {upload.offset}."
+                )
+
+            # Bytes past the recorded offset are from a chunk that never
+            # got recorded; drop them.
+            staging.truncate(offset)
+            staging.seek(offset)
+
+            written = 0
+            remaining = upload.length - offset
+
+            try:
+                while remaining > 0:
+                    chunk = stream.read(min(AttachmentUploadService.CHUNK_SIZE, remaining))
+                    if not chunk:
+                        break
+                    staging.write(chunk)
+                    written += len(chunk)
+                    remaining -= len(chunk)
+            except OSError as exc:
+                # Client went away; keep what arrived so it can resume.
+                logger.warning(f"Upload {upload.id}: chunk interrupted: {exc}")
+            finally:
+                staging.flush()
+                os.fsync(staging.fileno())
+
+                upload.offset = offset + written
+                AttachmentUpload.objects.filter(id=upload.id, offset=offset).update(
+                    offset=upload.offset,
+                    updated_at=timezone.now(),
+                )
+
+        if upload.offset == upload.length:
+            AttachmentUploadService._complete(upload.id)
+            upload.refresh_from_db()
+
+        return upload
+
+    @staticmethod
+    @transaction.atomic
+    def _complete(upload_id):
+        upload = AttachmentUpload.objects.select_for_update().get(id=upload_id)
+        if upload.status != "UPLOADING":
+            return
+
+        # The staging file becomes the attachment's spool file and goes
+        # through the same post-processing as a multipart upload.
+        attachment, = AttachmentProcessingService.create_pending(upload.reply, [{
+            "original_name": upload.original_name,
+            "size": upload.length,
+            "spool_path": upload.staging_path,
+        }])
+
+        upload.status = "COMPLETE"
+        upload.attachment = attachment
+        upload.save(update_fields=["status", "attachment", "updated_at"])
+
+        logger.info(f"Upload {upload.id} complete as attachment {attachment.id}")
+
+    @staticmethod
+    def terminate(upload_id, admin):
+        upload = AttachmentUploadService.get(upload_id, admin)
+        if upload.status != "UPLOADING":
+            raise UploadConflict("Upload is already complete.")
+        # The staging file is removed by the post_delete signal.
+        upload.delete()
+
+    @staticmethod
+    def expire(older_than=None) -> int:
+        older_than = older_than or AttachmentUploadService.EXPIRE_AFTER
+        expired = AttachmentUpload.objects.filter(
+            status="UPLOADING",
+            updated_at__lt=timezone.now() - older_than,
+        )
+
+        count = 0
+        for upload in expired.iterator():
+            upload.delete()
+            count += 1
+
+        return count
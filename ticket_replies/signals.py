@@ -0,0 +1,24 @@
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from ticket_replies.models import AttachmentUpload, TicketReplyAttachment
+from ticket_replies.services.attachment_service import AttachmentService
+
+
+# Attachments go away by cascade (reply, ticket, customer), so the blob
+# reference is dropped from a signal.  The file itself is left to GC.
+@receiver(post_delete, sender=TicketReplyAttachment)
+def on_attachment_deleted(sender, instance, **kwargs):
+    if instance.blob_id:
+        AttachmentService.release(instance.blob_id)
+    if instance.thumbnail_blob_id:
+        AttachmentService.release(instance.thumbnail_blob_id)
+    if instance.spool_path:
+        AttachmentService.storage().discard_temp(instance.spool_path)
+
+
+# A finished upload's staging file belongs to its attachment by now.
+@receiver(post_delete, sender=AttachmentUpload)
+def on_upload_deleted(sender, instance, **kwargs):
+    if instance.status == "UPLOADING":
+        AttachmentService.storage().discard_temp(instance.staging_path)
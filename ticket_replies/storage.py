@@ -0,0 +1,122 @@
+import hashlib
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.utils._os import safe_join
+
+# Attachments uploaded before content addressing were stored by the
+# default storage under this prefix (upload_to="ticket_replies/").
+LEGACY_PREFIX = "ticket_replies/"
+
+
+class AttachmentStorage(FileSystemStorage):
+    """
+    Content-addressed storage for reply attachments.
+
+    Every blob lives once at ``<root>/ab/cd/<sha256>``; the SHA-256 is
+    computed while the upload is streamed to a temp file, so nothing is
+    read twice or held in memory.  Reference counting is done by
+    AttachmentService on the AttachmentBlob rows.
+    """
+
+    chunk_size = 64 * 1024
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("location", settings.ATTACHMENT_STORAGE_ROOT)
+        super().__init__(**kwargs)
+
+    # ============================================================
+    # Paths
+    # ============================================================
+
+    @staticmethod
+    def blob_name(sha256: str) -> str:
+        return f"{sha256[:2]}/{sha256[2:4]}/{sha256}"
+
+    @property
+    def temp_dir(self) -> str:
+        return os.path.join(self.location, "tmp")
+
+    @property
+    def spool_dir(self) -> str:
+        # Uploads waiting for post-processing; not swept by GC.
+        return os.path.join(self.location, "spool")
+
+    @property
+    def upload_dir(self) -> str:
+        # Partial resumable uploads; see AttachmentUploadService.
+        return os.path.join(self.location, "uploads")
+
+    def path(self, name):
+        if name.startswith(LEGACY_PREFIX):
+            return safe_join(settings.LEGACY_ATTACHMENT_ROOT, name)
+        return super().path(name)
+
+    # ============================================================
+    # Hash-while-streaming
+    # ============================================================
+
+    def stream_to_temp(self, content, directory=None):
+        """
+        Copy ``content`` to a temp file under the storage root and return
+        ``(sha256, size, temp_path)``.
+        """
+        directory = directory or self.temp_dir
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory)
+
+        digest = hashlib.sha256()
+        size = 0
+
+        try:
+            with os.fdopen(fd, "wb") as out:
+                if hasattr(content, "seek"):
+                    content.seek(0)
+                for chunk in content.chunks(self.chunk_size):
+                    digest.update(chunk)
+                    out.write(chunk)
+                    size += len(chunk)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+        return digest.hexdigest(), size, temp_path
+
+    def commit_temp(self, temp_path, sha256) -> str:
+        """
+        Move a hashed temp file to its blob path.  Identical content may
+        already be there; replacing it is atomic and harmless.
+        """
+        name = self.blob_name(sha256)
+        final_path = self.path(name)
+
+        os.makedirs(os.path.dirname(final_path), exist_ok=True)
+        os.replace(temp_path, final_path)
+        if self.file_permissions_mode is not None:
+            os.chmod(final_path, self.file_permissions_mode)
+
+        return name
+
+    def discard_temp(self, temp_path):
+        try:
+            os.unlink(temp_path)
+        except FileNotFoundError:
+            pass
+
+    # ============================================================
+    # Storage API
+    # ============================================================
+
+    def get_available_name(self, name, max_length=None):
+        # Names are derived from content; identical content may overwrite.
+        return name
+
+    def _save(self, name, content):
+        sha256, _, temp_path = self.stream_to_temp(content)
+        return self.commit_temp(temp_path, sha256)
+
+
+def get_attachment_storage():
+    return AttachmentStorage()
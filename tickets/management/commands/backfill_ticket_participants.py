@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from tickets.services.participant_service import TicketParticipantService
+
+
+class Command(BaseCommand):
+    help = "Fill the ticket participant index from ticket creators and reply performers."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=TicketParticipantService.BATCH_SIZE,
+            help="Tickets processed per batch.",
+        )
+
+    def handle(self, *args, **options):
+        written = TicketParticipantService.backfill(
+            batch_size=options["batch_size"],
+            stdout=self.stdout if options["verbosity"] > 1 else None,
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"Ticket participants backfilled ({written} rows)")
+        )
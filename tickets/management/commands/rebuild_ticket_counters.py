@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from tickets.services.counter_service import TicketCounterService
+
+
+class Command(BaseCommand):
+    help = "Rebuild the dashboard ticket counters from the ticket table, or check them for drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only report drift; exit with an error if any is found.",
+        )
+
+    def handle(self, *args, **options):
+        drift = TicketCounterService.find_drift()
+
+        for row in drift:
+            self.stdout.write(
+                f"{row['status']}/{row['priority']}/{row['ticket_type']}"
+                f"{' (archived)' if row['is_archived'] else ''}: "
+                f"stored={row['stored']} actual={row['actual']}"
+            )
+
+        if options["check"]:
+            if drift:
+                raise CommandError(f"{len(drift)} ticket counter(s) out of sync")
+            self.stdout.write(self.style.SUCCESS("Ticket counters are in sync"))
+            return
+
+        total = TicketCounterService.rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(f"Ticket counters rebuilt ({total} tickets)")
+        )
@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from tickets.services.snapshot_service import TicketSnapshotService
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy current customer data into the snapshot of non-closed tickets "
+        "(e.g. after a distributor-wide VLAN renumbering)."
+    )
+
+    def add_arguments(self, parser):
+        scope = parser.add_mutually_exclusive_group(required=True)
+        scope.add_argument("--distributor", type=int, help="Only this distributor's customers.")
+        scope.add_argument("--customer", type=int, help="Only this customer.")
+        scope.add_argument("--all", action="store_true", help="Every customer.")
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=TicketSnapshotService.BATCH_SIZE,
+            help="Ticket id range updated per statement/transaction.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report how many tickets would change, then roll back.",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive")
+
+        def refresh():
+            return TicketSnapshotService.refresh(
+                customer_id=options["customer"],
+                distributor_id=options["distributor"],
+                batch_size=options["batch_size"],
+                stdout=self.stdout if options["verbosity"] > 1 else None,
+            )
+
+        if options["dry_run"]:
+            # Same statements, in one transaction that is rolled back.
+            with transaction.atomic():
+                updated = refresh()
+                transaction.set_rollback(True)
+            self.stdout.write(f"{updated} ticket(s) would be updated")
+            return
+
+        updated = refresh()
+        self.stdout.write(self.style.SUCCESS(f"{updated} ticket snapshot(s) refreshed"))
@@ -0,0 +1,21 @@
+# Generated by Django 6.0.2 on 2026-10-18 17:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0005_rename_username_ticket_customer_username_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['created_at', 'id'], name='ticket_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['status', 'created_at', 'id'], name='ticket_status_created_id_idx'),
+        ),
+    ]
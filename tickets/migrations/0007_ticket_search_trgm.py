@@ -0,0 +1,40 @@
+from django.db import migrations
+
+SEARCH_COLUMNS = [
+    "customer_full_name",
+    "customer_phone",
+    "customer_username",
+]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    # GIN trigram indexes are PostgreSQL-only; SQLite uses the FTS5
+    # table that SearchService creates on first use.
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for column in SEARCH_COLUMNS:
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS ticket_{column}_trgm "
+            f"ON tickets_ticket USING gin ({column} gin_trgm_ops)"
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    for column in SEARCH_COLUMNS:
+        schema_editor.execute(f"DROP INDEX IF EXISTS ticket_{column}_trgm")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0006_ticket_created_id_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
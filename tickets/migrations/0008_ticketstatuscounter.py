@@ -0,0 +1,42 @@
+# Generated by Django 6.0.2 on 2026-10-18 17:05
+
+from django.db import migrations, models
+from django.db.models import Count
+
+KEY_FIELDS = ("status", "priority", "ticket_type", "is_archived")
+
+
+def populate_counters(apps, schema_editor):
+    Ticket = apps.get_model("tickets", "Ticket")
+    TicketStatusCounter = apps.get_model("tickets", "TicketStatusCounter")
+
+    rows = Ticket.objects.values(*KEY_FIELDS).annotate(total=Count("id")).order_by()
+    TicketStatusCounter.objects.bulk_create([
+        TicketStatusCounter(**{f: row[f] for f in KEY_FIELDS}, count=row["total"])
+        for row in rows
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0007_ticket_search_trgm'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TicketStatusCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('ACCEPTED', 'Accepted'), ('IN_PROGRESS', 'In Progress'), ('DONE', 'Done'), ('CLOSED', 'Closed')], max_length=20)),
+                ('priority', models.CharField(choices=[('IMPORTANT', 'Important'), ('NORMAL', 'Normal')], max_length=10)),
+                ('ticket_type', models.CharField(choices=[('MAINTENANCE', 'Maintenance'), ('NEW_USER', 'New User')], max_length=20)),
+                ('is_archived', models.BooleanField(default=False)),
+                ('count', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('status', 'priority', 'ticket_type', 'is_archived'), name='unique_ticket_counter_key')],
+            },
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 6.0.2 on 2026-10-18 17:08
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0008_ticketstatuscounter'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TicketParticipant',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role_in_ticket', models.CharField(choices=[('CREATOR', 'Creator'), ('PERFORMER', 'Performer'), ('BOTH', 'Creator & Performer')], max_length=10)),
+                ('last_activity', models.DateTimeField()),
+                ('admin', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ticket_participations', to=settings.AUTH_USER_MODEL)),
+                ('ticket', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='participants', to='tickets.ticket')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['admin', 'last_activity', 'id'], name='participant_admin_activity_idx')],
+                'constraints': [models.UniqueConstraint(fields=('admin', 'ticket'), name='unique_ticket_participant')],
+            },
+        ),
+    ]
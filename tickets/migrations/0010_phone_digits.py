@@ -0,0 +1,50 @@
+# Generated by Django 6.0.2 on 2026-10-18 17:22
+
+from django.db import migrations, models
+
+from livetrack1.phone import normalize_phone
+
+
+def populate_phone_digits(apps, schema_editor):
+    Ticket = apps.get_model("tickets", "Ticket")
+
+    batch = []
+    for ticket in Ticket.objects.only("id", "customer_phone").iterator(chunk_size=2000):
+        ticket.customer_phone_digits = normalize_phone(ticket.customer_phone)
+        ticket.customer_phone_reversed = ticket.customer_phone_digits[::-1]
+        batch.append(ticket)
+        if len(batch) >= 2000:
+            Ticket.objects.bulk_update(batch, ["customer_phone_digits", "customer_phone_reversed"])
+            batch = []
+
+    if batch:
+        Ticket.objects.bulk_update(batch, ["customer_phone_digits", "customer_phone_reversed"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0009_ticketparticipant'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ticket',
+            name='customer_phone_digits',
+            field=models.CharField(blank=True, default='', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='ticket',
+            name='customer_phone_reversed',
+            field=models.CharField(blank=True, default='', max_length=20),
+        ),
+        migrations.RunPython(populate_phone_digits, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['customer_phone_digits'], name='ticket_phone_digits_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['customer_phone_reversed'], name='ticket_phone_reversed_idx'),
+        ),
+    ]
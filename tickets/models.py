@@ -1,7 +1,11 @@
 from django.db import models
 
+from livetrack1.phone import PhoneDigitsMixin, PhoneNormalizingQuerySet
 
-class Ticket(models.Model):
+
+class Ticket(PhoneDigitsMixin, models.Model):
+
+    PHONE_FIELDS = ("customer_phone", "customer_phone_digits", "customer_phone_reversed")
 
     # =========================
     # Choices
@@ -88,6 +92,9 @@ class Ticket(models.Model):
     customer_username = models.CharField(max_length=150, null=True, blank=True)
     customer_password = models.CharField(max_length=255, null=True, blank=True)
     customer_phone = models.CharField(max_length=20, null=True, blank=True)
+    # Derived from customer_phone on every write path; see livetrack1.phone.
+    customer_phone_digits = models.CharField(max_length=20, blank=True, default="")
+    customer_phone_reversed = models.CharField(max_length=20, blank=True, default="")
     customer_location = models.CharField(max_length=255, null=True, blank=True)
 
     vlan = models.CharField(max_length=100, null=True, blank=True)
@@ -111,5 +118,102 @@ class Ticket(models.Model):
         related_name="closed_tickets"
     )
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["created_at", "id"],
+                name="ticket_created_id_idx"
+            ),
+            models.Index(
+                fields=["status", "created_at", "id"],
+                name="ticket_status_created_id_idx"
+            ),
+            # Exact, prefix and suffix (reversed) phone lookups.
+            models.Index(
+                fields=["customer_phone_digits"],
+                name="ticket_phone_digits_idx"
+            ),
+            models.Index(
+                fields=["customer_phone_reversed"],
+                name="ticket_phone_reversed_idx"
+            ),
+        ]
+
+    objects = PhoneNormalizingQuerySet.as_manager()
+
     def __str__(self):
         return f"Ticket #{self.id} - {self.customer_full_name}"
+
+
+class TicketStatusCounter(models.Model):
+    """
+    Number of tickets per (status, priority, ticket_type, is_archived).
+
+    At most 5 x 2 x 2 x 2 rows, maintained by TicketCounterService in the
+    same transaction as the ticket write, so the dashboard never has to
+    aggregate over the ticket table.
+    """
+
+    status = models.CharField(max_length=20, choices=Ticket.STATUS_CHOICES)
+    priority = models.CharField(max_length=10, choices=Ticket.PRIORITY_CHOICES)
+    ticket_type = models.CharField(max_length=20, choices=Ticket.TICKET_TYPE_CHOICES)
+    is_archived = models.BooleanField(default=False)
+
+    count = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["status", "priority", "ticket_type", "is_archived"],
+                name="unique_ticket_counter_key"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.status}/{self.priority}/{self.ticket_type}: {self.count}"
+
+
+class TicketParticipant(models.Model):
+    """
+    One row per (admin, ticket) the admin created or performed work on,
+    so an admin's ticket history is a single index range scan.
+    """
+
+    ROLE_CHOICES = [
+        ("CREATOR", "Creator"),
+        ("PERFORMER", "Performer"),
+        ("BOTH", "Creator & Performer"),
+    ]
+
+    admin = models.ForeignKey(
+        "admins.Admin",
+        on_delete=models.CASCADE,
+        related_name="ticket_participations"
+    )
+
+    ticket = models.ForeignKey(
+        Ticket,
+        on_delete=models.CASCADE,
+        related_name="participants"
+    )
+
+    role_in_ticket = models.CharField(max_length=10, choices=ROLE_CHOICES)
+
+    last_activity = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["admin", "ticket"],
+                name="unique_ticket_participant"
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["admin", "last_activity", "id"],
+                name="participant_admin_activity_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.admin_id} {self.role_in_ticket} on Ticket #{self.ticket_id}"
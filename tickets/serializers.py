@@ -1,6 +1,8 @@
 from django.utils import timezone
 from rest_framework import serializers
 
+from distributors.models import Distributor
+from ticket_replies.models import TicketReply, TicketReplyAttachment
 from tickets.models import Ticket
 
 from .models import Ticket
@@ -94,6 +96,47 @@ class MaintenanceTicketSerializer(serializers.Serializer):
         allow_null=True
     )
 
+class BulkMaintenanceTicketSerializer(serializers.Serializer):
+    customer_ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        required=False,
+        allow_empty=False,
+        max_length=10000
+    )
+    distributor_id = serializers.IntegerField(required=False)
+    priority = serializers.ChoiceField(
+        choices=["IMPORTANT", "NORMAL"],
+        required=False
+    )
+    availability_time = serializers.CharField(
+        required=False,
+        allow_blank=True
+    )
+    note = serializers.CharField(
+        required=False,
+        allow_blank=True,
+        allow_null=True
+    )
+
+    def validate_distributor_id(self, value):
+        if not Distributor.objects.filter(id=value).exists():
+            raise serializers.ValidationError("Distributor not found.")
+        return value
+
+    def validate(self, attrs):
+        has_customers = bool(attrs.get("customer_ids"))
+        has_distributor = attrs.get("distributor_id") is not None
+
+        if not has_customers and not has_distributor:
+            raise serializers.ValidationError(
+                "Provide customer_ids or distributor_id."
+            )
+        if has_customers and has_distributor:
+            raise serializers.ValidationError(
+                "Provide either customer_ids or distributor_id, not both."
+            )
+        return attrs
+
 class TicketResponseSerializer(serializers.ModelSerializer):
     created_by = serializers.SerializerMethodField()
 
@@ -182,3 +225,76 @@ class CustomerTicketCardSerializer(serializers.ModelSerializer):
             "priority",
             "created_at",
         ]
+
+
+class TicketReplyAttachmentSerializer(serializers.ModelSerializer):
+
+    file = serializers.SerializerMethodField()
+    thumbnail = serializers.SerializerMethodField()
+
+    class Meta:
+        model = TicketReplyAttachment
+        fields = [
+            "id",
+            "reply",
+            "original_name",
+            "size",
+            "processing_status",
+            "processing_error",
+            "mime_type",
+            "width",
+            "height",
+            "file",
+            "thumbnail",
+            "created_at",
+        ]
+
+    def get_file(self, obj):
+        return obj.file.name or None
+
+    def get_thumbnail(self, obj):
+        return obj.thumbnail.name or None
+
+
+class TicketReplyTimelineSerializer(serializers.ModelSerializer):
+    """
+    One timeline entry.  Expects ``admin`` selected and ``performed_by`` /
+    ``attachments`` prefetched, so a page costs the same few queries
+    whatever its size.
+    """
+
+    admin = serializers.SerializerMethodField()
+    performed_by = serializers.SerializerMethodField()
+    attachments = TicketReplyAttachmentSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = TicketReply
+        fields = [
+            "id",
+            "status",
+            "note",
+            "speed_test",
+            "username",
+            "password",
+            "vlan",
+            "speed",
+            "site_name",
+            "device_name",
+            "created_at",
+            "admin",
+            "performed_by",
+            "attachments",
+        ]
+
+    def get_admin(self, obj):
+        return {
+            "id": obj.admin.id,
+            "username": obj.admin.username,
+            "full_name": obj.admin.full_name,
+        }
+
+    def get_performed_by(self, obj):
+        return [
+            {"id": admin.id, "full_name": admin.full_name}
+            for admin in obj.performed_by.all()
+        ]
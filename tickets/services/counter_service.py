@@ -0,0 +1,140 @@
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+
+from tickets.models import Ticket, TicketStatusCounter
+
+KEY_FIELDS = ("status", "priority", "ticket_type", "is_archived")
+
+
+class TicketCounterService:
+
+    # ============================================================
+    # Keys
+    # ============================================================
+
+    @staticmethod
+    def key_for(ticket) -> tuple:
+        return tuple(getattr(ticket, field) for field in KEY_FIELDS)
+
+    # ============================================================
+    # Incremental updates (call inside the ticket write transaction)
+    # ============================================================
+
+    @staticmethod
+    def increment(key: tuple, delta: int = 1):
+        if not delta:
+            return
+
+        lookup = dict(zip(KEY_FIELDS, key))
+
+        updated = TicketStatusCounter.objects.filter(**lookup).update(
+            count=F("count") + delta
+        )
+        if updated:
+            return
+
+        try:
+            with transaction.atomic():
+                TicketStatusCounter.objects.create(**lookup, count=delta)
+        except IntegrityError:
+            # Another transaction created the row first.
+            TicketStatusCounter.objects.filter(**lookup).update(
+                count=F("count") + delta
+            )
+
+    @staticmethod
+    def move(old_key: tuple, new_key: tuple):
+        if old_key == new_key:
+            return
+        TicketCounterService.increment(old_key, -1)
+        TicketCounterService.increment(new_key, 1)
+
+    @staticmethod
+    def apply_changes(changes: Counter):
+        # Keys are sorted so concurrent writers lock counter rows in the
+        # same order.
+        for key in sorted(changes):
+            TicketCounterService.increment(key, changes[key])
+
+    # ============================================================
+    # Reads
+    # ============================================================
+
+    @staticmethod
+    def status_totals() -> dict:
+        totals = {status: 0 for status, _ in Ticket.STATUS_CHOICES}
+
+        for row in TicketStatusCounter.objects.values("status", "count"):
+            totals[row["status"]] = totals.get(row["status"], 0) + row["count"]
+
+        return totals
+
+    @staticmethod
+    def breakdown() -> list:
+        return list(
+            TicketStatusCounter.objects.filter(count__gt=0)
+            .values(*KEY_FIELDS, "count")
+            .order_by(*KEY_FIELDS)
+        )
+
+    # ============================================================
+    # Rebuild / drift check
+    # ============================================================
+
+    @staticmethod
+    def compute_actual() -> dict:
+        rows = Ticket.objects.values(*KEY_FIELDS).annotate(total=Count("id")).order_by()
+        return {
+            tuple(row[field] for field in KEY_FIELDS): row["total"]
+            for row in rows
+        }
+
+    @staticmethod
+    def find_drift() -> list:
+        stored = {
+            tuple(row[field] for field in KEY_FIELDS): row["count"]
+            for row in TicketStatusCounter.objects.values(*KEY_FIELDS, "count")
+        }
+        actual = TicketCounterService.compute_actual()
+
+        drift = []
+        for key in sorted(set(stored) | set(actual)):
+            if stored.get(key, 0) != actual.get(key, 0):
+                drift.append({
+                    **dict(zip(KEY_FIELDS, key)),
+                    "stored": stored.get(key, 0),
+                    "actual": actual.get(key, 0),
+                })
+        return drift
+
+    @staticmethod
+    @transaction.atomic
+    def rebuild() -> int:
+        """
+        Recount from the ticket table.  Existing counter rows are locked
+        first, so writers that commit afterwards apply their delta on top
+        of the recomputed value instead of being lost.
+        """
+        existing = {
+            TicketCounterService.key_for(row): row
+            for row in TicketStatusCounter.objects.select_for_update()
+        }
+        actual = TicketCounterService.compute_actual()
+
+        to_create = []
+        for key in set(existing) | set(actual):
+            total = actual.get(key, 0)
+            row = existing.get(key)
+            if row is None:
+                to_create.append(
+                    TicketStatusCounter(**dict(zip(KEY_FIELDS, key)), count=total)
+                )
+            elif row.count != total:
+                row.count = total
+                row.save(update_fields=["count"])
+
+        TicketStatusCounter.objects.bulk_create(to_create)
+
+        return sum(actual.values())
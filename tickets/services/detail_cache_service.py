@@ -0,0 +1,64 @@
+import hashlib
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+
+from ticket_replies.models import TicketReply
+from tickets.models import Ticket
+
+
+class TicketDetailCacheService:
+    """
+    Versioned cache for the ticket detail payload.
+
+    The version (-> strong ETag) is derived from ``updated_at`` and the
+    latest reply id in one indexed query, so a cached payload can never be
+    served for a newer ticket, even with a per-process cache.  Writes also
+    drop the entry explicitly to free it early.
+    """
+
+    key_prefix = "ticket-detail"
+    timeout = 60 * 60
+
+    @staticmethod
+    def _key(ticket_id) -> str:
+        return f"{TicketDetailCacheService.key_prefix}:{ticket_id}"
+
+    @staticmethod
+    def get_version(ticket_id):
+        last_reply = TicketReply.objects.filter(
+            ticket=OuterRef("pk")
+        ).order_by("-id").values("id")[:1]
+
+        row = Ticket.objects.filter(pk=ticket_id).annotate(
+            last_reply_id=Subquery(last_reply)
+        ).values_list("updated_at", "last_reply_id").first()
+
+        if row is None:
+            return None
+
+        updated_at, last_reply_id = row
+        raw = f"{ticket_id}:{updated_at.isoformat()}:{last_reply_id or 0}"
+        return hashlib.sha1(raw.encode()).hexdigest()
+
+    @staticmethod
+    def get_payload(ticket_id, version):
+        cached = cache.get(TicketDetailCacheService._key(ticket_id))
+        if cached and cached[0] == version:
+            return cached[1]
+        return None
+
+    @staticmethod
+    def set_payload(ticket_id, version, payload):
+        cache.set(
+            TicketDetailCacheService._key(ticket_id),
+            (version, payload),
+            TicketDetailCacheService.timeout,
+        )
+
+    @staticmethod
+    def invalidate(ticket_id):
+        transaction.on_commit(
+            lambda: cache.delete(TicketDetailCacheService._key(ticket_id))
+        )
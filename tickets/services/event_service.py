@@ -0,0 +1,187 @@
+import asyncio
+import itertools
+import logging
+import threading
+from collections import deque
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger("tickets")
+
+
+class InProcessBroker:
+    """
+    Fan-out of ticket events to the SSE subscribers of this process.
+
+    publish() may be called from any thread (sync views); each subscriber
+    owns an asyncio.Queue on its own event loop.  A short history lets
+    reconnecting clients resume from Last-Event-ID.  Swap it through the
+    TICKET_EVENT_BROKER setting for a broker that spans processes.
+    """
+
+    history_size = 500
+    queue_size = 1000
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._history = deque(maxlen=self.history_size)
+        self._subscribers = set()
+
+    def publish(self, event_type: str, data: dict) -> dict:
+        with self._lock:
+            event = {
+                "id": next(self._ids),
+                "type": event_type,
+                "data": data,
+            }
+            self._history.append(event)
+            subscribers = list(self._subscribers)
+
+        for subscriber in subscribers:
+            subscriber.deliver(event)
+
+        return event
+
+    def subscribe(self, last_event_id=None) -> "Subscription":
+        subscription = Subscription(self, asyncio.get_running_loop(), self.queue_size)
+
+        with self._lock:
+            if last_event_id is not None:
+                for event in self._history:
+                    if event["id"] > last_event_id:
+                        subscription.queue.put_nowait(event)
+            self._subscribers.add(subscription)
+
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+
+class Subscription:
+
+    def __init__(self, broker, loop, maxsize):
+        self.broker = broker
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.overflowed = False
+
+    def deliver(self, event):
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            # Subscriber's loop is gone.
+            self.broker.unsubscribe(self)
+
+    def _put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # A client that can't keep up is dropped; it reconnects with
+            # Last-Event-ID and replays from history.
+            self.overflowed = True
+            self.broker.unsubscribe(self)
+
+    async def get(self, timeout):
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class TicketEventService:
+
+    CREATED = "ticket.created"
+    STATUS_CHANGED = "ticket.status_changed"
+    REPLY_ADDED = "ticket.reply_added"
+    ARCHIVED = "ticket.archived"
+
+    _broker = None
+    _broker_lock = threading.Lock()
+
+    @staticmethod
+    def get_broker():
+        if TicketEventService._broker is None:
+            with TicketEventService._broker_lock:
+                if TicketEventService._broker is None:
+                    path = getattr(
+                        settings,
+                        "TICKET_EVENT_BROKER",
+                        "tickets.services.event_service.InProcessBroker",
+                    )
+                    TicketEventService._broker = import_string(path)()
+        return TicketEventService._broker
+
+    @staticmethod
+    def ticket_payload(ticket) -> dict:
+        return {
+            "ticket_id": ticket.id,
+            "ticket_type": ticket.ticket_type,
+            "priority": ticket.priority,
+            "status": ticket.status,
+            "is_archived": ticket.is_archived,
+            "customer_full_name": ticket.customer_full_name,
+            "customer_location": ticket.customer_location,
+            "distributor_name": ticket.distributor_name,
+        }
+
+    @staticmethod
+    def publish(event_type: str, data: dict):
+        """
+        Publish once the surrounding transaction commits, so screens never
+        see a ticket that was rolled back.
+        """
+        data = {**data, "at": timezone.now().isoformat()}
+
+        def send():
+            try:
+                TicketEventService.get_broker().publish(event_type, data)
+            except Exception:
+                logger.exception(f"Failed to publish {event_type} event")
+
+        transaction.on_commit(send)
+
+    # ============================================================
+    # Event helpers used by TicketService
+    # ============================================================
+
+    @staticmethod
+    def ticket_created(ticket):
+        TicketEventService.publish(
+            TicketEventService.CREATED,
+            TicketEventService.ticket_payload(ticket),
+        )
+
+    @staticmethod
+    def status_changed(ticket, old_status, admin):
+        TicketEventService.publish(
+            TicketEventService.STATUS_CHANGED,
+            {
+                **TicketEventService.ticket_payload(ticket),
+                "old_status": old_status,
+                "changed_by": admin.username,
+            },
+        )
+
+    @staticmethod
+    def reply_added(ticket, reply, admin):
+        TicketEventService.publish(
+            TicketEventService.REPLY_ADDED,
+            {
+                **TicketEventService.ticket_payload(ticket),
+                "reply_id": reply.id,
+                "admin": admin.username,
+            },
+        )
+
+    @staticmethod
+    def archived(ticket):
+        TicketEventService.publish(
+            TicketEventService.ARCHIVED,
+            TicketEventService.ticket_payload(ticket),
+        )
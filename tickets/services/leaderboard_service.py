@@ -0,0 +1,129 @@
+from datetime import datetime, time, timedelta
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from admins.models import Admin
+
+
+class AdminLeaderboardService:
+    """
+    Done/closed ticket counts per admin in one annotated query, cached per
+    date range.  Reply creation bumps a version number that is part of
+    every cache key; the short timeout bounds staleness on caches that
+    are not shared between processes.
+    """
+
+    PERIODS = ("today", "week", "month", "all")
+
+    timeout = 60
+    version_key = "admin-leaderboard:version"
+
+    # ============================================================
+    # Query
+    # ============================================================
+
+    @staticmethod
+    def query(date_from=None, date_to=None) -> list:
+        reply_filter = Q()
+        if date_from:
+            reply_filter &= Q(performed_replies__created_at__gte=date_from)
+        if date_to:
+            reply_filter &= Q(performed_replies__created_at__lt=date_to)
+
+        admins = Admin.objects.filter(role="ADMIN").annotate(
+            done_tickets=Count(
+                "performed_replies__ticket",
+                filter=reply_filter & Q(performed_replies__status="DONE"),
+                distinct=True,
+            ),
+            # "closed_tickets" is taken by the Ticket.closed_by reverse relation.
+            closed_tickets_count=Count(
+                "performed_replies__ticket",
+                filter=reply_filter & Q(performed_replies__status="CLOSED"),
+                distinct=True,
+            ),
+        ).order_by("-done_tickets", "-closed_tickets_count", "full_name", "id")
+
+        return list(admins.values(
+            "id",
+            "full_name",
+            "phone",
+            "location",
+            "is_active",
+            "done_tickets",
+            "closed_tickets_count",
+        ))
+
+    # ============================================================
+    # Cache
+    # ============================================================
+
+    @staticmethod
+    def get_counts(date_from=None, date_to=None) -> list:
+        version = cache.get_or_set(AdminLeaderboardService.version_key, 1, None)
+        key = (
+            f"admin-leaderboard:{version}:"
+            f"{date_from.isoformat() if date_from else ''}:"
+            f"{date_to.isoformat() if date_to else ''}"
+        )
+
+        rows = cache.get(key)
+        if rows is None:
+            rows = AdminLeaderboardService.query(date_from, date_to)
+            cache.set(key, rows, AdminLeaderboardService.timeout)
+
+        return rows
+
+    @staticmethod
+    def invalidate():
+        def bump():
+            try:
+                cache.incr(AdminLeaderboardService.version_key)
+            except ValueError:
+                cache.set(AdminLeaderboardService.version_key, 1, None)
+
+        transaction.on_commit(bump)
+
+    # ============================================================
+    # Periods
+    # ============================================================
+
+    @staticmethod
+    def period_start(period: str):
+        if period == "all":
+            return None
+
+        today = timezone.localdate()
+
+        if period == "today":
+            start = today
+        elif period == "week":
+            start = today - timedelta(days=today.weekday())
+        elif period == "month":
+            start = today.replace(day=1)
+        else:
+            raise ValueError(f"Unknown period {period}")
+
+        return timezone.make_aware(datetime.combine(start, time.min))
+
+    @staticmethod
+    def leaderboard(period: str) -> list:
+        rows = AdminLeaderboardService.get_counts(
+            date_from=AdminLeaderboardService.period_start(period)
+        )
+
+        # Dense ranking on (done, closed); rows are already sorted.
+        ranked = []
+        rank = 0
+        previous = None
+        for row in rows:
+            score = (row["done_tickets"], row["closed_tickets_count"])
+            if score != previous:
+                rank += 1
+                previous = score
+            ranked.append({**row, "rank": rank})
+
+        return ranked
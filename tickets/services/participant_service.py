@@ -0,0 +1,143 @@
+from django.db.models import Max
+from django.utils import timezone
+
+from ticket_replies.models import TicketReply
+from tickets.models import Ticket, TicketParticipant
+
+
+class TicketParticipantService:
+
+    BATCH_SIZE = 1000
+
+    # ============================================================
+    # Incremental updates (call inside the ticket write transaction)
+    # ============================================================
+
+    @staticmethod
+    def record_creators(tickets):
+        TicketParticipant.objects.bulk_create(
+            [
+                TicketParticipant(
+                    admin_id=ticket.created_by_admin_id,
+                    ticket_id=ticket.id,
+                    role_in_ticket="CREATOR",
+                    last_activity=ticket.created_at,
+                )
+                for ticket in tickets
+                if ticket.created_by_admin_id
+            ],
+            batch_size=TicketParticipantService.BATCH_SIZE,
+            ignore_conflicts=True,
+        )
+
+    @staticmethod
+    def record_performers(ticket, admin_ids, at=None):
+        at = at or timezone.now()
+
+        # A creator who also performs becomes BOTH; everyone else is
+        # inserted as PERFORMER or just has last_activity bumped.
+        TicketParticipant.objects.filter(
+            ticket=ticket,
+            admin_id__in=admin_ids,
+            role_in_ticket="CREATOR",
+        ).update(role_in_ticket="BOTH")
+
+        TicketParticipant.objects.bulk_create(
+            [
+                TicketParticipant(
+                    admin_id=admin_id,
+                    ticket_id=ticket.id,
+                    role_in_ticket="PERFORMER",
+                    last_activity=at,
+                )
+                for admin_id in admin_ids
+            ],
+            update_conflicts=True,
+            unique_fields=["admin", "ticket"],
+            update_fields=["last_activity"],
+        )
+
+    # ============================================================
+    # Reads
+    # ============================================================
+
+    @staticmethod
+    def for_admin(admin):
+        return TicketParticipant.objects.filter(admin=admin).select_related(
+            "ticket__created_by_admin"
+        )
+
+    # ============================================================
+    # Backfill
+    # ============================================================
+
+    @staticmethod
+    def backfill(batch_size=None, stdout=None) -> int:
+        """
+        Rebuild participation rows from tickets and reply performers,
+        one ticket-id range at a time so memory stays bounded.
+        """
+        batch_size = batch_size or TicketParticipantService.BATCH_SIZE
+        Through = TicketReply.performed_by.through
+
+        written = 0
+        last_id = 0
+
+        while True:
+            ticket_ids = list(
+                Ticket.objects.filter(id__gt=last_id)
+                .order_by("id")
+                .values_list("id", flat=True)[:batch_size]
+            )
+            if not ticket_ids:
+                break
+
+            first_id, last_id = ticket_ids[0], ticket_ids[-1]
+            rows = {}
+
+            creators = Ticket.objects.filter(
+                id__range=(first_id, last_id),
+                created_by_admin__isnull=False,
+            ).values_list("id", "created_by_admin_id", "created_at")
+
+            for ticket_id, admin_id, created_at in creators:
+                rows[(admin_id, ticket_id)] = ["CREATOR", created_at]
+
+            performers = (
+                Through.objects.filter(
+                    ticketreply__ticket__id__range=(first_id, last_id)
+                )
+                .values_list("ticketreply__ticket", "admin")
+                .annotate(last=Max("ticketreply__created_at"))
+                .order_by()
+            )
+
+            for ticket_id, admin_id, last in performers:
+                row = rows.get((admin_id, ticket_id))
+                if row is None:
+                    rows[(admin_id, ticket_id)] = ["PERFORMER", last]
+                else:
+                    row[0] = "BOTH"
+                    row[1] = max(row[1], last)
+
+            TicketParticipant.objects.bulk_create(
+                [
+                    TicketParticipant(
+                        admin_id=admin_id,
+                        ticket_id=ticket_id,
+                        role_in_ticket=role,
+                        last_activity=last_activity,
+                    )
+                    for (admin_id, ticket_id), (role, last_activity) in rows.items()
+                ],
+                batch_size=batch_size,
+                update_conflicts=True,
+                unique_fields=["admin", "ticket"],
+                update_fields=["role_in_ticket", "last_activity"],
+            )
+
+            written += len(rows)
+            if stdout:
+                stdout.write(f"... tickets up to #{last_id}: {written} rows")
+
+        return written
@@ -0,0 +1,166 @@
+import logging
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Max, Min, OuterRef, Subquery
+from django.utils import timezone
+
+from customers.models import Customer
+from distributors.models import Distributor
+from tickets.models import Ticket
+
+logger = logging.getLogger("tickets")
+
+
+class TicketSnapshotService:
+    """
+    Copies current customer data into the snapshot columns of that
+    customer's non-closed tickets.
+
+    One set-based ``UPDATE tickets ... FROM customers LEFT JOIN
+    distributors`` per call (or per id range in bulk), touching only rows
+    whose snapshot actually differs.  ``updated_at`` is bumped so the
+    versioned ticket-detail and customer-overview caches move on.
+    Closed tickets keep the data they were closed with.
+    """
+
+    # Ticket snapshot column -> customer column ("distributor__name" is
+    # the joined distributor's name).
+    FIELDS = {
+        "customer_full_name": "full_name",
+        "customer_username": "username",
+        "customer_password": "password",
+        "customer_phone": "phone",
+        "customer_phone_digits": "phone_digits",
+        "customer_phone_reversed": "phone_reversed",
+        "customer_location": "location",
+        "vlan": "vlan",
+        "speed": "speed",
+        "distributor_name": "distributor__name",
+    }
+
+    BATCH_SIZE = 5000
+
+    @staticmethod
+    def enabled() -> bool:
+        return getattr(settings, "TICKET_SNAPSHOT_PROPAGATION", False)
+
+    @staticmethod
+    def refresh_customer(customer_id) -> int:
+        return TicketSnapshotService.refresh(customer_id=customer_id)
+
+    @staticmethod
+    def refresh(customer_id=None, distributor_id=None, batch_size=None, stdout=None) -> int:
+        """
+        Refresh snapshots for one customer, one distributor's customers,
+        or everyone.  With ``batch_size`` the tickets are walked in id
+        ranges, each committed on its own, so a distributor-wide run never
+        holds many row locks at once.  Returns the number of tickets
+        changed.
+        """
+        if not batch_size:
+            return TicketSnapshotService._refresh_range(customer_id, distributor_id, None, None)
+
+        tickets = Ticket.objects.exclude(status="CLOSED")
+        if customer_id is not None:
+            tickets = tickets.filter(customer_id=customer_id)
+        if distributor_id is not None:
+            tickets = tickets.filter(customer__distributor_id=distributor_id)
+
+        bounds = tickets.aggregate(low=Min("id"), high=Max("id"))
+        if bounds["low"] is None:
+            return 0
+
+        updated = 0
+        for low in range(bounds["low"], bounds["high"] + 1, batch_size):
+            updated += TicketSnapshotService._refresh_range(
+                customer_id, distributor_id, low, low + batch_size - 1
+            )
+            if stdout:
+                stdout.write(f"... tickets {low}-{low + batch_size - 1}: {updated} updated so far")
+
+        return updated
+
+    @staticmethod
+    @transaction.atomic
+    def _refresh_range(customer_id, distributor_id, low, high) -> int:
+        if connection.vendor in ("postgresql", "sqlite"):
+            updated = TicketSnapshotService._update_from(customer_id, distributor_id, low, high)
+        else:
+            updated = TicketSnapshotService._update_subqueries(customer_id, distributor_id, low, high)
+
+        if updated:
+            logger.info(
+                f"Refreshed customer snapshot on {updated} ticket(s) "
+                f"(customer={customer_id}, distributor={distributor_id}, ids={low}-{high})"
+            )
+        return updated
+
+    @staticmethod
+    def _update_from(customer_id, distributor_id, low, high) -> int:
+        ticket_table = Ticket._meta.db_table
+        customer_table = Customer._meta.db_table
+        distributor_table = Distributor._meta.db_table
+
+        def ticket_column(name):
+            return connection.ops.quote_name(Ticket._meta.get_field(name).column)
+
+        def source_column(name):
+            if name == "distributor__name":
+                return "d.{}".format(connection.ops.quote_name(Distributor._meta.get_field("name").column))
+            return "c.{}".format(connection.ops.quote_name(Customer._meta.get_field(name).column))
+
+        distinct = "IS DISTINCT FROM" if connection.vendor == "postgresql" else "IS NOT"
+        pairs = [
+            (ticket_column(target), source_column(source))
+            for target, source in TicketSnapshotService.FIELDS.items()
+        ]
+
+        assignments = ", ".join(f"{target} = {source}" for target, source in pairs)
+        changed = " OR ".join(f"t.{target} {distinct} {source}" for target, source in pairs)
+
+        where = [
+            f"t.{ticket_column('customer')} = c.id",
+            f"t.{ticket_column('status')} <> 'CLOSED'",
+            f"({changed})",
+        ]
+        params = [connection.ops.adapt_datetimefield_value(timezone.now())]
+
+        if customer_id is not None:
+            where.append("c.id = %s")
+            params.append(customer_id)
+        if distributor_id is not None:
+            where.append("c.distributor_id = %s")
+            params.append(distributor_id)
+        if low is not None:
+            where.append("t.id BETWEEN %s AND %s")
+            params.extend([low, high])
+
+        sql = (
+            f"UPDATE {ticket_table} AS t "
+            f"SET {assignments}, {ticket_column('updated_at')} = %s "
+            f"FROM {customer_table} c "
+            f"LEFT JOIN {distributor_table} d ON d.id = c.distributor_id "
+            f"WHERE {' AND '.join(where)}"
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.rowcount
+
+    @staticmethod
+    def _update_subqueries(customer_id, distributor_id, low, high) -> int:
+        # Portable fallback: one correlated subquery per column.
+        tickets = Ticket.objects.exclude(status="CLOSED")
+        if customer_id is not None:
+            tickets = tickets.filter(customer_id=customer_id)
+        if distributor_id is not None:
+            tickets = tickets.filter(customer__distributor_id=distributor_id)
+        if low is not None:
+            tickets = tickets.filter(id__range=(low, high))
+
+        customer = Customer.objects.filter(pk=OuterRef("customer_id"))
+        values = {
+            target: Subquery(customer.values(source)[:1])
+            for target, source in TicketSnapshotService.FIELDS.items()
+        }
+        return tickets.update(updated_at=timezone.now(), **values)
@@ -1,15 +1,26 @@
 import logging
+from collections import Counter
 
-from django.db.models import Count, Q
+from django.db import transaction
 from django.utils import timezone
 from rest_framework.exceptions import PermissionDenied, ValidationError
 
 from admins.models import Admin
 from customers.models import Customer
+from customers.services.duplicate_service import CustomerDuplicateService
+from customers.services.overview_service import CustomerOverviewService
 from distributors.models import Distributor
 from livetrack1.services.authorization_service import AuthorizationService
 from ticket_replies.models import TicketReply
+from ticket_replies.services.processing_service import \
+    AttachmentProcessingService
 from tickets.models import Ticket
+from tickets.services.counter_service import (KEY_FIELDS,
+                                               TicketCounterService)
+from tickets.services.detail_cache_service import TicketDetailCacheService
+from tickets.services.event_service import TicketEventService
+from tickets.services.leaderboard_service import AdminLeaderboardService
+from tickets.services.participant_service import TicketParticipantService
 
 logger = logging.getLogger("tickets")
 
@@ -21,6 +32,7 @@ class TicketService:
     # ============================================================
 
     @staticmethod
+    @transaction.atomic
     def create_new_user_ticket(
         *,
         role: str,
@@ -34,6 +46,12 @@ class TicketService:
 
         distributor = Distributor.objects.get(id=customer_data["distributor"])
 
+        candidates = CustomerDuplicateService.check(
+            customer_data["full_name"],
+            customer_data["phone"],
+            allow_duplicate=customer_data.get("allow_duplicate") in (True, "1", "true"),
+        )
+
         customer = Customer.objects.create(
             distributor=distributor,
             full_name=customer_data["full_name"],
@@ -66,6 +84,12 @@ class TicketService:
             customer_note=ticket_data.get("note"),
         )
 
+        TicketCounterService.increment(TicketCounterService.key_for(ticket))
+        TicketParticipantService.record_creators([ticket])
+        CustomerOverviewService.invalidate(ticket.customer_id)
+        TicketEventService.ticket_created(ticket)
+
+        ticket.customer_duplicates = candidates
         return ticket
 
     # ============================================================
@@ -73,6 +97,7 @@ class TicketService:
     # ============================================================
 
     @staticmethod
+    @transaction.atomic
     def create_maintenance_ticket(
         *,
         role: str,
@@ -111,8 +136,117 @@ class TicketService:
             customer_note=note_value,
         )
 
+        TicketCounterService.increment(TicketCounterService.key_for(ticket))
+        TicketParticipantService.record_creators([ticket])
+        CustomerOverviewService.invalidate(ticket.customer_id)
+        TicketEventService.ticket_created(ticket)
+
         return ticket
 
+    # ============================================================
+    # BULK CREATE MAINTENANCE TICKETS (outages)
+    # ============================================================
+
+    BULK_BATCH_SIZE = 500
+
+    @staticmethod
+    @transaction.atomic
+    def create_maintenance_tickets_bulk(
+        *,
+        role: str,
+        created_by_admin,
+        ticket_data: dict,
+        customer_ids: list = None,
+        distributor_id: int = None
+    ) -> dict:
+
+        if not AuthorizationService.can_create_ticket(role):
+            raise PermissionDenied("Not allowed to create tickets")
+
+        if not customer_ids and distributor_id is None:
+            raise ValidationError("customer_ids or distributor_id is required")
+        if customer_ids and distributor_id is not None:
+            raise ValidationError("Provide either customer_ids or distributor_id, not both.")
+
+        customers = Customer.objects.select_related("distributor").only(
+            "id",
+            "full_name",
+            "username",
+            "password",
+            "phone",
+            "location",
+            "vlan",
+            "speed",
+            "distributor__name",
+        )
+
+        if distributor_id is not None:
+            customers = customers.filter(distributor_id=distributor_id)
+        if customer_ids:
+            customer_ids = list(dict.fromkeys(customer_ids))
+            customers = customers.filter(id__in=customer_ids)
+
+        customers = list(customers.order_by("id"))
+
+        failed = []
+        if customer_ids:
+            found = {customer.id for customer in customers}
+            failed = [
+                {"customer_id": customer_id, "error": "Customer does not exist"}
+                for customer_id in customer_ids
+                if customer_id not in found
+            ]
+
+        priority = ticket_data.get("priority", "NORMAL")
+        note_value = ticket_data.get("note") or None
+
+        tickets = [
+            Ticket(
+                ticket_type="MAINTENANCE",
+                priority=priority,
+                status="PENDING",
+                customer=customer,
+                created_by_admin=created_by_admin,
+                availability_time=ticket_data.get("availability_time"),
+                is_archived=False,
+
+                customer_full_name=customer.full_name,
+                customer_username=customer.username,
+                customer_password=customer.password,
+                customer_phone=customer.phone,
+                customer_location=customer.location,
+                vlan=customer.vlan,
+                speed=customer.speed,
+                distributor_name=customer.distributor.name if customer.distributor else None,
+                customer_note=note_value,
+            )
+            for customer in customers
+        ]
+
+        tickets = Ticket.objects.bulk_create(
+            tickets,
+            batch_size=TicketService.BULK_BATCH_SIZE
+        )
+
+        TicketCounterService.apply_changes(
+            Counter(TicketCounterService.key_for(ticket) for ticket in tickets)
+        )
+        TicketParticipantService.record_creators(tickets)
+        for customer_id in {ticket.customer_id for ticket in tickets}:
+            CustomerOverviewService.invalidate(customer_id)
+        for ticket in tickets:
+            TicketEventService.ticket_created(ticket)
+
+        logger.info(
+            f"{len(tickets)} maintenance tickets bulk-created "
+            f"by {created_by_admin.username} ({len(failed)} failed)"
+        )
+
+        return {
+            "tickets": tickets,
+            "failed": failed,
+        }
+
     # ============================================================
     # CREATE REPLY (Unified Reply + Status Update)
     # ============================================================
@@ -123,8 +257,35 @@ class TicketService:
         role: str,
         admin,
         ticket,
-        data: dict
+        data: dict,
+        files=()
     ):
+        """
+        Attachments are spooled to disk first, then everything else is
+        written in one transaction with a fixed number of queries:
+        ticket lock, performer check, reply insert, performers insert,
+        two participant upserts and one attachment insert (when there are
+        files).  A status change adds a ticket update and two counter
+        updates, plus a savepoint, insert and release for a counter row
+        that doesn't exist yet.  Pinned by tickets.tests.
+        """
+        spooled = AttachmentProcessingService.spool_files(files)
+
+        try:
+            return TicketService._write_ticket_reply(
+                role=role,
+                admin=admin,
+                ticket=ticket,
+                data=data,
+                spooled=spooled,
+            )
+        except BaseException:
+            AttachmentProcessingService.discard(spooled)
+            raise
+
+    @staticmethod
+    @transaction.atomic
+    def _write_ticket_reply(*, role, admin, ticket, data, spooled):
 
         performed_by_ids = data.get("performed_by")
 
@@ -133,9 +294,27 @@ class TicketService:
                 "performed_by is required and must contain at least one admin."
             )
 
-        performers = Admin.objects.filter(id__in=performed_by_ids)
+        try:
+            performed_by_ids = {int(admin_id) for admin_id in performed_by_ids}
+        except (TypeError, ValueError):
+            raise ValidationError("performed_by must contain admin ids.")
+
+        # Re-read the counter key under a row lock so two concurrent
+        # replies can't both apply a transition from the same old status,
+        # and the counters move from the row's current key.
+        locked = (
+            Ticket.objects.select_for_update()
+            .values(*KEY_FIELDS)
+            .get(pk=ticket.pk)
+        )
+        for field, value in locked.items():
+            setattr(ticket, field, value)
 
-        if performers.count() != len(performed_by_ids):
+        performer_ids = list(
+            Admin.objects.filter(id__in=performed_by_ids).values_list("id", flat=True)
+        )
+
+        if len(performer_ids) != len(performed_by_ids):
             raise ValidationError(
                 "One or more admins in performed_by do not exist."
             )
@@ -180,8 +359,18 @@ class TicketService:
         # ===============================
         if new_status != ticket.status:
             old_status = ticket.status
+            old_key = TicketCounterService.key_for(ticket)
+            update_fields = ["status", "updated_at"]
+
             ticket.status = new_status
-            ticket.save(update_fields=["status", "updated_at"])
+            if new_status == "CLOSED":
+                ticket.closed_at = timezone.now()
+                ticket.closed_by = admin
+                update_fields += ["closed_at", "closed_by"]
+
+            ticket.save(update_fields=update_fields)
+            TicketCounterService.move(old_key, TicketCounterService.key_for(ticket))
+            TicketEventService.status_changed(ticket, old_status, admin)
 
             logger.info(
                 f"Ticket {ticket.id} status changed "
@@ -190,10 +379,6 @@ class TicketService:
             )
 
             if new_status == "CLOSED":
-                ticket.closed_at = timezone.now()
-                ticket.closed_by = admin
-                ticket.save(update_fields=["closed_at", "closed_by"])
-
                 logger.info(
                     f"Ticket {ticket.id} closed by {admin.username}"
                 )
@@ -212,10 +397,71 @@ class TicketService:
             device_name=data.get("device_name"),
         )
 
-        reply.performed_by.set(performers)
+        # The reply is new, so the through rows can be inserted directly
+        # instead of going through performed_by.set()'s diffing.
+        Through = TicketReply.performed_by.through
+        Through.objects.bulk_create([
+            Through(ticketreply_id=reply.id, admin_id=admin_id)
+            for admin_id in performer_ids
+        ])
+
+        TicketParticipantService.record_performers(
+            ticket,
+            performer_ids,
+            reply.created_at
+        )
+
+        reply.spooled_attachments = AttachmentProcessingService.create_pending(
+            reply, spooled
+        )
+
+        TicketDetailCacheService.invalidate(ticket.id)
+        CustomerOverviewService.invalidate(ticket.customer_id)
+        AdminLeaderboardService.invalidate()
+        TicketEventService.reply_added(ticket, reply, admin)
 
         return reply
 
+    # ============================================================
+    # UPDATE / ARCHIVE
+    # ============================================================
+
+    @staticmethod
+    @transaction.atomic
+    def update_ticket(*, ticket, serializer) -> Ticket:
+        # The counter key comes from the locked row, and only the fields
+        # being changed are written, so a concurrent status change isn't
+        # overwritten with the view's stale copy.
+        ticket = Ticket.objects.select_for_update().get(pk=ticket.pk)
+        old_key = TicketCounterService.key_for(ticket)
+
+        for field, value in serializer.validated_data.items():
+            setattr(ticket, field, value)
+        ticket.save(update_fields=[*serializer.validated_data, "updated_at"])
+        serializer.instance = ticket
+
+        TicketCounterService.move(old_key, TicketCounterService.key_for(ticket))
+        TicketDetailCacheService.invalidate(ticket.id)
+        CustomerOverviewService.invalidate(ticket.customer_id)
+        return ticket
+
+    @staticmethod
+    @transaction.atomic
+    def archive_ticket(*, ticket) -> Ticket:
+        ticket = Ticket.objects.select_for_update().get(pk=ticket.pk)
+        if ticket.is_archived:
+            return ticket
+
+        old_key = TicketCounterService.key_for(ticket)
+        ticket.is_archived = True
+        ticket.save(update_fields=["is_archived", "updated_at"])
+        TicketCounterService.move(old_key, TicketCounterService.key_for(ticket))
+        TicketDetailCacheService.invalidate(ticket.id)
+        CustomerOverviewService.invalidate(ticket.customer_id)
+        TicketEventService.archived(ticket)
+
+        return ticket
+
     # ============================================================
     # ADMIN PROFILE DATA
     # ============================================================
@@ -223,17 +469,30 @@ class TicketService:
     @staticmethod
     def get_admin_profile_data(admin):
 
-        tickets = Ticket.objects.filter(
-            Q(created_by_admin=admin) |
-            Q(replies__performed_by=admin)
-        ).distinct().order_by("-created_at")
+        participations = TicketParticipantService.for_admin(admin)
 
         return {
             "admin": admin,
-            "tickets": tickets,
-            "total_tickets": tickets.count(),
+            "participations": participations,
+            "total_tickets": participations.count(),
         }
 
+    # ============================================================
+    # ADMIN DONE COUNTS / LEADERBOARD
+    # ============================================================
+
+    @staticmethod
+    def get_admins_with_done_count(date_from=None, date_to=None) -> list:
+        return AdminLeaderboardService.get_counts(date_from, date_to)
+
+    @staticmethod
+    def get_admin_leaderboard(period: str = "all") -> list:
+        if period not in AdminLeaderboardService.PERIODS:
+            raise ValidationError(
+                f"period must be one of: {', '.join(AdminLeaderboardService.PERIODS)}"
+            )
+        return AdminLeaderboardService.leaderboard(period)
+
     # ============================================================
     # DASHBOARD DATA
     # ============================================================
@@ -241,12 +500,14 @@ class TicketService:
     @staticmethod
     def get_dashboard_data():
 
-        stats = Ticket.objects.aggregate(
-            pending=Count("id", filter=Q(status="PENDING")),
-            accepted=Count("id", filter=Q(status="ACCEPTED")),
-            in_progress=Count("id", filter=Q(status="IN_PROGRESS")),
-            done=Count("id", filter=Q(status="DONE")),
-        )
+        totals = TicketCounterService.status_totals()
+
+        stats = {
+            "pending": totals["PENDING"],
+            "accepted": totals["ACCEPTED"],
+            "in_progress": totals["IN_PROGRESS"],
+            "done": totals["DONE"],
+        }
 
         recent_tickets = Ticket.objects.filter(
             status="PENDING"
@@ -0,0 +1,16 @@
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from customers.services.overview_service import CustomerOverviewService
+from tickets.models import Ticket
+from tickets.services.counter_service import TicketCounterService
+from tickets.services.detail_cache_service import TicketDetailCacheService
+
+
+# Tickets are also removed by cascade (customer delete, Django admin),
+# so deletion is tracked with a signal rather than in TicketService.
+@receiver(post_delete, sender=Ticket)
+def on_ticket_deleted(sender, instance, **kwargs):
+    TicketCounterService.increment(TicketCounterService.key_for(instance), -1)
+    TicketDetailCacheService.invalidate(instance.pk)
+    CustomerOverviewService.invalidate(instance.customer_id)
@@ -1,3 +1,96 @@
+import tempfile
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import TestCase
 
-# Create your tests here.
+from admins.models import Admin
+from customers.models import Customer
+from ticket_replies.services.attachment_service import AttachmentService
+from ticket_replies.storage import AttachmentStorage
+from tickets.services.ticket_service import TicketService
+
+
+class CreateTicketReplyQueryBudgetTests(TestCase):
+    """
+    ``create_ticket_reply`` runs a fixed number of statements whatever the
+    number of performers or attachments.  Inside a TestCase its
+    transaction is a savepoint, which adds SAVEPOINT/RELEASE to each
+    count below.
+    """
+
+    def setUp(self):
+        self.root = Admin.objects.create_user(
+            username="root", password="pw", role="ROOT", full_name="Root"
+        )
+        self.techs = [
+            Admin.objects.create_user(
+                username=f"tech{i}", password="pw", role="ADMIN", full_name=f"Tech {i}"
+            )
+            for i in range(3)
+        ]
+        self.customer = Customer.objects.create(
+            full_name="Customer", username="customer", password="pw",
+            phone="0590000000", location="Somewhere",
+        )
+
+        spool_root = tempfile.TemporaryDirectory()
+        self.addCleanup(spool_root.cleanup)
+        patcher = mock.patch.object(
+            AttachmentService,
+            "storage",
+            return_value=AttachmentStorage(location=spool_root.name),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def create_ticket(self):
+        return TicketService.create_maintenance_ticket(
+            role="ROOT",
+            created_by_admin=self.root,
+            customer_id=self.customer.id,
+            ticket_data={},
+        )
+
+    def reply(self, ticket, status=None, files=2):
+        data = {"performed_by": [tech.id for tech in self.techs]}
+        if status:
+            data["status"] = status
+
+        return TicketService.create_ticket_reply(
+            role="ROOT",
+            admin=self.root,
+            ticket=ticket,
+            data=data,
+            files=[SimpleUploadedFile(f"f{i}.txt", b"x" * (i + 1)) for i in range(files)],
+        )
+
+    def test_reply_without_status_change(self):
+        ticket = self.create_ticket()
+
+        # Lock, performer check, reply, performers, two participant
+        # upserts, attachments.
+        with self.assertNumQueries(2 + 7):
+            reply = self.reply(ticket)
+
+        self.assertEqual(len(reply.spooled_attachments), 2)
+        self.assertEqual(reply.performed_by.count(), 3)
+
+    def test_reply_with_status_change(self):
+        # Move another ticket first so the ACCEPTED counter row exists.
+        self.reply(self.create_ticket(), status="ACCEPTED")
+        ticket = self.create_ticket()
+
+        # + ticket update and the two counter updates.
+        with self.assertNumQueries(2 + 7 + 3):
+            self.reply(ticket, status="ACCEPTED")
+
+        ticket.refresh_from_db()
+        self.assertEqual(ticket.status, "ACCEPTED")
+
+    def test_reply_with_status_change_creating_counter_row(self):
+        ticket = self.create_ticket()
+
+        # + the counter row insert in its own savepoint.
+        with self.assertNumQueries(2 + 7 + 3 + 3):
+            self.reply(ticket, status="ACCEPTED")
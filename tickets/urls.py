@@ -1,21 +1,35 @@
 from django.urls import path
 
 from tickets.views import TicketListAPIView  # ← أضيفي هذا السطر
-from tickets.views import (ArchiveTicketAPIView, MaintenanceTicketCreateView,
-                           NewUserTicketCreateView, TicketDetailAPIView,
-                           TicketReplyCreateView, UpdateTicketAPIView)
+from tickets.views import (ArchiveTicketAPIView, AttachmentDownloadAPIView,
+                           BulkMaintenanceTicketCreateView,
+                           MaintenanceTicketCreateView,
+                           NewUserTicketCreateView, ReplyUploadAPIView,
+                           ReplyUploadCreateAPIView,
+                           TicketAttachmentListAPIView, TicketDetailAPIView,
+                           TicketExportAPIView, TicketReplyCreateView,
+                           TicketReplyTimelineAPIView,
+                           UpdateTicketAPIView)
 
 from .views import (DashboardAPIView, MaintenanceTicketCreateView,
-                    NewUserTicketCreateView,
+                    NewUserTicketCreateView, TicketEventStreamView,
                     TicketReplyCreateView)
 
 urlpatterns = [
     path("new-user/", NewUserTicketCreateView.as_view()),
     path("maintenance/", MaintenanceTicketCreateView.as_view()),
+    path("maintenance/bulk/", BulkMaintenanceTicketCreateView.as_view(), name="bulk-maintenance"),
     path("tickets/<int:pk>/reply/", TicketReplyCreateView.as_view()),
+    path("tickets/<int:pk>/replies/", TicketReplyTimelineAPIView.as_view(), name="ticket-replies"),
+    path("tickets/<int:pk>/attachments/", TicketAttachmentListAPIView.as_view(), name="ticket-attachments"),
+    path("attachments/<int:pk>/download/", AttachmentDownloadAPIView.as_view(), name="attachment-download"),
+    path("replies/<int:reply_id>/uploads/", ReplyUploadCreateAPIView.as_view(), name="reply-uploads"),
+    path("uploads/<uuid:upload_id>/", ReplyUploadAPIView.as_view(), name="attachment-upload"),
     path("tickets/<int:pk>/", TicketDetailAPIView.as_view(), name="ticket-detail"),
   path("tickets/", TicketListAPIView.as_view(), name="ticket-list"),
+    path("tickets/export/", TicketExportAPIView.as_view(), name="ticket-export"),
   path("tickets/<int:pk>/update/", UpdateTicketAPIView.as_view(), name="update-ticket"),
 path("dashboard/", DashboardAPIView.as_view()),
+    path("events/", TicketEventStreamView.as_view(), name="ticket-events"),
   path("tickets/<int:pk>/archive/", ArchiveTicketAPIView.as_view(), name="archive-ticket"),
 ]
@@ -1,25 +1,54 @@
+import asyncio
+import csv
+import io
 import json
+import os
 
 import django_filters
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Prefetch
+from django.http import Http404, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags, quote_etag
+from django.views import View
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import status
 from rest_framework.exceptions import ValidationError
-from rest_framework.filters import OrderingFilter, SearchFilter
-from rest_framework.generics import ListAPIView
+from rest_framework.filters import OrderingFilter
+from rest_framework.generics import GenericAPIView, ListAPIView
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from rest_framework_simplejwt.exceptions import (AuthenticationFailed,
+                                                 InvalidToken)
 
+from admins.models import Admin
 from customers.serializers import CustomerListSerializer
+from livetrack1.authentication import PrincipalJWTAuthentication
+from livetrack1.filters import RankedSearchFilter
+from livetrack1.pagination import KeysetPagination
+from livetrack1.phone import phone_lookup
 from livetrack1.services.authorization_service import AuthorizationService
-from ticket_replies.models import TicketReplyAttachment
+from ticket_replies.models import TicketReply, TicketReplyAttachment
+from ticket_replies.services.download_service import \
+    AttachmentDownloadService
+from ticket_replies.services.pack_service import AttachmentPackService
+from ticket_replies.services.upload_service import AttachmentUploadService
 from tickets.models import Ticket
-from tickets.serializers import TicketCardSerializer, TicketUpdateSerializer
+from tickets.serializers import (TicketCardSerializer,
+                                 TicketReplyAttachmentSerializer,
+                                 TicketReplyTimelineSerializer,
+                                 TicketUpdateSerializer)
+from tickets.services.detail_cache_service import TicketDetailCacheService
+from tickets.services.event_service import TicketEventService
 from tickets.services.ticket_service import TicketService
 
-from .serializers import MaintenanceTicketSerializer, TicketResponseSerializer
+from .serializers import (BulkMaintenanceTicketSerializer,
+                          MaintenanceTicketSerializer, TicketResponseSerializer)
 
 # ============================================================
 # Filtering
@@ -32,6 +61,8 @@ class TicketFilter(django_filters.FilterSet):
         lookup_expr="gte"
     )
 
+    phone = django_filters.CharFilter(method="filter_phone")
+
     created_to = django_filters.DateFilter(
         field_name="created_at",
         lookup_expr="lte"
@@ -41,6 +72,11 @@ class TicketFilter(django_filters.FilterSet):
         model = Ticket
         fields = ["status", "priority", "ticket_type"]
 
+    def filter_phone(self, queryset, name, value):
+        return queryset.filter(
+            phone_lookup("customer_phone_digits", "customer_phone_reversed", value)
+        )
+
 
 # ============================================================
 # Pagination
@@ -52,6 +88,12 @@ class StandardResultsSetPagination(PageNumberPagination):
     max_page_size = 100
 
 
+class TicketCursorPagination(KeysetPagination):
+    page_size = 10
+    max_page_size = 100
+    tiebreak_fields = ("-created_at", "-id")
+
+
 # ============================================================
 # CREATE NEW USER
 # ============================================================
@@ -78,7 +120,8 @@ class NewUserTicketCreateView(APIView):
                     "full_name": ticket.created_by_admin.full_name,
                     "role": ticket.created_by_admin.role,
                 },
-                "customer_profile": serializer.data
+                "customer_profile": serializer.data,
+                "possible_duplicates": ticket.customer_duplicates,
             },
             status=status.HTTP_201_CREATED
         )
@@ -108,6 +151,39 @@ class MaintenanceTicketCreateView(APIView):
         )
 
 
+# ============================================================
+# BULK CREATE MAINTENANCE (outages)
+# ============================================================
+
+class BulkMaintenanceTicketCreateView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = BulkMaintenanceTicketSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        data = serializer.validated_data
+
+        result = TicketService.create_maintenance_tickets_bulk(
+            role=request.user.role,
+            created_by_admin=request.user,
+            ticket_data=data,
+            customer_ids=data.get("customer_ids"),
+            distributor_id=data.get("distributor_id"),
+        )
+
+        tickets = result["tickets"]
+
+        return Response(
+            {
+                "created": len(tickets),
+                "ticket_ids": [ticket.id for ticket in tickets],
+                "failed": result["failed"],
+            },
+            status=status.HTTP_201_CREATED if tickets else status.HTTP_400_BAD_REQUEST
+        )
+
+
 # ============================================================
 # REPLY
 # ============================================================
@@ -131,26 +207,233 @@ class TicketReplyCreateView(APIView):
         data = request.data.copy()
         data["performed_by"] = performed_by_ids
 
+        # Files are only spooled here; thumbnails/downscaling run in the
+        # background and the client polls the attachments endpoint.
         reply = TicketService.create_ticket_reply(
             role=request.user.role,
             admin=request.user,
             ticket=ticket,
             data=data,
+            files=request.FILES.getlist("files"),
+        )
+
+        return Response(
+            {
+                "message": "Reply created successfully",
+                "reply_id": reply.id,
+                "attachments": [
+                    {"id": attachment.id, "processing_status": attachment.processing_status}
+                    for attachment in reply.spooled_attachments
+                ],
+            },
+            status=status.HTTP_201_CREATED,
         )
 
-        files = request.FILES.getlist("files")
 
-        for file in files:
-            TicketReplyAttachment.objects.create(
-                reply=reply,
-                file=file
+class TicketAttachmentListAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [PrincipalJWTAuthentication]
+
+    def get(self, request, pk):
+        get_object_or_404(Ticket, pk=pk)
+
+        attachments = TicketReplyAttachment.objects.filter(
+            reply__ticket_id=pk
+        ).order_by("id")
+
+        # ?ids=1,2,3 narrows polling to the uploads the client is waiting on.
+        ids = request.query_params.get("ids")
+        if ids:
+            try:
+                attachments = attachments.filter(
+                    id__in=[int(value) for value in ids.split(",") if value]
+                )
+            except ValueError:
+                raise ValidationError({"ids": "Must be a comma-separated list of ids."})
+
+        return Response(TicketReplyAttachmentSerializer(attachments, many=True).data)
+
+
+class TicketReplyTimelinePagination(KeysetPagination):
+    page_size = 20
+    max_page_size = 100
+    tiebreak_fields = ("created_at", "id")
+
+
+class TicketReplyTimelineAPIView(ListAPIView):
+    """
+    Reply history of one ticket, oldest first (``?order=desc`` for newest
+    first), paged by (created_at, id).  Four queries per page: ticket
+    check, replies with their admin, performers, attachments.
+    """
+    serializer_class = TicketReplyTimelineSerializer
+    pagination_class = TicketReplyTimelinePagination
+    # The cursor is built on (created_at, id); no ?ordering= / ?search=.
+    filter_backends = []
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [PrincipalJWTAuthentication]
+
+    def get_queryset(self):
+        if not Ticket.objects.filter(pk=self.kwargs["pk"]).exists():
+            raise Http404
+
+        ordering = ["created_at", "id"]
+        if self.request.query_params.get("order") == "desc":
+            ordering = ["-created_at", "-id"]
+
+        return (
+            TicketReply.objects.filter(ticket_id=self.kwargs["pk"])
+            .select_related("admin")
+            .prefetch_related(
+                Prefetch(
+                    "performed_by",
+                    queryset=Admin.objects.only("id", "full_name"),
+                ),
+                Prefetch(
+                    "attachments",
+                    queryset=TicketReplyAttachment.objects.order_by("id"),
+                ),
+            )
+            .order_by(*ordering)
+        )
+
+
+class AttachmentDownloadAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [PrincipalJWTAuthentication]
+
+    def get(self, request, pk):
+        if not AuthorizationService.can_view_ticket_files(request.user.role):
+            return Response(
+                {"error": "You are not allowed to download ticket attachments"},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        attachment = get_object_or_404(
+            TicketReplyAttachment.objects.select_related("blob__pack", "thumbnail_blob__pack"),
+            pk=pk,
+        )
+
+        filename = attachment.original_name
+
+        if request.query_params.get("variant") == "thumbnail":
+            name, blob, content_type = attachment.thumbnail.name, attachment.thumbnail_blob, "image/jpeg"
+            filename = f"{os.path.splitext(filename)[0] or 'attachment'}-thumbnail.jpg"
+        else:
+            name, blob, content_type = attachment.file.name, attachment.blob, attachment.mime_type
+
+        if not name:
+            return Response(
+                {
+                    "error": "Attachment file is not available",
+                    "processing_status": attachment.processing_status,
+                },
+                status=status.HTTP_409_CONFLICT,
             )
 
+        # Files of old closed tickets may only exist in a cold pack.
+        if blob is not None and not AttachmentPackService.ensure_hot(blob):
+            raise Http404("Attachment file is missing")
+
+        # Blobs are content-addressed, so their hash is a strong ETag.
+        etag = quote_etag(blob.sha256 if blob else f"{attachment.id}-{name}")
+
+        response = AttachmentDownloadService.build_response(
+            request,
+            name=name,
+            etag=etag,
+            content_type=content_type,
+            filename=filename,
+            inline=request.query_params.get("inline") in ("1", "true"),
+        )
+        if response is None:
+            raise Http404("Attachment file is missing")
+
+        return response
+
+
+# ============================================================
+# RESUMABLE UPLOADS (tus 1.0 core + creation/termination)
+# ============================================================
+
+def tus_headers(upload=None) -> dict:
+    headers = {"Tus-Resumable": AttachmentUploadService.TUS_VERSION}
+    if upload is not None:
+        headers["Upload-Offset"] = str(upload.offset)
+        headers["Upload-Length"] = str(upload.length)
+        if upload.attachment_id:
+            headers["Upload-Attachment-Id"] = str(upload.attachment_id)
+    return headers
+
+
+class ReplyUploadCreateAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def options(self, request, *args, **kwargs):
+        headers = tus_headers()
+        headers.update({
+            "Tus-Version": AttachmentUploadService.TUS_VERSION,
+            "Tus-Extension": "creation,termination",
+            "Tus-Max-Size": str(AttachmentUploadService.max_size()),
+        })
+        return Response(status=status.HTTP_204_NO_CONTENT, headers=headers)
+
+    def post(self, request, reply_id):
+        reply = get_object_or_404(TicketReply, pk=reply_id)
+
+        upload = AttachmentUploadService.create(
+            reply=reply,
+            admin=request.user,
+            length=request.headers.get("Upload-Length"),
+            metadata=AttachmentUploadService.parse_metadata(
+                request.headers.get("Upload-Metadata")
+            ),
+        )
+
+        headers = tus_headers(upload)
+        headers["Location"] = request.build_absolute_uri(
+            reverse("attachment-upload", args=[upload.id])
+        )
+
         return Response(
-            {"message": "Reply created successfully"},
+            {"upload_id": upload.id, "offset": upload.offset, "length": upload.length},
             status=status.HTTP_201_CREATED,
+            headers=headers,
+        )
+
+
+class ReplyUploadAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def head(self, request, upload_id):
+        upload = AttachmentUploadService.get(upload_id, request.user)
+
+        headers = tus_headers(upload)
+        headers["Cache-Control"] = "no-store"
+        return Response(status=status.HTTP_200_OK, headers=headers)
+
+    def patch(self, request, upload_id):
+        if request.content_type.split(";")[0].strip() != "application/offset+octet-stream":
+            return Response(
+                {"error": "Content-Type must be application/offset+octet-stream"},
+                status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            )
+
+        # request.data is never touched, so the body is read straight
+        # from the socket chunk by chunk.
+        upload = AttachmentUploadService.append(
+            upload_id=upload_id,
+            admin=request.user,
+            offset=request.headers.get("Upload-Offset"),
+            stream=request.stream or io.BytesIO(),
         )
 
+        return Response(status=status.HTTP_204_NO_CONTENT, headers=tus_headers(upload))
+
+    def delete(self, request, upload_id):
+        AttachmentUploadService.terminate(upload_id, request.user)
+        return Response(status=status.HTTP_204_NO_CONTENT, headers=tus_headers())
+
 
 # ============================================================
 # DETAIL
@@ -158,17 +441,33 @@ class TicketReplyCreateView(APIView):
 
 class TicketDetailAPIView(APIView):
     permission_classes = [IsAuthenticated]
+    authentication_classes = [PrincipalJWTAuthentication]
 
     def get(self, request, pk):
-        ticket = get_object_or_404(
-            Ticket.objects.prefetch_related(
-                "replies__performed_by",
-                "replies__attachments"
-            ),
-            pk=pk
-        )
+        version = TicketDetailCacheService.get_version(pk)
+        if version is None:
+            raise Http404
+
+        etag = quote_etag(version)
+
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            payload = TicketDetailCacheService.get_payload(pk, version)
+
+            if payload is None:
+                ticket = get_object_or_404(
+                    Ticket.objects.select_related("created_by_admin"),
+                    pk=pk
+                )
+                payload = dict(TicketResponseSerializer(ticket).data)
+                TicketDetailCacheService.set_payload(pk, version, payload)
+
+            response = Response(payload)
 
-        return Response(TicketResponseSerializer(ticket).data)
+        response["ETag"] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
 
 
 # ============================================================
@@ -177,6 +476,7 @@ class TicketDetailAPIView(APIView):
 
 class TicketListAPIView(ListAPIView):
     serializer_class = TicketResponseSerializer
+    authentication_classes = [PrincipalJWTAuthentication]
     queryset = Ticket.objects.select_related(
         "customer",
         "created_by_admin"
@@ -186,12 +486,14 @@ class TicketListAPIView(ListAPIView):
 
     filter_backends = [
         DjangoFilterBackend,
-        SearchFilter,
         OrderingFilter,
+        RankedSearchFilter,
     ]
 
     filterset_class = TicketFilter
 
+    search_fts_table = "tickets_ticket_fts"
+
     search_fields = [
         "customer_full_name",
         "customer_phone",
@@ -206,6 +508,114 @@ class TicketListAPIView(ListAPIView):
 
     ordering = ["-created_at"]
 
+    @property
+    def paginator(self):
+        # ?pagination=cursor switches to keyset paging (no COUNT/OFFSET);
+        # page-number stays the default for existing clients.
+        if not hasattr(self, "_paginator"):
+            params = self.request.query_params
+            if params.get("pagination") == "cursor" or "cursor" in params:
+                self._paginator = TicketCursorPagination()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+
+
+# ============================================================
+# EXPORT (CSV / NDJSON stream)
+# ============================================================
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+class TicketExportAPIView(GenericAPIView):
+    """
+    Full ticket dump with the same filter/search params as the list.
+    Rows come straight from values() over a server-side cursor and are
+    written out as they arrive, so memory stays flat for any size.
+    """
+
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [PrincipalJWTAuthentication]
+    queryset = Ticket.objects.all()
+
+    filter_backends = TicketListAPIView.filter_backends
+    filterset_class = TicketFilter
+    search_fields = TicketListAPIView.search_fields
+    search_fts_table = TicketListAPIView.search_fts_table
+    ordering_fields = TicketListAPIView.ordering_fields
+    ordering = ["-created_at"]
+
+    chunk_size = 2000
+
+    export_fields = [
+        "id",
+        "ticket_type",
+        "priority",
+        "status",
+        "is_archived",
+        "availability_time",
+        "created_at",
+        "updated_at",
+        "closed_at",
+        "customer_id",
+        "customer_full_name",
+        "customer_username",
+        "customer_phone",
+        "customer_location",
+        "vlan",
+        "speed",
+        "distributor_name",
+        "customer_note",
+        "created_by_admin__username",
+        "closed_by__username",
+    ]
+
+    def get(self, request):
+        if not AuthorizationService.is_root(request.user.role):
+            return Response(
+                {"error": "Only ROOT can export tickets"},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        export_format = request.query_params.get("export_format", "csv")
+        if export_format not in ("csv", "ndjson"):
+            raise ValidationError("export_format must be csv or ndjson.")
+
+        rows = (
+            self.filter_queryset(self.get_queryset())
+            .values(*self.export_fields)
+            .iterator(chunk_size=self.chunk_size)
+        )
+
+        if export_format == "ndjson":
+            content = self.stream_ndjson(rows)
+            content_type = "application/x-ndjson"
+        else:
+            content = self.stream_csv(rows)
+            content_type = "text/csv"
+
+        response = StreamingHttpResponse(content, content_type=content_type)
+        response["Content-Disposition"] = (
+            f'attachment; filename="tickets.{export_format}"'
+        )
+        return response
+
+    def stream_csv(self, rows):
+        writer = csv.writer(_Echo())
+        yield writer.writerow(self.export_fields)
+        for row in rows:
+            yield writer.writerow([
+                value.isoformat() if hasattr(value, "isoformat") else value
+                for value in row.values()
+            ])
+
+    def stream_ndjson(self, rows):
+        for row in rows:
+            yield json.dumps(row, cls=DjangoJSONEncoder) + "\n"
+
 
 # ============================================================
 # ARCHIVE
@@ -224,8 +634,7 @@ class ArchiveTicketAPIView(APIView):
 
         ticket = get_object_or_404(Ticket, pk=pk)
 
-        ticket.is_archived = True
-        ticket.save(update_fields=["is_archived"])
+        TicketService.archive_ticket(ticket=ticket)
 
         return Response(
             {"message": "Ticket archived successfully"},
@@ -257,7 +666,7 @@ class UpdateTicketAPIView(APIView):
         )
 
         serializer.is_valid(raise_exception=True)
-        serializer.save()
+        TicketService.update_ticket(ticket=ticket, serializer=serializer)
 
         return Response(
             {"message": "Ticket updated successfully"},
@@ -271,6 +680,7 @@ class UpdateTicketAPIView(APIView):
 
 class DashboardAPIView(APIView):
     permission_classes = [IsAuthenticated]
+    authentication_classes = [PrincipalJWTAuthentication]
 
     def get(self, request):
         data = TicketService.get_dashboard_data()
@@ -281,4 +691,88 @@ class DashboardAPIView(APIView):
                 data["recent"],
                 many=True
             ).data
-        })
\ No newline at end of file
+        })
+
+
+# ============================================================
+# LIVE EVENTS (Server-Sent Events)
+# ============================================================
+
+class TicketEventStreamView(View):
+    """
+    Pushes ticket.created / status_changed / reply_added / archived
+    events to dispatch screens.  Runs as a native async view, so under
+    ASGI an idle stream costs no worker thread.
+
+    EventSource can't send headers, so the access token may also be
+    passed as ?token=.  ?types= limits the stream to some event types.
+    """
+
+    heartbeat_seconds = 15
+
+    async def get(self, request):
+        user = await sync_to_async(self.authenticate)(request)
+        if user is None:
+            return JsonResponse(
+                {"detail": "Authentication credentials were not provided or are invalid."},
+                status=401
+            )
+
+        last_event_id = request.headers.get("Last-Event-ID") or request.GET.get("last_event_id")
+        try:
+            last_event_id = int(last_event_id) if last_event_id else None
+        except ValueError:
+            last_event_id = None
+
+        types = request.GET.get("types")
+        types = set(types.split(",")) if types else None
+
+        subscription = TicketEventService.get_broker().subscribe(last_event_id)
+
+        response = StreamingHttpResponse(
+            self.stream(subscription, types),
+            content_type="text/event-stream"
+        )
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+    def authenticate(self, request):
+        auth = PrincipalJWTAuthentication()
+        header = auth.get_header(request)
+
+        try:
+            # A malformed header ("Bearer", "Bearer a b") raises here too.
+            raw_token = auth.get_raw_token(header) if header else None
+            if raw_token is None:
+                raw_token = request.GET.get("token")
+            if not raw_token:
+                return None
+
+            user = auth.get_user(auth.get_validated_token(raw_token))
+        except (InvalidToken, AuthenticationFailed):
+            return None
+
+        return user if user.is_active else None
+
+    async def stream(self, subscription, types):
+        try:
+            yield "retry: 3000\n\n"
+
+            while not subscription.overflowed:
+                try:
+                    event = await subscription.get(self.heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+
+                if types and event["type"] not in types:
+                    continue
+
+                yield (
+                    f"id: {event['id']}\n"
+                    f"event: {event['type']}\n"
+                    f"data: {json.dumps(event['data'])}\n\n"
+                )
+        finally:
+            subscription.close()